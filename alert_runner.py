@@ -0,0 +1,127 @@
+"""매크로 위험 알림 실행기 (헤드리스)
+
+alert_rules.toml의 규칙을 마지막 처리 날짜 이후 새로 들어온 행에만 적용하고,
+중복 제거/속도 제한을 거쳐 웹훅·이메일 싱크로 보낸다. Streamlit 세션과 무관하게 cron 등에서 실행한다.
+
+사용법:
+    FRED_API_KEY=... python alert_runner.py                    # 1회 실행 (cron)
+    FRED_API_KEY=... python alert_runner.py --every 30         # 30분마다 발표 시점이 지난 시리즈만 재수집 후 평가
+    python alert_runner.py --data macro_master_20250101_1a2b3c4d.csv --dry-run
+    python alert_runner.py --listen 8765                       # 로컬 웹훅 stand-in (받은 알림 출력)
+
+--data에는 대시보드 '💾 데이터 다운로드'에서 '정렬된 마스터 프레임 (영업일)' / CSV로 받은 파일
+(macro_master_<날짜>_<버전>.csv, 첫 컬럼 date)이나 API의 /export/master?format=csv 응답을 쓴다.
+
+상태(마지막 처리 날짜, 규칙별 마지막 알림)는 --state 파일(alert_state.json)에 저장된다.
+FRED 수집 상태 / 압축 저장소 / 변화점 감지 상태는 --snapshot 파일(alert_snapshot.pkl)에 저장되어
+cron 1회 실행도 발표 시점이 지난 시리즈만 다시 받고 새 관측치만 평가한다.
+싱크가 없거나 전송에 모두 실패한 알림은 보내지 않은 것으로 보고 다음 실행까지 대기열에 남는다.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+
+from alerts import (
+    ALERT_RULES_PATH, ALERT_STATE_PATH, ALERT_SNAPSHOT_PATH, load_alert_config, load_state, save_state, run_alerts, local_webhook
+)
+from detectors import run_detectors
+from macro_core import load_risk_config
+from series_registry import load_registry
+
+def listen(port):
+    """로컬 웹훅 stand-in을 띄우고 받은 알림을 출력"""
+    server, received = local_webhook(port)
+    print(f"웹훅 stand-in: http://127.0.0.1:{server.server_address[1]}/ (Ctrl+C로 종료)")
+    seen = 0
+    try:
+        while True:
+            time.sleep(0.5)
+            for payload in received[seen:]:
+                print(json.dumps(payload, ensure_ascii=False, indent=2))
+            seen = len(received)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+def run_once(df, detectors, args, rules, sinks, max_per_run, risk_rules, specs):
+    if not sinks and not args.dry_run:
+        print(f"⚠️ {args.config}에 [[sinks]]가 없어 알림을 보내지 않습니다 (대기열에 보관, 확인만 하려면 --dry-run)",
+              file=sys.stderr)
+    state = load_state(args.state)
+    sent, suppressed, results = run_alerts(df, rules, sinks, state, risk_rules, detectors, specs,
+                                           max_per_run=max_per_run, dry_run=args.dry_run)
+    for alert in sent:
+        print(f"[알림] {alert['message']}")
+    for alert in suppressed:
+        print(f"[억제] {alert['message']}")
+    unsent = [] if args.dry_run else state['pending']
+    for alert in unsent:
+        print(f"[미전송] {alert['message']}")
+    for name, err in results.items():
+        if err:
+            print(f"[전송 실패] {name}: {err}", file=sys.stderr)
+    if not args.dry_run:
+        save_state(state, args.state)
+    print(f"{pd.Timestamp.now():%Y-%m-%d %H:%M} 평가 완료: 데이터 {df.index[-1]:%Y-%m-%d}까지, "
+          f"알림 {len(sent)}건, 미전송 {len(unsent)}건, 억제 {len(suppressed)}건")
+
+def main():
+    parser = argparse.ArgumentParser(description="매크로 위험 알림 실행기")
+    parser.add_argument('--config', default=ALERT_RULES_PATH)
+    parser.add_argument('--state', default=ALERT_STATE_PATH)
+    parser.add_argument('--snapshot', default=ALERT_SNAPSHOT_PATH, help="FRED 수집 상태 / 저장소 / 감지 상태 파일")
+    parser.add_argument('--data', help="마스터 프레임 CSV 내보내기 파일 (macro_master_*.csv, 없으면 FRED에서 수집)")
+    parser.add_argument('--fred-api-key')
+    parser.add_argument('--start', default='2000-01-01')
+    parser.add_argument('--every', type=float, help="반복 실행 간격(분). 없으면 1회 실행")
+    parser.add_argument('--dry-run', action='store_true', help="전송/상태 저장 없이 출력만")
+    parser.add_argument('--listen', type=int, help="로컬 웹훅 stand-in 포트")
+    args = parser.parse_args()
+
+    if args.listen is not None:
+        listen(args.listen)
+        return
+
+    specs, _ = load_registry()
+    risk_rules, _, _ = load_risk_config()
+
+    if args.data:
+        df = pd.read_csv(args.data, index_col=0, parse_dates=True)
+        df = df.drop(columns=['Scenario'], errors='ignore').sort_index()
+        rules, sinks, max_per_run = load_alert_config(args.config, df.columns)
+        # CSV에는 원래 주기 관측치가 없어 변화점 규칙은 평가하지 않음
+        run_once(df, None, args, [r for r in rules if r['kind'] != 'breaks'], sinks, max_per_run, risk_rules, specs)
+        return
+
+    api_key = args.fred_api_key or os.environ.get('FRED_API_KEY')
+    if not api_key:
+        raise SystemExit("--data 또는 FRED_API_KEY가 필요합니다.")
+    from fredapi import Fred
+    from fred_loader import refresh_dataset, load_snapshot, save_snapshot
+
+    fred = Fred(api_key=api_key)
+    # 직전 실행의 저장소 / 수집 상태에서 이어서 (발표 시점이 지난 시리즈만 재수집)
+    dataset, fetch_state = load_snapshot(args.snapshot, args.start)
+    while True:
+        previous = dataset
+        dataset, refreshed = refresh_dataset(fred, specs, args.start, previous=previous, state=fetch_state)
+        if dataset is not previous:
+            for key, msg in dataset['errors'].items():
+                print(f"[수집 실패] {specs[key]['name']}: {msg}", file=sys.stderr)
+            # 변화점 감지도 새 관측치만 이어서 처리
+            dataset['detectors'] = run_detectors(dataset['store'], specs,
+                                                 previous=previous['detectors'] if previous is not None else None,
+                                                 previous_store=previous['store'] if previous is not None else None)
+            rules, sinks, max_per_run = load_alert_config(args.config, dataset['df'].columns)
+            run_once(dataset['df'], dataset['detectors'], args, rules, sinks, max_per_run, risk_rules, specs)
+        if refreshed and not args.dry_run:
+            save_snapshot(args.snapshot, dataset, fetch_state, args.start)
+        if not args.every:
+            return
+        time.sleep(args.every * 60)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,333 @@
+import json
+import os
+import re
+import smtplib
+import threading
+import urllib.request
+from email.message import EmailMessage
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from macro_core import risk_score_series, scenario_codes
+from detectors import FREQ_PARAMS
+from series_store import days_to_index
+
+try:
+    import tomllib
+except ModuleNotFoundError:  # Python < 3.11
+    import tomli as tomllib
+
+# ============================================================
+# 알림 규칙 엔진 (헤드리스, Streamlit 없음)
+# ============================================================
+# 규칙 문장("HY_SPREAD crosses 4.5", "scenario changes to 2", "risk score >= 7")을
+# 배열 연산으로 컴파일하고, 상태 파일의 마지막 처리 날짜 이후 새 행(+ 직전 행 1개)에만 적용한다.
+# 같은 규칙의 같은 관측일은 다시 보내지 않고(중복 제거), 규칙별 재알림 간격과 1회 실행당 최대 건수로 속도를 제한한다.
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+ALERT_RULES_PATH = os.environ.get("MACRO_ALERT_RULES", os.path.join(_HERE, "alert_rules.toml"))
+ALERT_STATE_PATH = os.environ.get("MACRO_ALERT_STATE", os.path.join(_HERE, "alert_state.json"))
+# 실행 사이에 유지할 수집 상태 / 압축 저장소 / 변화점 감지 상태 (fred_loader.save_snapshot)
+ALERT_SNAPSHOT_PATH = os.environ.get("MACRO_ALERT_SNAPSHOT", os.path.join(_HERE, "alert_snapshot.pkl"))
+
+DEFAULT_COOLDOWN_HOURS = 6
+MAX_ALERTS_PER_RUN = 10
+MAX_PENDING = 100
+WEBHOOK_TIMEOUT = 10
+
+# 컬럼이 아닌 특수 대상 (문장 표기 → 내부 이름)
+SPECIAL_SUBJECTS = {'risk score': 'RISK_SCORE', 'scenario': 'SCENARIO'}
+SUBJECT_LABELS = {'RISK_SCORE': '위험 점수', 'SCENARIO': '시나리오'}
+
+_NUMBER = r'(?P<value>-?\d+(?:\.\d+)?)'
+_RULE_PATTERNS = [
+    ('crosses', re.compile(r'^(?P<subject>.+?)\s+crosses(?:\s+(?P<direction>above|below))?\s+' + _NUMBER + '$', re.I)),
+    ('changes', re.compile(r'^(?P<subject>.+?)\s+changes(?:\s+to\s+' + _NUMBER + ')?$', re.I)),
+    ('breaks', re.compile(r'^(?P<subject>.+?)\s+breaks$', re.I)),
+    ('compare', re.compile(r'^(?P<subject>.+?)\s*(?P<op>>=|<=|≥|≤|>|<)\s*' + _NUMBER + '$')),
+]
+_OPS = {'>': np.greater, '>=': np.greater_equal, '≥': np.greater_equal,
+        '<': np.less, '<=': np.less_equal, '≤': np.less_equal}
+
+# ============================================================
+# 규칙 컴파일 / 평가
+# ============================================================
+def compile_rule(item, columns):
+    """규칙 문장(str) 또는 TOML 테이블({'when', 'name', 'cooldown_hours', 'message'}) → 규칙 dict"""
+    item = {'when': item} if isinstance(item, str) else dict(item)
+    text = ' '.join(item['when'].split())
+    for kind, pattern in _RULE_PATTERNS:
+        m = pattern.match(text)
+        if m:
+            break
+    else:
+        raise ValueError(f"알림 규칙 '{text}': 해석할 수 없는 문장")
+
+    raw = m.group('subject').strip()
+    subject = SPECIAL_SUBJECTS.get(raw.lower(), raw)
+    if subject not in SUBJECT_LABELS and subject not in columns:
+        raise ValueError(f"알림 규칙 '{text}': 알 수 없는 지표 '{raw}'")
+    if kind == 'breaks' and subject in SUBJECT_LABELS:
+        raise ValueError(f"알림 규칙 '{text}': 변화점 감지는 수집 시리즈에만 적용됩니다")
+
+    groups = m.groupdict()
+    return {
+        'name': item.get('name') or re.sub(r'\W+', '_', text.lower()).strip('_'),
+        'when': text,
+        'kind': kind,
+        'subject': subject,
+        'value': float(groups['value']) if groups.get('value') is not None else None,
+        'direction': (groups.get('direction') or '').lower() or None,
+        'op': groups.get('op'),
+        'cooldown_hours': float(item.get('cooldown_hours', DEFAULT_COOLDOWN_HOURS)),
+        'message': item.get('message'),
+    }
+
+def load_alert_config(path=ALERT_RULES_PATH, columns=()):
+    """TOML 알림 설정 → (규칙 list, 싱크 list, 1회 최대 건수)"""
+    with open(path, 'rb') as f:
+        raw = tomllib.load(f)
+    rules = [compile_rule(item, columns) for item in raw.get('rules', [])]
+    names = [r['name'] for r in rules]
+    dup = {n for n in names if names.count(n) > 1}
+    if dup:
+        raise ValueError(f"알림 규칙 이름 중복: {', '.join(sorted(dup))}")
+    return rules, raw.get('sinks', []), int(raw.get('max_per_run', MAX_ALERTS_PER_RUN))
+
+def rule_triggers(rule, values):
+    """규칙 하나의 발생 위치 (values[0]은 직전 처리 행, 반환은 values[1:] 기준 bool 배열)"""
+    prev, cur = values[:-1], values[1:]
+    x = rule['value']
+    with np.errstate(invalid='ignore'):
+        if rule['kind'] == 'crosses':
+            up = (prev <= x) & (cur > x)
+            down = (prev >= x) & (cur < x)
+            return up if rule['direction'] == 'above' else down if rule['direction'] == 'below' else up | down
+        if rule['kind'] == 'changes':
+            hit = np.isfinite(prev) & np.isfinite(cur) & (cur != prev)
+            return hit & (cur == x) if x is not None else hit
+        # compare: 조건이 새로 참이 되는 날만 (계속 참인 동안은 반복하지 않음)
+        cond = _OPS[rule['op']](values, x)
+        return cond[1:] & ~cond[:-1]
+
+def subject_values(df, subject, risk_rules=None):
+    """평가 대상 값 배열 (특수 대상은 창 안에서 벡터화 계산)"""
+    if subject == 'RISK_SCORE':
+        return risk_score_series(df, risk_rules).to_numpy(dtype=np.float64)
+    if subject == 'SCENARIO':
+        return scenario_codes(df['YIELD_CURVE'].to_numpy(), df['POLICY_SPREAD'].to_numpy()).astype(np.float64)
+    return df[subject].to_numpy(dtype=np.float64)
+
+def _label(subject, specs):
+    if subject in SUBJECT_LABELS:
+        return SUBJECT_LABELS[subject]
+    return specs[subject]['name'] if specs and subject in specs else subject
+
+def _fmt(v):
+    return '-' if v is None or not np.isfinite(v) else (f"{v:.0f}" if float(v).is_integer() else f"{v:.2f}")
+
+def evaluate_rules(df, rules, since=None, risk_rules=None, detectors=None, specs=None):
+    """since 이후 새 행에만 규칙 적용 → 알림 list (규칙마다 가장 최근 발생 1건 + 발생 횟수)
+
+    since가 없으면(첫 실행) 마지막 행만 평가한다 (과거 이력 전체를 알림으로 보내지 않도록).
+    """
+    if len(df) < 2:
+        return []
+    start = len(df) - 1 if since is None else int(df.index.searchsorted(pd.Timestamp(since), side='right'))
+    if start >= len(df):
+        return []
+    window = df.iloc[max(start - 1, 0):]
+    offset = 1 if start > 0 else 0
+    dates = window.index[offset:]
+
+    cache = {}
+    alerts = []
+    for rule in rules:
+        subject = rule['subject']
+        if rule['kind'] == 'breaks':
+            # 분기/월간 관측일은 발표보다 한참 앞이라 새 행 구간 대신 감지기의 최근 기간으로 거르고, 중복은 throttle이 제거
+            st = (detectors or {}).get(subject)
+            if not st or not st['events']:
+                continue
+            recent = pd.Timedelta(days=FREQ_PARAMS.get(st['freq'], FREQ_PARAMS['D'])['recent_days'])
+            days = days_to_index([e['day'] for e in st['events']])
+            hits = np.flatnonzero((days >= df.index[-1] - recent) & (days <= df.index[-1]))
+            if not len(hits):
+                continue
+            last = st['events'][hits[-1]]
+            date, value, prev, count = days[hits[-1]], last['value'], None, len(hits)
+        else:
+            if subject not in cache:
+                cache[subject] = subject_values(window, subject, risk_rules)
+            values = cache[subject]
+            if offset == 0:
+                values = np.r_[np.nan, values]
+            hit = np.flatnonzero(rule_triggers(rule, values))
+            if not len(hit):
+                continue
+            i = hit[-1]
+            date, value, prev, count = dates[i], values[i + 1], values[i], len(hit)
+
+        label = _label(subject, specs)
+        if rule['kind'] == 'breaks':
+            default = f"{label} 급변 감지: {_fmt(value)} ({date:%Y-%m-%d})"
+        else:
+            default = f"{label}: {rule['when']} ({_fmt(prev)} → {_fmt(value)}, {date:%Y-%m-%d})"
+        alerts.append({
+            'rule': rule['name'],
+            'when': rule['when'],
+            'subject': subject,
+            'date': date.strftime('%Y-%m-%d'),
+            'value': None if value is None or not np.isfinite(value) else float(value),
+            'previous': None if prev is None or not np.isfinite(prev) else float(prev),
+            'count': int(count),
+            'message': rule['message'].format(label=label, value=_fmt(value), previous=_fmt(prev), date=date)
+                       if rule['message'] else default,
+        })
+    return alerts
+
+# ============================================================
+# 중복 제거 / 속도 제한
+# ============================================================
+def load_state(path=ALERT_STATE_PATH):
+    """알림 상태 파일 (없으면 빈 상태)"""
+    if not path or not os.path.exists(path):
+        return {'last_date': None, 'rules': {}, 'pending': []}
+    with open(path, encoding='utf-8') as f:
+        state = json.load(f)
+    state.setdefault('rules', {})
+    state.setdefault('pending', [])
+    return state
+
+def save_state(state, path=ALERT_STATE_PATH):
+    """임시 파일에 쓴 뒤 교체 (중간에 중단돼도 상태 파일이 깨지지 않도록)"""
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+def throttle(alerts, rules, state, now=None, max_per_run=MAX_ALERTS_PER_RUN):
+    """이미 보낸 관측일 제거 + 규칙별 재알림 간격 적용 → (보낼 알림, 억제된 알림)
+
+    억제된 알림도 관측일은 기록하므로 다음 실행에서 다시 나오지 않는다.
+    1회 최대 건수를 넘는 알림은 요약 1건으로 합친다.
+    """
+    now = pd.Timestamp.now() if now is None else now
+    by_name = {r['name']: r for r in rules}
+    send, suppressed = [], []
+    for alert in alerts:
+        rs = state['rules'].setdefault(alert['rule'], {'last_event': None, 'last_sent': None})
+        if rs['last_event'] is not None and alert['date'] <= rs['last_event']:
+            continue
+        rs['last_event'] = alert['date']
+        cooldown = pd.Timedelta(hours=by_name[alert['rule']]['cooldown_hours'])
+        if rs['last_sent'] is not None and now - pd.Timestamp(rs['last_sent']) < cooldown:
+            suppressed.append(alert)
+            continue
+        rs['last_sent'] = now.isoformat(timespec='seconds')
+        send.append(alert)
+
+    if len(send) > max_per_run:
+        rest = send[max_per_run - 1:]
+        send = send[:max_per_run - 1] + [{
+            'rule': '_digest',
+            'when': '',
+            'subject': '',
+            'date': max(a['date'] for a in rest),
+            'value': None,
+            'previous': None,
+            'count': len(rest),
+            'message': f"외 {len(rest)}건: " + "; ".join(a['message'] for a in rest),
+        }]
+    return send, suppressed
+
+# ============================================================
+# 전송 (웹훅 / 이메일)
+# ============================================================
+def _alert_text(alerts):
+    return "\n".join(f"- {a['message']}" + (f" (새 구간 중 {a['count']}회)" if a['count'] > 1 and a['rule'] != '_digest' else '')
+                     for a in alerts)
+
+def send_webhook(sink, alerts, timeout=WEBHOOK_TIMEOUT):
+    """JSON POST (format = "slack"이면 {"text": ...} 형식)"""
+    if sink.get('format') == 'slack':
+        payload = {'text': "📣 매크로 위험 알림\n" + _alert_text(alerts)}
+    else:
+        payload = {'source': 'macro-risk-dashboard', 'alerts': alerts}
+    headers = {'Content-Type': 'application/json', **sink.get('headers', {})}
+    req = urllib.request.Request(sink['url'], data=json.dumps(payload, ensure_ascii=False).encode('utf-8'),
+                                 headers=headers, method='POST')
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        if resp.status >= 300:
+            raise RuntimeError(f"웹훅 응답 {resp.status}")
+
+def send_email(sink, alerts, timeout=WEBHOOK_TIMEOUT):
+    """SMTP 메일 (비밀번호는 password_env 환경변수에서)"""
+    msg = EmailMessage()
+    msg['Subject'] = sink.get('subject', f"[매크로 위험 알림] {len(alerts)}건")
+    msg['From'] = sink['from']
+    msg['To'] = ', '.join(sink['to']) if isinstance(sink['to'], list) else sink['to']
+    msg.set_content(_alert_text(alerts))
+    with smtplib.SMTP(sink['host'], int(sink.get('port', 587)), timeout=timeout) as smtp:
+        if sink.get('starttls', True):
+            smtp.starttls()
+        if sink.get('username'):
+            smtp.login(sink['username'], os.environ.get(sink.get('password_env', ''), ''))
+        smtp.send_message(msg)
+
+SINK_TYPES = {'webhook': send_webhook, 'email': send_email}
+
+def deliver(alerts, sinks):
+    """모든 싱크로 전송 → {싱크 이름: 오류 메시지 또는 None}"""
+    results = {}
+    for i, sink in enumerate(sinks):
+        name = sink.get('name', f"{sink['type']}{i}")
+        try:
+            SINK_TYPES[sink['type']](sink, alerts)
+            results[name] = None
+        except Exception as e:
+            results[name] = str(e)
+    return results
+
+def run_alerts(df, rules, sinks, state, risk_rules=None, detectors=None, specs=None,
+               now=None, max_per_run=MAX_ALERTS_PER_RUN, dry_run=False):
+    """새 행 평가 → 중복 제거/속도 제한 → 전송 → 상태 갱신. (보낸 알림, 억제된 알림, 전송 결과) 반환
+
+    싱크가 없거나 모든 싱크 전송이 실패하면 보낸 알림은 없고, 알림은 state['pending']에 남겨
+    다음 실행에서 다시 보낸다. dry_run이면 보낼 알림을 그대로 반환한다.
+    """
+    alerts = evaluate_rules(df, rules, state.get('last_date'), risk_rules, detectors, specs)
+    send, suppressed = throttle(alerts, rules, state, now, max_per_run)
+    batch = state['pending'] + send
+    results = {}
+    if batch and not dry_run:
+        results = deliver(batch, sinks)
+        delivered = any(err is None for err in results.values())
+        state['pending'] = [] if delivered else batch[-MAX_PENDING:]
+        if not delivered:
+            batch = []
+    state['last_date'] = df.index[-1].strftime('%Y-%m-%d')
+    return batch, suppressed, results
+
+# ============================================================
+# 로컬 웹훅 stand-in (싱크 설정 시험용)
+# ============================================================
+def local_webhook(port=0, host='127.0.0.1'):
+    """받은 JSON을 목록에 쌓는 로컬 HTTP 서버 (백그라운드 스레드) → (서버, 수신 목록)"""
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            received.append(json.loads(body.decode('utf-8')))
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, received
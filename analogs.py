@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+
+# ============================================================
+# 과거 유사 상황 (Analog) 검색 엔진
+# ============================================================
+# 수익률 곡선 / 정책 스프레드 / HY·IG 스프레드 / 연체율로 이루어진 상태 벡터를
+# 전체 이력 기준으로 표준화해 두고, 현재 상태와의 거리로 가장 비슷한 과거 날짜를 찾는다.
+# 표준화 행렬과 이후 변화(forward change)는 데이터 버전별로 한 번만 만든다.
+
+ANALOG_FEATURES = ['YIELD_CURVE', 'POLICY_SPREAD', 'HY_SPREAD', 'IG_SPREAD', 'CC_DELINQ', 'CRE_DELINQ_ALL']
+OUTCOME_COLUMNS = ['HY_SPREAD', 'YIELD_CURVE', 'CC_DELINQ']
+FORWARD_HORIZONS = {'3M': 63, '6M': 126, '12M': 252}
+
+HORIZON_LABELS = {'3M': '3개월', '6M': '6개월', '12M': '12개월'}
+
+def build_analog_index(df, columns=ANALOG_FEATURES, outcomes=OUTCOME_COLUMNS, horizons=FORWARD_HORIZONS):
+    """표준화 상태 행렬 + 이후 변화 행렬 (데이터 버전별 1회 생성)"""
+    columns = [c for c in columns if c in df.columns]
+    outcomes = [c for c in outcomes if c in df.columns]
+
+    X = df[columns].to_numpy(dtype=np.float64)
+    mu = np.nanmean(X, axis=0)
+    sd = np.nanstd(X, axis=0)
+    sd[sd == 0] = 1.0
+    Z = (X - mu) / sd
+    valid = np.isfinite(Z).all(axis=1)
+
+    # 각 날짜 이후 h행 뒤의 값 - 현재 값 (미래가 없으면 NaN)
+    Y = df[outcomes].to_numpy(dtype=np.float64)
+    n = len(Y)
+    forward = {}
+    for name, h in horizons.items():
+        fwd = np.full_like(Y, np.nan)
+        if h < n:
+            fwd[:n - h] = Y[h:] - Y[:n - h]
+        forward[name] = fwd[valid]
+
+    return {
+        'columns': columns,
+        'outcomes': outcomes,
+        'mu': mu,
+        'sd': sd,
+        'Z': np.ascontiguousarray(Z[valid]),
+        'raw': X[valid],
+        'dates': df.index[valid],
+        'forward': forward,
+    }
+
+def standardize_state(index, state):
+    """현재 상태(Series/dict) → 표준화 벡터"""
+    x = np.array([state[c] for c in index['columns']], dtype=np.float64)
+    return (x - index['mu']) / index['sd']
+
+def query_analogs(index, state, k=5, as_of=None, exclude_recent_days=365, min_gap_days=120, weights=None):
+    """현재 상태와 가장 가까운 과거 날짜 k개 (서로 min_gap_days 이상 떨어진 에피소드만)
+
+    as_of 이전 exclude_recent_days 이내 날짜는 제외해 '어제와 비슷하다'는 결과를 피한다.
+    """
+    z0 = standardize_state(index, state)
+    if not np.isfinite(z0).all() or len(index['Z']) == 0:
+        return pd.DataFrame()
+
+    w = np.ones(len(z0)) if weights is None else np.asarray(weights, dtype=np.float64)
+    dist = np.sqrt(((index['Z'] - z0) ** 2 * w).sum(axis=1))
+
+    dates = index['dates']
+    if as_of is not None:
+        cutoff = pd.Timestamp(as_of) - pd.Timedelta(days=exclude_recent_days)
+        dist = np.where(dates.values < cutoff.to_datetime64(), dist, np.inf)
+
+    order = np.argsort(dist, kind='stable')
+    day_numbers = dates.values.astype('datetime64[D]').astype(np.int64)
+    picked = []
+    for pos in order:
+        if not np.isfinite(dist[pos]) or len(picked) >= k:
+            break
+        if all(abs(day_numbers[pos] - day_numbers[p]) >= min_gap_days for p in picked):
+            picked.append(pos)
+
+    rows = []
+    for pos in picked:
+        row = {'date': dates[pos], 'distance': dist[pos]}
+        for j, c in enumerate(index['columns']):
+            row[c] = index['raw'][pos, j]
+        for name, fwd in index['forward'].items():
+            for j, c in enumerate(index['outcomes']):
+                row[f'{c}_{name}'] = fwd[pos, j]
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+def summarize_outcomes(matches, index):
+    """유사 시점들 이후 변화의 중앙값 {('HY_SPREAD', '6M'): 값}"""
+    out = {}
+    if matches.empty:
+        return out
+    for name in index['forward']:
+        for c in index['outcomes']:
+            out[(c, name)] = matches[f'{c}_{name}'].median()
+    return out
+
+def format_analogs_for_prompt(matches, index):
+    """프롬프트용 과거 유사 상황 요약 텍스트"""
+    if matches.empty:
+        return "유사 시점 없음"
+
+    lines = []
+    for _, m in matches.iterrows():
+        state = ", ".join(f"{c} {m[c]:.2f}" for c in index['columns'])
+        after = []
+        for name in index['forward']:
+            parts = [f"{c} {m[f'{c}_{name}']:+.2f}" for c in index['outcomes'] if not pd.isna(m[f'{c}_{name}'])]
+            if parts:
+                after.append(f"{HORIZON_LABELS.get(name, name)} 후 " + ", ".join(parts))
+        lines.append(f"- {m['date'].strftime('%Y-%m-%d')} (거리 {m['distance']:.2f}): {state}"
+                     + (f" → {' / '.join(after)}" if after else ""))
+    return "\n".join(lines)
@@ -0,0 +1,431 @@
+"""매크로 위험 읽기 전용 HTTP API
+
+대시보드와 같은 핵심 함수(build_master_df, assess_macro_risk, determine_scenario, find_inversion_periods)로
+위험 점수/시나리오/정렬된 시리즈를 JSON 또는 Arrow IPC로 제공한다. 응답은 데이터 버전별로 인코딩·압축된
+바이트를 캐시해 두고 보내므로 요청 처리 중 FRED를 호출하지 않는다 (재수집은 refresher.py 백그라운드 스레드).
+
+사용법:
+    FRED_API_KEY=... python api_server.py --port 8080
+    python api_server.py --data macro_master_20250101_1a2b3c4d.csv --port 8080
+
+--data에는 대시보드 '💾 데이터 다운로드'에서 '정렬된 마스터 프레임 (영업일)' / CSV로 받은 파일
+(macro_master_<날짜>_<버전>.csv, 첫 컬럼 date)이나 API의 /export/master?format=csv 응답을 쓴다.
+
+엔드포인트 (GET):
+    /health                                      데이터 버전 / 구성 시각 / 수집 오류
+    /risk                                        최신 위험 점수·등급·경고 + 시나리오 + 최근 급변 감지
+    /risk/history?start=&end=&freq=              날짜별 위험 점수 / 등급 / 시나리오
+    /inversions?start=&end=                      수익률 곡선 역전 구간
+    /series?columns=HY_SPREAD,DGS10&start=&end=&freq=W   정렬된 시리즈 (freq: D / W / M / Q / auto&width=픽셀)
+    /export/<표>?format=parquet|arrow|csv        전체 이력 내보내기 파일 (표: master, native, features, risk, scenario)
+
+형식: ?format=json|arrow 또는 Accept: application/vnd.apache.arrow.stream (표 형태 엔드포인트만)
+압축: Accept-Encoding의 gzip (zstandard 설치 시 zstd 우선)
+캐시: ETag는 데이터 버전 + 경로 + 쿼리. If-None-Match가 같으면 본문 없이 304.
+"""
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl
+
+import numpy as np
+import pandas as pd
+
+from macro_core import (
+    load_risk_config, assess_macro_risk, determine_scenario, find_inversion_periods,
+    risk_score_series, risk_level_series, scenario_series
+)
+from series_registry import load_registry
+from detectors import recent_warnings
+from pyramid import build_pyramid, select_level, DEFAULT_WIDTH_PX
+from exports import EXPORT_TABLES, EXPORT_FORMATS, available_formats, new_export_cache, request_export, export_filename
+
+try:
+    import pyarrow as pa
+except ImportError:  # Arrow 형식 없이 JSON만 제공
+    pa = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ARROW_MIME = 'application/vnd.apache.arrow.stream'
+JSON_MIME = 'application/json'
+RESAMPLE_RULES = {'D': None, 'W': 'W-FRI', 'M': 'MS', 'Q': 'QS'}
+MIN_COMPRESS_BYTES = 1024
+CACHE_ENTRIES = 512
+MAX_AGE_SECONDS = 60
+STREAM_CHUNK_BYTES = 64 * 1024
+
+class ApiError(Exception):
+    """HTTP 오류 응답 (상태 코드 + 메시지)"""
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+# ============================================================
+# 응답 본문 생성 (데이터 버전마다 1회, 이후 캐시)
+# ============================================================
+def _date_range(df, params):
+    """start/end 쿼리로 행 구간 자르기 (복사 없는 view)"""
+    try:
+        start = pd.Timestamp(params['start']) if params.get('start') else None
+        end = pd.Timestamp(params['end']) if params.get('end') else None
+    except ValueError as e:
+        raise ApiError(400, f"날짜 형식 오류: {e}")
+    lo = df.index.searchsorted(start) if start is not None else 0
+    hi = df.index.searchsorted(end, side='right') if end is not None else len(df)
+    return df.iloc[lo:hi]
+
+def _resample(frame, params):
+    freq = (params.get('freq') or 'D').upper()
+    if freq not in RESAMPLE_RULES:
+        raise ApiError(400, f"freq는 {', '.join(RESAMPLE_RULES)} 중 하나여야 합니다")
+    rule = RESAMPLE_RULES[freq]
+    return frame if rule is None or frame.empty else frame.resample(rule).last()
+
+def _num(v):
+    return float(v) if v is not None and np.isfinite(v) else None
+
+def risk_payload(dataset, ctx):
+    """최신 위험도 요약 dict"""
+    df = dataset['df']
+    risk = assess_macro_risk(df, None, ctx['risk_rules'], ctx['risk_levels'])
+    latest = risk['latest']
+    payload = {
+        'as_of': df.index[-1].strftime('%Y-%m-%d'),
+        'score': float(risk['score']),
+        'level': risk['level'],
+        'warnings': risk['warnings'],
+        'scenario': int(determine_scenario(latest['YIELD_CURVE'], latest['POLICY_SPREAD'])),
+        'yield_curve': _num(latest['YIELD_CURVE']),
+        'policy_spread': _num(latest['POLICY_SPREAD']),
+    }
+    if dataset.get('detectors'):
+        payload['breaks'] = recent_warnings(dataset['detectors'], ctx['specs'], df.index[-1])
+    return payload
+
+def risk_history_frame(dataset, params, ctx):
+    """날짜별 위험 점수 / 등급 / 시나리오 DataFrame"""
+    df = _date_range(dataset['df'], params)
+    score = risk_score_series(df, ctx['risk_rules'])
+    frame = pd.DataFrame({
+        'RISK_SCORE': score,
+        'RISK_LEVEL': risk_level_series(score, ctx['risk_levels']),
+        'SCENARIO': scenario_series(df),
+    })
+    return _resample(frame, params)
+
+def inversions_frame(dataset, params):
+    """역전 구간 DataFrame (start, end, days)"""
+    df = _date_range(dataset['df'], params)
+    periods = find_inversion_periods(df['YIELD_CURVE']) if len(df) else []
+    return pd.DataFrame({
+        'start': pd.DatetimeIndex([s for s, _ in periods]),
+        'end': pd.DatetimeIndex([e for _, e in periods]),
+        'days': [(e - s).days for s, e in periods],
+    })
+
+def _pyramid_frame(pyramid, level, daily):
+    """집계 피라미드에서 일간 구간을 덮는 구간들 (resample(...).last()와 같은 값, 마지막 미완성 구간만 일간 값으로)"""
+    lvl = pyramid[level]
+    lo = lvl['index'].searchsorted(daily.index[0])
+    hi = lvl['index'].searchsorted(daily.index[-1], side='right')
+    frame = lvl['last'].iloc[lo:hi].set_axis(lvl['label'][lo:hi], axis=0)
+    if hi < len(lvl['index']) and pyramid['D']['index'][lvl['starts'][hi]] <= daily.index[-1]:
+        frame = pd.concat([frame, daily.iloc[-1:].set_axis(lvl['label'][hi:hi + 1], axis=0)])
+    return frame
+
+def series_frame(dataset, params):
+    """정렬된 시리즈 구간 (columns 생략 시 전체 컬럼, 주/월/분기는 집계 피라미드에서 바로)"""
+    df = dataset['df']
+    columns = [c for c in params.get('columns', '').split(',') if c]
+    unknown = [c for c in columns if c not in df.columns]
+    if unknown:
+        raise ApiError(400, f"알 수 없는 컬럼: {', '.join(unknown)}")
+    frame = _date_range(df, params)
+    freq = (params.get('freq') or 'D').upper()
+    pyramid = dataset.get('pyramid')
+    if freq == 'AUTO':
+        if pyramid is None:
+            raise ApiError(400, "freq=auto는 집계 피라미드가 있는 데이터셋에서만 지원합니다")
+        try:
+            width = int(params.get('width') or DEFAULT_WIDTH_PX)
+        except ValueError:
+            raise ApiError(400, "width는 정수(픽셀)여야 합니다")
+        freq = select_level(pyramid, params.get('start') or None, params.get('end') or None, width)
+    if freq in RESAMPLE_RULES and freq != 'D' and pyramid is not None and not frame.empty:
+        frame = _pyramid_frame(pyramid, freq, frame)
+        return frame[columns] if columns else frame
+    return _resample(frame[columns] if columns else frame, {'freq': freq})
+
+def build_response(dataset, path, params, ctx):
+    """경로 → dict(JSON 전용) 또는 DataFrame(JSON/Arrow) (ctx: 위험 규칙/등급/레지스트리)"""
+    if path == '/health':
+        return {
+            'version': dataset['version'],
+            'built_at': dataset['built_at'].isoformat(timespec='seconds'),
+            'rows': len(dataset['df']),
+            'last_date': dataset['df'].index[-1].strftime('%Y-%m-%d'),
+            'errors': dataset['errors'],
+        }
+    if path == '/risk':
+        return risk_payload(dataset, ctx)
+    if path == '/risk/history':
+        return risk_history_frame(dataset, params, ctx)
+    if path == '/inversions':
+        return inversions_frame(dataset, params)
+    if path == '/series':
+        return series_frame(dataset, params)
+    raise ApiError(404, f"없는 경로: {path}")
+
+# ============================================================
+# 인코딩 / 압축
+# ============================================================
+def encode_json(obj, version):
+    """dict는 그대로, DataFrame은 split 형식 (날짜는 YYYY-MM-DD, NaN은 null)"""
+    if isinstance(obj, pd.DataFrame):
+        frame = obj.copy(deep=False)
+        if isinstance(frame.index, pd.DatetimeIndex):
+            frame.index = frame.index.strftime('%Y-%m-%d')
+        for col in frame.columns:
+            if isinstance(frame[col].dtype, np.dtype) and frame[col].dtype.kind == 'M':
+                frame[col] = frame[col].dt.strftime('%Y-%m-%d')
+        body = frame.to_json(orient='split', double_precision=6)
+        return f'{{"version":"{version}","data":{body}}}'.encode('utf-8')
+    return json.dumps({'version': version, **obj}, ensure_ascii=False, allow_nan=False).encode('utf-8')
+
+def encode_arrow(frame, version):
+    """DataFrame → Arrow IPC stream 바이트 (날짜 인덱스는 date 컬럼)"""
+    if pa is None:
+        raise ApiError(406, "pyarrow가 설치되어 있지 않아 Arrow 형식을 제공할 수 없습니다")
+    if not isinstance(frame, pd.DataFrame):
+        raise ApiError(406, "Arrow 형식은 표 형태 엔드포인트에서만 제공됩니다")
+    if isinstance(frame.index, pd.DatetimeIndex):
+        frame = frame.rename_axis('date').reset_index()
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), b'data_version': version.encode()})
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+def pick_format(params, accept):
+    fmt = (params.get('format') or '').lower()
+    if fmt in ('json', 'arrow'):
+        return fmt
+    if fmt:
+        raise ApiError(400, "format은 json 또는 arrow여야 합니다")
+    return 'arrow' if ARROW_MIME in (accept or '') else 'json'
+
+def pick_encoding(accept_encoding):
+    accepted = {part.split(';')[0].strip().lower() for part in (accept_encoding or '').split(',')}
+    if zstandard is not None and 'zstd' in accepted:
+        return 'zstd'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return 'identity'
+
+def compress(body, encoding):
+    if encoding == 'identity' or len(body) < MIN_COMPRESS_BYTES:
+        return body, 'identity'
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=3).compress(body), 'zstd'
+    return gzip.compress(body, compresslevel=6, mtime=0), 'gzip'
+
+# ============================================================
+# 응답 캐시 (버전 + 경로 + 쿼리 + 형식 + 압축 → 완성된 바이트)
+# ============================================================
+def new_cache(max_entries=CACHE_ENTRIES):
+    return {'entries': OrderedDict(), 'lock': threading.Lock(), 'max_entries': max_entries, 'hits': 0, 'misses': 0}
+
+def make_etag(version, path, params, fmt):
+    query = '&'.join(f"{k}={params[k]}" for k in sorted(params) if k != 'format')
+    digest = hashlib.blake2b(f"{fmt}:{path}?{query}".encode(), digest_size=6).hexdigest()
+    # 압축 방식만 다른 응답은 같은 내용이므로 weak ETag
+    return f'W/"{version}-{digest}"'
+
+def cached_response(cache, dataset, path, params, fmt, encoding, ctx):
+    """(본문, Content-Type, Content-Encoding) - 같은 키는 한 번만 계산"""
+    key = (dataset['version'], path, tuple(sorted(params.items())), fmt, encoding)
+    with cache['lock']:
+        hit = cache['entries'].get(key)
+        if hit is not None:
+            cache['entries'].move_to_end(key)
+            cache['hits'] += 1
+            return hit
+    obj = build_response(dataset, path, params, ctx)
+    if fmt == 'arrow':
+        body, mime = encode_arrow(obj, dataset['version']), ARROW_MIME
+    else:
+        body, mime = encode_json(obj, dataset['version']), JSON_MIME
+    body, applied = compress(body, encoding)
+    entry = (body, mime, applied)
+    with cache['lock']:
+        cache['misses'] += 1
+        cache['entries'][key] = entry
+        while len(cache['entries']) > cache['max_entries']:
+            cache['entries'].popitem(last=False)
+    return entry
+
+# ============================================================
+# HTTP 서버
+# ============================================================
+def make_handler(get_dataset, cache, ctx):
+    """요청 처리기 클래스 (get_dataset은 현재 스냅샷을 즉시 반환하는 함수)"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # keep-alive에서 헤더/본문을 나눠 쓸 때 Nagle + delayed ACK로 요청마다 ~40ms 지연되는 것 방지
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            params = dict(parse_qsl(url.query))
+            path = url.path.rstrip('/') or '/'
+            try:
+                dataset = get_dataset()
+                if path.startswith('/export/'):
+                    self._export(dataset, path[len('/export/'):], params)
+                    return
+                fmt = pick_format(params, self.headers.get('Accept'))
+                etag = make_etag(dataset['version'], path, params, fmt)
+                headers = {
+                    'ETag': etag,
+                    'Cache-Control': f'public, max-age={MAX_AGE_SECONDS}',
+                    'Vary': 'Accept, Accept-Encoding',
+                    'X-Data-Version': dataset['version'],
+                }
+                if etag in [t.strip() for t in self.headers.get('If-None-Match', '').split(',')]:
+                    self._send(304, b'', headers)
+                    return
+                encoding = pick_encoding(self.headers.get('Accept-Encoding'))
+                body, mime, applied = cached_response(cache, dataset, path, params, fmt, encoding, ctx)
+                headers['Content-Type'] = mime if mime == ARROW_MIME else f'{mime}; charset=utf-8'
+                if applied != 'identity':
+                    headers['Content-Encoding'] = applied
+                self._send(200, body, headers)
+            except ApiError as e:
+                self._error(e.status, str(e))
+            except Exception as e:
+                self._error(500, f"{type(e).__name__}: {e}")
+
+        def _export(self, dataset, table, params):
+            """내보내기 파일 (버전별 캐시된 바이트를 나눠서 전송)"""
+            fmt = params.get('format', 'parquet')
+            if table not in EXPORT_TABLES:
+                raise ApiError(404, f"없는 내보내기 표: {table}")
+            if fmt not in available_formats():
+                raise ApiError(400, f"format은 {', '.join(available_formats())} 중 하나여야 합니다")
+            etag = make_etag(dataset['version'], f'/export/{table}', {}, fmt)
+            headers = {'ETag': etag, 'Cache-Control': f'public, max-age={MAX_AGE_SECONDS}',
+                       'X-Data-Version': dataset['version']}
+            if etag in [t.strip() for t in self.headers.get('If-None-Match', '').split(',')]:
+                self._send(304, b'', headers)
+                return
+            try:
+                body = request_export(ctx['exports'], dataset, table, fmt,
+                                      ctx['risk_rules'], ctx['risk_levels']).result()
+            except ValueError as e:
+                raise ApiError(400, str(e))
+            headers['Content-Type'] = EXPORT_FORMATS[fmt]['mime']
+            headers['Content-Disposition'] = f'attachment; filename="{export_filename(dataset, table, fmt)}"'
+            self._send_headers(200, headers, len(body))
+            view = memoryview(body)
+            for start in range(0, len(body), STREAM_CHUNK_BYTES):
+                self.wfile.write(view[start:start + STREAM_CHUNK_BYTES])
+
+        def _send_headers(self, status, headers, length):
+            self.send_response(status)
+            for k, v in headers.items():
+                self.send_header(k, v)
+            # 대시보드 차트(다른 출처 iframe)가 줌 시 일간 구간을 직접 받아 갈 수 있게
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Content-Length', str(length))
+            self.end_headers()
+
+        def _send(self, status, body, headers):
+            self._send_headers(status, headers, len(body))
+            if body:
+                self.wfile.write(body)
+
+        def _error(self, status, message):
+            body = json.dumps({'error': message}, ensure_ascii=False).encode('utf-8')
+            self._send(status, body, {'Content-Type': f'{JSON_MIME}; charset=utf-8'})
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+def serve(get_dataset, specs, host='127.0.0.1', port=8080, risk_rules=None, risk_levels=None):
+    """ThreadingHTTPServer 생성 (serve_forever는 호출 측에서)"""
+    cache = new_cache()
+    ctx = {'specs': specs, 'risk_rules': risk_rules, 'risk_levels': risk_levels, 'exports': new_export_cache()}
+    server = ThreadingHTTPServer((host, port), make_handler(get_dataset, cache, ctx))
+    server.daemon_threads = True
+    server.cache = cache
+    return server
+
+def csv_dataset(path):
+    """마스터 프레임 CSV 내보내기 파일 → 정적 데이터셋 (버전은 파일 내용 해시)"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    df = pd.read_csv(io.BytesIO(raw), index_col=0, parse_dates=True)
+    df = df.drop(columns=['Scenario'], errors='ignore').sort_index()
+    return {
+        'store': None,
+        'df': df,
+        'pyramid': build_pyramid(df),
+        'version': hashlib.blake2b(raw, digest_size=8).hexdigest(),
+        'errors': {},
+        'built_at': pd.Timestamp(os.path.getmtime(path), unit='s'),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="매크로 위험 읽기 전용 HTTP API")
+    parser.add_argument('--data', help="마스터 프레임 CSV 내보내기 파일 (macro_master_*.csv, 없으면 FRED에서 수집 + 백그라운드 갱신)")
+    parser.add_argument('--fred-api-key')
+    parser.add_argument('--start', default='2000-01-01')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    args = parser.parse_args()
+
+    specs, _ = load_registry()
+    risk_rules, risk_levels, _ = load_risk_config()
+
+    if args.data:
+        dataset = csv_dataset(args.data)
+
+        def get_dataset():
+            return dataset
+    else:
+        api_key = args.fred_api_key or os.environ.get('FRED_API_KEY')
+        if not api_key:
+            raise SystemExit("--data 또는 FRED_API_KEY가 필요합니다.")
+        from fredapi import Fred
+        from refresher import start_refresher, get_snapshot
+
+        refresher = start_refresher(Fred(api_key=api_key), specs)
+        get_snapshot(refresher, args.start)
+
+        def get_dataset():
+            # 백그라운드 갱신기가 교체한 최신 스냅샷
+            return refresher['datasets'][args.start]
+
+    server = serve(get_dataset, specs, args.host, args.port, risk_rules, risk_levels)
+    print(f"API: http://{args.host}:{server.server_address[1]}/ (데이터 {get_dataset()['version']})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
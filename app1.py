@@ -1,13 +1,51 @@
 import streamlit as st
+import streamlit.components.v1 as components
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from fredapi import Fred
 from datetime import datetime, timedelta
+import os
 import warnings
 
+from series_registry import (
+    FREQ_LABELS, load_registry, fetched_series, indicator_options, panel_traces,
+    next_expected_release, is_series_due
+)
+from refresher import start_refresher, get_snapshot, request_refresh, add_listener
+from publisher import PUBLISH_DIR, publish_snapshot
+from features import compute_features, latest_features, describe_feature_context, Z_WINDOW
+from macro_core import (
+    assess_macro_risk, determine_scenario, scenario_series as compute_scenario_series, risk_score_series,
+    find_inversion_periods, load_risk_config, load_recession_dates, RECESSIONS_PATH
+)
+from regimes import build_regime_stats, regime_outlook, transition_table, format_regime_for_prompt, END_WITHIN_DAYS
+from leadlag import build_leadlag, pair_curve, leadlag_table, format_leadlag_for_prompt, MAX_LAG_MONTHS
+from eventstudy import build_event_study, event_paths, format_event_study_for_prompt, EVENT_ANCHORS
+from recession import build_recession_model, current_probability, format_recession_for_prompt, HORIZON_MONTHS
+from simulation import run_simulation, format_simulation_for_prompt, SIM_PATHS, SIM_HORIZON_WEEKS, SIM_CHECKPOINTS
+from correlation import build_correlations, snapshot_corr, regime_corr, pair_corr_path, CORR_WINDOW
+from detectors import detector_events, recent_warnings, DETECTOR_LABELS
+from exports import (
+    EXPORT_TABLES, EXPORT_FORMATS, available_formats, new_export_cache, request_export, export_filename
+)
+from analogs import (
+    build_analog_index, query_analogs, summarize_outcomes, format_analogs_for_prompt,
+    HORIZON_LABELS
+)
+from series_store import memory_report, enable_copy_on_write, slice_view, freeze_frame
+from fred_loader import refresh_vintages
+from vintages import build_vintage_index, realtime_frame, as_of_master_df
+from release_lag import registry_release_days, release_master_df, fetched_caps
+from pyramid import pyramid_view, LEVEL_LABELS
+from figure_codec import compact_figure
+from range_nav import (
+    range_frame, add_range_navigation, range_chart_html, set_initial_start, traced_columns, daily_chunks
+)
+
 warnings.filterwarnings('ignore')
+enable_copy_on_write()
 
 # ============================================================
 # 페이지 설정
@@ -153,206 +191,246 @@ SCENARIOS = {
 }
 
 # ============================================================
-# 4. 데이터 수집 함수
+# 4. 시리즈 레지스트리 (series_registry.toml)
 # ============================================================
-@st.cache_data(ttl=3600)
-def fetch_series_with_ffill(series_id, start_date, name=""):
-    """FRED에서 시리즈를 가져오고 forward-fill로 결측치 보정"""
-    try:
-        data = fred.get_series(series_id, observation_start=start_date)
-        if len(data) > 0:
-            data = data.sort_index().ffill()
-            return data
+SERIES_SPECS, DASHBOARD_PANELS = load_registry()
+SERIES_REGISTRY = fetched_series(SERIES_SPECS)
+INDICATOR_CATEGORIES, INDICATOR_MAP = indicator_options(SERIES_SPECS)
+
+@st.cache_resource
+def get_refresher():
+    """프로세스 공용 백그라운드 갱신기 (refresher.py, 시작일별 마지막 성공 스냅샷 + 수집 상태 + 스레드)"""
+    refresher = start_refresher(fred, SERIES_SPECS)
+    if PUBLISH_DIR:
+        add_listener(refresher, publish_dashboard)
+    return refresher
+
+def series_status_table(refresher, history_start):
+    """시리즈별 마지막 관측 / 마지막 수집 / 다음 발표 예상 현황"""
+    state = refresher['fetch_state'].get(history_start, {})
+    dataset = refresher['datasets'].get(history_start)
+    errors = dataset['errors'] if dataset is not None else {}
+    now = pd.Timestamp.now()
+    rows = []
+    
+    for key, spec in SERIES_REGISTRY.items():
+        entry = state.get(key, {'last_fetch': None, 'last_obs': None})
+        last_obs = entry['last_obs']
+        next_release = (next_expected_release(last_obs, spec['freq'], spec['lag_days'])
+                        if last_obs is not None else None)
+        if key in errors:
+            status = '⚠️ 수집 실패 (이전 값 사용)'
+        elif is_series_due(spec, entry, now, force=True):
+            status = '🔄 갱신 대상'
         else:
-            return pd.Series(dtype=float)
-    except Exception as e:
-        st.warning(f"⚠️ {name or series_id} 수집 실패: {e}")
-        return pd.Series(dtype=float)
-
-@st.cache_data(ttl=3600)
-def load_all_series(start_date):
-    """모든 시리즈를 한 번에 수집"""
-    
-    with st.spinner('📡 FRED API에서 데이터 수집 중...'):
-        series_dict = {
-            'DGS10': fetch_series_with_ffill('DGS10', start_date, "10년물 국채"),
-            'DGS2': fetch_series_with_ffill('DGS2', start_date, "2년물 국채"),
-            'T10Y2Y': fetch_series_with_ffill('T10Y2Y', start_date, "장단기 금리차"),
-            'HY_SPREAD': fetch_series_with_ffill('BAMLH0A0HYM2', start_date, "하이일드 스프레드"),
-            'IG_SPREAD': fetch_series_with_ffill('BAMLC0A0CM', start_date, "투자등급 스프레드"),
-            'FEDFUNDS': fetch_series_with_ffill('FEDFUNDS', start_date, "연준 기준금리"),
-            'EFFR': fetch_series_with_ffill('EFFR', start_date, "유효 연방기금금리"),
-            'WALCL': fetch_series_with_ffill('WALCL', start_date, "연준 총자산"),
-            'CC_DELINQ': fetch_series_with_ffill('DRCCLACBS', start_date, "신용카드 연체율"),
-            'CONS_DELINQ': fetch_series_with_ffill('DRCLACBS', start_date, "소비자 대출 연체율"),
-            'AUTO_DELINQ': fetch_series_with_ffill('DROCLACBS', start_date, "오토론 연체율"),
-            'CRE_DELINQ_ALL': fetch_series_with_ffill('DRCRELEXFACBS', start_date, "CRE 연체율"),
-            'CRE_DELINQ_TOP100': fetch_series_with_ffill('DRCRELEXFT100S', start_date, "CRE 연체율(Top100)"),
-            'CRE_DELINQ_SMALL': fetch_series_with_ffill('DRCRELEXFOBS', start_date, "CRE 연체율(기타)"),
-            'RE_DELINQ_ALL': fetch_series_with_ffill('DRSREACBS', start_date, "부동산 연체율"),
-            'CRE_LOAN_AMT': fetch_series_with_ffill('CREACBM027NBOG', start_date, "CRE 대출 총액"),
-        }
-    
-    return series_dict
-
-def build_master_df(series_dict):
-    """10년물 금리를 기준 인덱스로 통합 DataFrame 생성"""
-    base = series_dict['DGS10']
-    df = pd.DataFrame({'DGS10': base})
-    
-    for name, s in series_dict.items():
-        if name == 'DGS10':
-            continue
-        df[name] = s.reindex(df.index, method='ffill')
-    
-    # 파생 지표 계산
-    df['YIELD_CURVE_DIRECT'] = series_dict['T10Y2Y'].reindex(df.index, method='ffill')
-    df['YIELD_CURVE_CALC'] = df['DGS10'] - df['DGS2']
-    df['YIELD_CURVE'] = df['YIELD_CURVE_DIRECT'].fillna(df['YIELD_CURVE_CALC'])
-    df['RATE_GAP'] = df['DGS10'] - df['FEDFUNDS']
-    df['POLICY_SPREAD'] = df['DGS2'] - df['EFFR']
-    
-    return df.dropna(subset=['DGS10'])
+            status = '✅ 최신'
+        rows.append({
+            '지표': spec['name'],
+            'FRED ID': spec['fred_id'],
+            '주기': FREQ_LABELS[spec['freq']],
+            '최근 관측': last_obs.strftime('%Y-%m-%d') if last_obs is not None else '-',
+            '마지막 수집': entry['last_fetch'].strftime('%m-%d %H:%M') if entry['last_fetch'] is not None else '-',
+            '다음 발표 예상': next_release.strftime('%Y-%m-%d') if next_release is not None else '-',
+            '상태': status,
+        })
+    
+    return pd.DataFrame(rows)
 
 # ============================================================
-# 5. 분석 함수들
+# 5. 데이터 수집 함수
 # ============================================================
-def find_inversion_periods(yield_curve_series):
-    """수익률 곡선 역전 구간 탐지"""
-    inversions = []
-    in_inv = False
-    start = None
-    
-    for date, val in yield_curve_series.items():
-        if pd.isna(val):
-            continue
-        if val < 0 and not in_inv:
-            in_inv = True
-            start = date
-        elif val >= 0 and in_inv:
-            inversions.append((start, date))
-            in_inv = False
-    
-    if in_inv:
-        inversions.append((start, yield_curve_series.index[-1]))
-    
-    return inversions
-
-def assess_macro_risk(df):
-    """종합 위험도 평가"""
-    latest = df.iloc[-1]
-    risk_score = 0
-    warnings_ = []
-    
-    # 1) 수익률 곡선
-    yc = latest['YIELD_CURVE']
-    if yc < 0:
-        risk_score += 3
-        warnings_.append("🔴 수익률 곡선 역전 (경기침체 전조)")
-    elif yc < 0.3:
-        risk_score += 1
-        warnings_.append("⚠️ 수익률 곡선 평탄화 (역전 임박)")
-    
-    # 2) 10년물 금리
-    if latest['DGS10'] > 4.5:
-        risk_score += 2
-        warnings_.append("⚠️ 10년물 금리 고점 영역")
-    elif latest['DGS10'] > 4.0:
-        risk_score += 1
-        warnings_.append("💡 10년물 금리 상승 추세")
-    
-    # 3) 하이일드 스프레드
-    hy = latest['HY_SPREAD']
-    if hy > 5.0:
-        risk_score += 3
-        warnings_.append("🔴 하이일드 스프레드 급등")
-    elif hy > 4.5:
-        risk_score += 2
-        warnings_.append("⚠️ 하이일드 스프레드 확대")
-    
-    # 4) 금리 괴리
-    rg = latest['RATE_GAP']
-    if rg > 1.0:
-        risk_score += 2
-        warnings_.append("💧 금리 괴리 과도 확대")
-    elif rg > 0.5:
-        risk_score += 1
-        warnings_.append("💧 금리 괴리 확대")
-    
-    # 5) 신용카드 연체율
-    if 'CC_DELINQ' in df.columns:
-        cc = df['CC_DELINQ'].dropna()
-        if len(cc) > 0:
-            cc_val = cc.iloc[-1]
-            if cc_val > 5.0:
-                risk_score += 3
-                warnings_.append("🔴 신용카드 연체율 >5%")
-            elif cc_val > 3.5:
-                risk_score += 2
-                warnings_.append("🪳 신용카드 연체율 급등")
-    
-    # 6) CRE 연체율
-    if 'CRE_DELINQ_ALL' in df.columns:
-        cre = df['CRE_DELINQ_ALL'].dropna()
-        if len(cre) > 0:
-            cre_val = cre.iloc[-1]
-            if cre_val > 3.0:
-                risk_score += 3
-                warnings_.append("🔴 CRE 연체율 >3%")
-            elif cre_val > 2.0:
-                risk_score += 2
-                warnings_.append("🏢 CRE 연체율 상승")
-    
-    # 7) 오토론 연체율
-    if 'AUTO_DELINQ' in df.columns:
-        au = df['AUTO_DELINQ'].dropna()
-        if len(au) > 0:
-            au_val = au.iloc[-1]
-            if au_val > 3.0:
-                risk_score += 2
-                warnings_.append("🚗 오토론 연체율 >3%")
-            elif au_val > 2.5:
-                risk_score += 1
-                warnings_.append("🚗 오토론 연체율 상승세")
-    
-    # 위험도 등급
-    if risk_score >= 10:
-        level = "🔴 CRITICAL RISK"
-        color = "darkred"
-    elif risk_score >= 7:
-        level = "🔴 HIGH RISK"
-        color = "red"
-    elif risk_score >= 4:
-        level = "🟡 MEDIUM RISK"
-        color = "orange"
-    else:
-        level = "🟢 LOW RISK"
-        color = "green"
-    
-    return {
-        "score": risk_score,
-        "level": level,
-        "color": color,
-        "warnings": warnings_,
-        "latest": latest
+# 사용자 요청은 항상 마지막으로 성공한 스냅샷을 바로 받고 (stale-while-revalidate),
+# 발표 시점이 지난 시리즈의 재수집은 백그라운드 스레드가 FRED 발표 일정에 맞춰 수행한다.
+# 세션 간 공유 데이터셋의 기본 시작일 (이후 기간은 공유 프레임을 view로 잘라 씀)
+HISTORY_START = '2000-01-01'
+
+def freshness_badge(refresher, history_start):
+    """사이드바 신선도 배지 (아이콘, 문구)"""
+    dataset = refresher['datasets'].get(history_start)
+    built = dataset['built_at'] if dataset is not None else None
+    age = '' if built is None else f"{built:%m-%d %H:%M} 기준 ({(pd.Timestamp.now() - built).total_seconds() / 60:,.0f}분 전)"
+    if refresher['refreshing']:
+        return "🔄", f"백그라운드 갱신 중 · 현재 데이터 {age}"
+    failed = dataset['errors'] if dataset is not None else {}
+    if refresher['last_error'] or failed:
+        names = ", ".join(SERIES_REGISTRY[k]['name'] for k in failed)
+        reason = refresher['last_error'] or f"{names} 수집 실패"
+        return "🟠", f"마지막 갱신 실패 ({reason}) · 마지막 정상 데이터 {age}"
+    return "🟢", f"최신 · {age}"
+
+def load_all_series(start_date, force_refresh=False):
+    """마지막으로 성공한 공유 데이터셋을 즉시 반환 (처음 요청된 시작일만 동기 수집)"""
+    refresher = get_refresher()
+    history_start = min(start_date, HISTORY_START)
+    if force_refresh:
+        request_refresh(refresher)
+    
+    dataset = refresher['datasets'].get(history_start)
+    if dataset is None:
+        with st.spinner('📡 FRED API에서 데이터 수집 중...'):
+            dataset = get_snapshot(refresher, history_start, keep=HISTORY_START)
+    
+    return dataset
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def get_feature_store(version, _df, align='observation'):
+    """데이터 버전 / 정렬 방식별 피처 스토어 (전체 이력 기준으로 한 번 계산, 세션 간 공유)"""
+    return freeze_frame(compute_features(_df))
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def get_analog_index(version, _df):
+    """데이터 버전별 과거 유사 상황 검색 인덱스"""
+    return build_analog_index(_df)
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def get_regime_stats(version, _df):
+    """데이터 버전별 시나리오 전이 행렬 / 지속 기간 통계"""
+    return build_regime_stats(_df)
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def get_leadlag(version, _store, _df):
+    """데이터 버전별 지표 쌍 선행·후행 교차상관 (레지스트리 순서)"""
+    return build_leadlag(_store, _df, columns=list(SERIES_SPECS))
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def get_event_study(version, _df):
+    """데이터 버전별 수익률 곡선 역전 이벤트 스터디"""
+    return build_event_study(_df)
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def get_simulation(version, _df, seed, n_paths=SIM_PATHS):
+    """데이터 버전별 위험 점수 / 시나리오 몬테카를로 전망 (고정 시드로 재실행해도 같은 결과)"""
+    return run_simulation(_df, list(SERIES_REGISTRY), RISK_RULES, RISK_LEVELS, n_paths=n_paths, seed=seed)
+
+@st.cache_resource
+def get_export_cache():
+    """프로세스 공용 내보내기 캐시 (데이터 버전 / 표 / 형식마다 백그라운드에서 한 번 생성)"""
+    return new_export_cache()
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def get_range_charts(version, _dataset):
+    """데이터 버전별 전체 이력 기간 이동 차트 HTML (분석 기간과 무관하게 1회 생성, 기간 이동은 브라우저에서)"""
+    df = _dataset['df']
+    chart_df = range_frame(_dataset['pyramid'])
+    risk = assess_macro_risk(df, get_feature_store(version, df), RISK_RULES, RISK_LEVELS)
+    figures = {
+        'dashboard': plot_macro_risk_dashboard(chart_df, find_inversion_periods(df['YIELD_CURVE']), risk, "전체 이력",
+                                               detector_events(_dataset['detectors'])),
+        'scenario': plot_scenario_analysis(chart_df, "전체 이력"),
     }
+    charts = {}
+    for name, fig in figures.items():
+        chunk_url = (f"{RANGE_API_URL.rstrip('/')}/series?columns={','.join(traced_columns(fig))}"
+                     "&start={year}-01-01&end={year}-12-31&format=json") if RANGE_API_URL else None
+        charts[name] = (range_chart_html(add_range_navigation(fig), 'cdn', chunk_url), fig.layout.height)
+    return charts
+
+@st.cache_resource
+def get_correlation_holder():
+    """직전 롤링 상관 상태 (새 날짜만 O(k²)씩 반영)"""
+    return {}
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def get_correlations(version, _df, _store):
+    """데이터 버전별 롤링 / 레짐별 상관 행렬 (일간 변화 기준, 직전 버전과 달라진 날짜부터만 재계산)"""
+    holder = get_correlation_holder()
+    columns = [k for k in SERIES_SPECS if k != 'T10Y2Y']
+    state = build_correlations(_df, columns, previous=holder.get('daily_changes'),
+                               store=_store, previous_store=holder.get('store'))
+    holder['daily_changes'], holder['store'] = state, _store
+    return state
+
+@st.cache_resource
+def get_recession_holder():
+    """직전 경기침체 확률 모델 (새 월이 추가되면 그 월만 재적합)"""
+    return {}
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def get_recession_model(version, _df, _pyramid=None):
+    """데이터 버전별 경기침체 확률 모델 (probit, 확장 구간 재적합 포함, 월평균은 집계 피라미드에서)"""
+    if RECESSIONS is None:
+        return None
+    holder = get_recession_holder()
+    try:
+        model = build_recession_model(_df, RECESSIONS, previous=holder.get('probit'), pyramid=_pyramid)
+    except ValueError:
+        return None
+    holder['probit'] = model
+    return model
+
+@st.cache_resource
+def get_vintage_holder():
+    """직전 ALFRED 발표 이력 수집 결과 (시작일별, 최신 값이 바뀐 시리즈만 다시 수집)"""
+    return {}
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def get_vintage_index(version, _store, history_start):
+    """데이터 버전별 발표 이력 as-of 인덱스 + 당시 발표 기준 프레임 + 수집 오류 + vintage 레코드 (당시 기준 모드를 처음 켤 때 수집)"""
+    holder = get_vintage_holder()
+    state = refresh_vintages(fred, SERIES_SPECS, _store, history_start, previous=holder.get(history_start))
+    holder[history_start] = state
+    # 수정 이력이 없는 월간/분기 시리즈도 관측일이 아니라 추정 발표일부터 알려진 것으로 (처음 수집한 날이 상한)
+    caps = fetched_caps(_store, get_refresher()['fetch_state'].get(history_start))
+    vindex = build_vintage_index(_store, state['records'], registry_release_days(_store, SERIES_SPECS, caps=caps))
+    return vindex, freeze_frame(realtime_frame(vindex)), state['errors'], state['records']
+
+# 발표일 기준 정렬의 발표일 출처
+RELEASE_SOURCES = {
+    'registry': '레지스트리 발표 시차 추정 (기간 종료 + lag_days)',
+    'vintage': 'ALFRED 실제 첫 발표일 (당시 발표 기준 모드에서 이 데이터 버전으로 수집)',
+}
 
-def determine_scenario(yield_curve, policy_spread):
-    """금리 스프레드 기반 시나리오 판별"""
-    inverted = yield_curve < 0
-    easing_expected = policy_spread < 0
-    
-    if inverted and not easing_expected:
-        return 1  # 스태그플레이션
-    elif inverted and easing_expected:
-        return 2  # 침체 경고
-    elif not inverted and not easing_expected:
-        return 3  # 건강한 성장
-    else:
-        return 4  # 정책 전환점
+@st.cache_resource(max_entries=4, show_spinner=False)
+def get_release_frame(version, _store, history_start, source, _records=None):
+    """데이터 버전 / 발표일 출처별 발표일 기준 마스터 프레임 (source='vintage'면 _records는 같은 버전의 get_vintage_index 결과)"""
+    records = _records if source == 'vintage' else None
+    caps = fetched_caps(_store, get_refresher()['fetch_state'].get(history_start))
+    return freeze_frame(release_master_df(_store, SERIES_SPECS, records, caps))
+
+# ============================================================
+# 6. 분석 설정 (위험도 규칙은 macro_core, 보정값은 risk_config.json)
+# ============================================================
+RISK_RULES, RISK_LEVELS, RISK_CONFIG_SOURCE = load_risk_config()
+RECESSIONS = load_recession_dates() if os.path.exists(RECESSIONS_PATH) else None
+
+# 몬테카를로 전망 시드 (같은 데이터 버전이면 항상 같은 결과)
+SIM_SEED = 20240101
+
+# 상단 핵심 지표 (열별 (이름, 컬럼, 단위, 도움말)) - 대시보드와 정적 번들이 같이 사용
+KEY_METRICS = [
+    [("10년물 금리", 'DGS10', '%', None), ("2년물 금리", 'DGS2', '%', None)],
+    [("수익률 곡선", 'YIELD_CURVE', '%p', "10Y-2Y 스프레드. 음수면 역전(침체 신호)"), ("연준 기준금리", 'FEDFUNDS', '%', None)],
+    [("하이일드 스프레드", 'HY_SPREAD', '%', None), ("투자등급 스프레드", 'IG_SPREAD', '%', None)],
+    [("신용카드 연체율", 'CC_DELINQ', '%', None), ("CRE 연체율", 'CRE_DELINQ_ALL', '%', None)],
+]
+
+RISK_COLORS = {
+    "🔴 CRITICAL RISK": "darkred",
+    "🔴 HIGH RISK": "red",
+    "🟡 MEDIUM RISK": "orange",
+    "🟢 LOW RISK": "green"
+}
+
+# 브라우저 기간 이동 차트가 줌 시 일간 데이터를 받아 올 api_server.py 주소 (없으면 최근 2년만 일간)
+RANGE_API_URL = os.environ.get("MACRO_API_URL")
+
+# 정적 번들(publisher.py)에 싣는 기본 화면 기간 (사이드바 기본값 "최근 2년")
+PUBLISH_LOOKBACK_DAYS = 730
+
+# 역전 이벤트 스터디 요약을 프롬프트에 넣을 지표
+EVENT_PROMPT_COLUMNS = ['HY_SPREAD', 'IG_SPREAD', 'FEDFUNDS', 'CC_DELINQ', 'CRE_DELINQ_ALL']
+
+# AI 프롬프트에 넣을 선행·후행 관계 (선행 후보, 후행 후보)
+LEADLAG_PROMPT_PAIRS = [
+    ('YIELD_CURVE', 'HY_SPREAD'),
+    ('YIELD_CURVE', 'CC_DELINQ'),
+    ('HY_SPREAD', 'CC_DELINQ'),
+    ('HY_SPREAD', 'CRE_DELINQ_ALL'),
+    ('FEDFUNDS', 'CC_DELINQ'),
+]
 
 # ============================================================
-# 6. Gemini AI 분석 함수들
+# 7. Gemini AI 분석 함수들
 # ============================================================
 def extract_section(text, section_name):
     """텍스트에서 특정 섹션 추출"""
@@ -380,7 +458,7 @@ def extract_section(text, section_name):
     except Exception:
         return None
 
-def generate_market_summary(df, risk_info, scenario_info):
+def generate_market_summary(df, risk_info, scenario_info, regime_text=None, recession_text=None):
     """메인 대시보드용 간결한 AI 시장 분석 요약"""
     if not GEMINI_AVAILABLE:
         return {
@@ -402,6 +480,12 @@ def generate_market_summary(df, risk_info, scenario_info):
 - 종합 위험도: {risk_info['level']}
 - 현재 시나리오: {scenario_info['title']}
 
+## 시나리오 지속/전환 통계 (전체 이력 기준):
+{regime_text or "데이터 없음"}
+
+## 경기침체 확률 모델:
+{recession_text or "데이터 없음"}
+
 ## 요청사항 (각 항목을 **2-3문장**으로 간결하게):
 
 ### 1. MARKET_STATUS (현재 시장 상황)
@@ -588,20 +672,19 @@ def generate_comprehensive_analysis(df, risk_info, depth="기본"):
             return "⚠️ API 할당량 초과. 잠시 후 다시 시도하세요."
         return f"⚠️ AI 분석 생성 중 오류: {str(e)}"
 
-def generate_comprehensive_analysis_deep_dive(df, risk_info):
+def generate_comprehensive_analysis_deep_dive(df, risk_info, features=None, analogs_text=None, regime_text=None,
+                                              leadlag_text=None, event_text=None, recession_text=None, simulation_text=None):
     """종합 AI 분석 - 딥다이브 모드"""
     if not GEMINI_AVAILABLE:
         return "⚠️ Gemini API가 설정되지 않았습니다."
     
     latest = df.iloc[-1]
     
-    # 추가 통계 계산
-    if len(df) >= 30:
-        yc_30d_change = latest['YIELD_CURVE'] - df['YIELD_CURVE'].iloc[-30]
-        hy_30d_change = latest['HY_SPREAD'] - df['HY_SPREAD'].iloc[-30]
-    else:
-        yc_30d_change = 0
-        hy_30d_change = 0
+    # 추가 통계 (피처 스토어)
+    if features is None:
+        features = compute_features(df[['YIELD_CURVE', 'HY_SPREAD']])
+    yc_30d_change = np.nan_to_num(latest_features(features, 'YIELD_CURVE').get('CHG30', 0.0))
+    hy_30d_change = np.nan_to_num(latest_features(features, 'HY_SPREAD').get('CHG30', 0.0))
     
     # 연체율 데이터 수집
     delinq_data = ""
@@ -630,11 +713,13 @@ def generate_comprehensive_analysis_deep_dive(df, risk_info):
 
 ### 수익률 곡선 & 스프레드:
 - 수익률 곡선(10Y-2Y): {latest['YIELD_CURVE']:.2f}%p (30일 변화: {yc_30d_change:+.2f}%p)
+  - {describe_feature_context(features, 'YIELD_CURVE', '%p')}
 - 금리 괴리(10Y-FFR): {latest['RATE_GAP']:.2f}%p
 - 정책 스프레드(2Y-EFFR): {latest['POLICY_SPREAD']:.2f}%p
 
 ### 신용 시장:
 - 하이일드 스프레드: {latest['HY_SPREAD']:.2f}% (30일 변화: {hy_30d_change:+.2f}%)
+  - {describe_feature_context(features, 'HY_SPREAD', '%')}
 - 투자등급 스프레드: {latest['IG_SPREAD']:.2f}%
 
 ### 연체율 현황:
@@ -645,6 +730,24 @@ def generate_comprehensive_analysis_deep_dive(df, risk_info):
 - 리스크 점수: {risk_info['score']}/20
 - 경고 신호: {len(risk_info['warnings'])}개
 
+### 경기침체 확률 모델 (probit, NBER 경기침체 일자 기준):
+{recession_text or "데이터 없음"}
+
+### 향후 6개월 몬테카를로 전망 (위험 점수 / 시나리오):
+{simulation_text or "데이터 없음"}
+
+### 과거 유사 상황 (상태 벡터 최근접 시점과 이후 변화):
+{analogs_text or "데이터 없음"}
+
+### 시나리오 레짐 지속/전환 통계 (전체 이력 기준):
+{regime_text or "데이터 없음"}
+
+### 측정된 선행·후행 관계 (12개월 변화 기준 교차상관 최대 시차):
+{leadlag_text or "데이터 없음"}
+
+### 과거 수익률 곡선 역전 이후 지표 경로 (이벤트 스터디):
+{event_text or "데이터 없음"}
+
 ## 딥다이브 분석 요청:
 
 ### 1. 거시경제 환경 심층 분석 (7-10문장)
@@ -755,33 +858,14 @@ def generate_comprehensive_analysis_deep_dive(df, risk_info):
             return "⚠️ API 할당량 초과. 잠시 후 다시 시도하세요."
         return f"⚠️ AI Deep Dive 분석 생성 중 오류: {str(e)}"
 
-def generate_indicator_analysis(df, indicator_name, depth="기본"):
+def generate_indicator_analysis(df, indicator_name, depth="기본", features=None, analogs_text=None, regime_text=None):
     """개별 지표 AI 분석 - 전체 지표 포함"""
     if not GEMINI_AVAILABLE:
         return "⚠️ Gemini API가 설정되지 않았습니다."
     
     latest = df.iloc[-1]
     
-    indicator_map = {
-        "수익률곡선": ("YIELD_CURVE", "%p", "수익률 곡선 (10Y-2Y)"),
-        "10년물금리": ("DGS10", "%", "10년물 국채 금리"),
-        "2년물금리": ("DGS2", "%", "2년물 국채 금리"),
-        "연준기준금리": ("FEDFUNDS", "%", "연준 기준금리 (FEDFUNDS)"),
-        "유효연방기금금리": ("EFFR", "%", "유효 연방기금금리 (EFFR)"),
-        "금리괴리": ("RATE_GAP", "%p", "금리 괴리 (10Y - FEDFUNDS)"),
-        "정책스프레드": ("POLICY_SPREAD", "%p", "정책 스프레드 (2Y - EFFR)"),
-        "하이일드스프레드": ("HY_SPREAD", "%", "하이일드 스프레드"),
-        "투자등급스프레드": ("IG_SPREAD", "%", "투자등급 스프레드"),
-        "연준총자산": ("WALCL", "B", "연준 총자산 (WALCL)"),
-        "신용카드연체율": ("CC_DELINQ", "%", "신용카드 연체율"),
-        "소비자연체율": ("CONS_DELINQ", "%", "소비자 대출 연체율"),
-        "오토연체율": ("AUTO_DELINQ", "%", "오토론 연체율"),
-        "CRE연체율": ("CRE_DELINQ_ALL", "%", "상업용 부동산(CRE) 연체율"),
-        "부동산연체율": ("RE_DELINQ_ALL", "%", "부동산 대출 연체율"),
-        "CRE대출총액": ("CRE_LOAN_AMT", "B", "CRE 대출 총액")
-    }
-    
-    col, unit, display = indicator_map.get(indicator_name, ("DGS10", "%", indicator_name))
+    col, unit, display = INDICATOR_MAP.get(indicator_name, ("DGS10", "%", indicator_name))
     
     if col not in df.columns:
         return f"⚠️ {display} 데이터가 없습니다."
@@ -792,21 +876,22 @@ def generate_indicator_analysis(df, indicator_name, depth="기본"):
     
     val = val_series.iloc[-1]
     
-    if len(val_series) >= 7:
-        change_7d = ((val_series.iloc[-1] - val_series.iloc[-7]) / val_series.iloc[-7]) * 100
-    else:
-        change_7d = 0
-    
-    if len(val_series) >= 30:
-        change_30d = ((val_series.iloc[-1] - val_series.iloc[-30]) / val_series.iloc[-30]) * 100
-    else:
-        change_30d = 0
+    # 변화율/이동평균/z-score/백분위는 피처 스토어에서 조회
+    if features is None:
+        features = compute_features(df[[col]])
+    feat = latest_features(features, col)
+    change_7d = np.nan_to_num(feat.get('PCT7', 0.0))
+    change_30d = np.nan_to_num(feat.get('PCT30', 0.0))
     
     ma_info = ""
-    if f"{col}_MA7" in df.columns:
-        ma7 = df[f"{col}_MA7"].dropna().iloc[-1] if len(df[f"{col}_MA7"].dropna()) > 0 else val
-        ma30 = df[f"{col}_MA30"].dropna().iloc[-1] if len(df[f"{col}_MA30"].dropna()) > 0 else val
-        ma_info = f"\n- MA7: {ma7:.2f}{unit}, MA30: {ma30:.2f}{unit}"
+    if not pd.isna(feat.get('MA7', np.nan)):
+        ma_info = f"\n- MA7: {feat['MA7']:.2f}{unit}, MA30: {feat['MA30']:.2f}{unit}"
+    if not pd.isna(feat.get(f'Z{Z_WINDOW}', np.nan)):
+        ma_info += f"\n- 1년 z-score: {feat[f'Z{Z_WINDOW}']:+.2f}"
+    if not pd.isna(feat.get('PCTL', np.nan)):
+        ma_info += f"\n- 역사적 백분위: {feat['PCTL']:.0f}% (데이터 전체 기간 기준)"
+    if not pd.isna(feat.get('CHG90', np.nan)):
+        ma_info += f"\n- 90일 변화: {feat['CHG90']:+.2f}{unit}"
     
     prompt = f"""
 {display} 지표를 깊이 분석해주세요. 한국어로 답변하세요.
@@ -816,6 +901,12 @@ def generate_indicator_analysis(df, indicator_name, depth="기본"):
 - 7일 변화율: {change_7d:+.1f}%
 - 30일 변화율: {change_30d:+.1f}%{ma_info}
 
+## 과거 유사 상황 (수익률 곡선·정책 스프레드·스프레드·연체율 상태가 가장 비슷했던 시점과 이후 변화):
+{analogs_text or "데이터 없음"}
+
+## 현재 시나리오 레짐 지속/전환 통계:
+{regime_text or "데이터 없음"}
+
 ## 분석 깊이: {depth}
 - '요약': 각 항목 1-2문장
 - '기본': 각 항목 2-3문장
@@ -925,62 +1016,107 @@ def generate_chat_response(df, risk_info, user_question, history):
         return f"⚠️ 응답 생성 중 오류: {str(e)}"
 
 # ============================================================
-# 7. 차트 생성 함수들
+# 7-1. 정적 스냅샷 발행 (publisher.py)
 # ============================================================
-def plot_macro_risk_dashboard(df, inversion_periods, risk, period_name):
-    """5개 패널 메인 대시보드"""
-    fig = make_subplots(
-        rows=5, cols=1,
-        subplot_titles=(
-            '🔴 수익률 곡선 (10Y-2Y) & 역전 구간',
-            '💧 단·장기 금리 & 기준금리',
-            '⚖️ 금리 괴리 (10Y - FEDFUNDS)',
-            '🪳 신용 스프레드 (High Yield & IG)',
-            '🪳 연체율 (신용카드 / 소비자 / 오토 / CRE)'
-        ),
-        vertical_spacing=0.06,
-        row_heights=[0.22, 0.2, 0.18, 0.18, 0.22]
-    )
-    
-    # 1) 수익률 곡선
-    fig.add_trace(
-        go.Scatter(x=df.index, y=df['YIELD_CURVE'], name='10Y-2Y',
-                   line=dict(color='darkred', width=2.5),
-                   fill='tozeroy', fillcolor='rgba(139,0,0,0.15)'),
-        row=1, col=1
-    )
-    fig.add_hline(y=0, line_dash="dash", line_color="black", row=1, col=1)
-    for start, end in inversion_periods:
-        fig.add_vrect(x0=start, x1=end, fillcolor="rgba(255,0,0,0.25)",
-                      layer="below", line_width=0, row=1, col=1)
+def publish_dashboard(history_start, dataset):
+    """새 데이터 버전마다 기본 화면을 정적 번들로 발행 (갱신기 리스너 - 백그라운드 스레드, AI 요약은 버전당 1회)"""
+    if history_start != HISTORY_START:
+        return
+    start_date = (pd.Timestamp.now() - pd.Timedelta(days=PUBLISH_LOOKBACK_DAYS)).strftime('%Y-%m-%d')
+    period_name = "최근 2년"
+    df = slice_view(dataset, start_date)
+    if df.empty:
+        return
+    latest = df.iloc[-1]
+    features = get_feature_store(dataset['version'], dataset['df']).loc[df.index[0]:]
+    risk = assess_macro_risk(df, features, RISK_RULES, RISK_LEVELS)
+    risk['warnings'].extend(recent_warnings(dataset['detectors'], SERIES_SPECS, df.index[-1]))
+    scenario_num = determine_scenario(latest['YIELD_CURVE'], latest['POLICY_SPREAD'])
+    scenario_info = SCENARIOS[scenario_num]
     
-    # 2) 금리
-    fig.add_trace(go.Scatter(x=df.index, y=df['DGS10'], name='10Y', line=dict(color='blue', width=2)), row=2, col=1)
-    fig.add_trace(go.Scatter(x=df.index, y=df['DGS2'], name='2Y', line=dict(color='orange', width=2)), row=2, col=1)
-    fig.add_trace(go.Scatter(x=df.index, y=df['FEDFUNDS'], name='FFR', line=dict(color='green', width=2)), row=2, col=1)
+    summary = None
+    if GEMINI_AVAILABLE:
+        regime_stats = get_regime_stats(dataset['version'], dataset['df'])
+        regime_text = format_regime_for_prompt(regime_outlook(regime_stats),
+                                               {sn: info['title'] for sn, info in SCENARIOS.items()})
+        recession_model = get_recession_model(dataset['version'], dataset['df'], dataset['pyramid'])
+        recession_text = format_recession_for_prompt(recession_model, latest) if recession_model else None
+        summary = generate_market_summary(df, risk, scenario_info, regime_text, recession_text)
+    
+    snapshot = {
+        'version': dataset['version'],
+        'as_of': f"{df.index[-1]:%Y-%m-%d}",
+        'period_name': period_name,
+        'published_at': f"{pd.Timestamp.now():%Y-%m-%d %H:%M}",
+        'metrics': [{'label': label, 'column': col, 'unit': unit,
+                     'value': None if pd.isna(latest.get(col, np.nan)) else round(float(latest[col]), 4)}
+                    for metrics in KEY_METRICS for label, col, unit, _ in metrics],
+        'risk': {'level': risk['level'], 'score': risk['score'], 'max_score': 20,
+                 'color': RISK_COLORS.get(risk['level'], 'gray'), 'warnings': risk['warnings']},
+        'scenario': {'number': scenario_num, **scenario_info},
+        'summary': summary,
+    }
+    # 차트는 전체 이력 기간 이동 차트 (처음엔 최근 2년, 확대하면 번들 안 연도별 일간 파일을 지연 로딩)
+    full = dataset['df']
+    chart_df = range_frame(dataset['pyramid'])
+    figures = {
+        'dashboard': plot_macro_risk_dashboard(chart_df, find_inversion_periods(full['YIELD_CURVE']), risk, "전체 이력",
+                                               detector_events(dataset['detectors'])),
+        'scenario': plot_scenario_analysis(chart_df, "전체 이력"),
+    }
+    columns = [c for fig in figures.values() for c in traced_columns(fig)]
+    for fig in figures.values():
+        add_range_navigation(fig)
+    publish_snapshot(PUBLISH_DIR, snapshot, figures, chunks=daily_chunks(full, columns, dataset['version']),
+                     initial_start=start_date)
+
+# ============================================================
+# 8. 차트 생성 함수들
+# ============================================================
+def plot_macro_risk_dashboard(df, inversion_periods, risk, period_name, breaks=None):
+    """레지스트리 패널 기반 메인 대시보드 (breaks: 변화점 감지 이벤트 DataFrame)"""
+    panels = [(panel, [m for m in members if m['key'] in df.columns])
+              for panel, members in panel_traces(SERIES_SPECS, DASHBOARD_PANELS)]
+    panels = [(panel, members) for panel, members in panels if members]
     
-    # 3) 금리 괴리
-    fig.add_trace(
-        go.Scatter(x=df.index, y=df['RATE_GAP'], name='10Y-FFR',
-                   line=dict(color='purple', width=2),
-                   fill='tozeroy', fillcolor='rgba(128,0,128,0.1)'),
-        row=3, col=1
+    fig = make_subplots(
+        rows=len(panels), cols=1,
+        subplot_titles=tuple(panel['title'] for panel, _ in panels),
+        vertical_spacing=min(0.06, 0.3 / max(len(panels), 1)),
+        row_heights=[panel['height'] for panel, _ in panels]
     )
     
-    # 4) 스프레드
-    fig.add_trace(go.Scatter(x=df.index, y=df['HY_SPREAD'], name='HY', line=dict(color='red', width=2)), row=4, col=1)
-    fig.add_trace(go.Scatter(x=df.index, y=df['IG_SPREAD'], name='IG', line=dict(color='cyan', width=2)), row=4, col=1)
-    
-    # 5) 연체율
-    if 'CC_DELINQ' in df:
-        fig.add_trace(go.Scatter(x=df.index, y=df['CC_DELINQ'], name='카드', mode='lines+markers', line=dict(color='red', width=2)), row=5, col=1)
-    if 'AUTO_DELINQ' in df:
-        fig.add_trace(go.Scatter(x=df.index, y=df['AUTO_DELINQ'], name='오토', mode='lines+markers', line=dict(color='green', width=2)), row=5, col=1)
-    if 'CRE_DELINQ_ALL' in df:
-        fig.add_trace(go.Scatter(x=df.index, y=df['CRE_DELINQ_ALL'], name='CRE', mode='lines+markers', line=dict(color='brown', width=2)), row=5, col=1)
+    for row, (panel, members) in enumerate(panels, start=1):
+        for spec in members:
+            trace_kwargs = dict(
+                x=df.index, y=df[spec['key']], name=spec['legend'], meta=spec['key'],
+                line=dict(color=spec.get('color'), width=spec['width'])
+            )
+            if spec['markers']:
+                trace_kwargs['mode'] = 'lines+markers'
+            if spec['fill']:
+                trace_kwargs['fill'] = 'tozeroy'
+                trace_kwargs['fillcolor'] = spec['fill']
+            fig.add_trace(go.Scatter(**trace_kwargs), row=row, col=1)
+            
+            hits = breaks[breaks['series'] == spec['key']] if breaks is not None else ()
+            if len(hits):
+                fig.add_trace(go.Scatter(
+                    x=hits['date'], y=hits['value'], mode='markers', name=f"{spec['legend']} 급변",
+                    marker=dict(symbol='x', size=9, color='crimson'),
+                    text=[f"{DETECTOR_LABELS[d]} {direction}" for d, direction in zip(hits['detector'], hits['direction'])],
+                    hovertemplate='%{text}: %{y:.2f}<extra></extra>', showlegend=False
+                ), row=row, col=1)
+        
+        if panel['zero_line']:
+            fig.add_hline(y=0, line_dash="dash", line_color="black", row=row, col=1)
+        if panel['inversions']:
+            for start, end in inversion_periods:
+                fig.add_vrect(x0=start, x1=end, fillcolor="rgba(255,0,0,0.25)",
+                              layer="below", line_width=0, row=row, col=1)
     
     fig.update_layout(
-        height=1800,
+        height=360 * len(panels),
         title_text=f"<b>🏦 금융 위험관리 대시보드</b><br><sub>{period_name} | {risk['level']} (점수: {risk['score']}/20)</sub>",
         showlegend=True,
         hovermode='x unified'
@@ -998,13 +1134,13 @@ def plot_scenario_analysis(df, period_name):
     )
     
     # 금리
-    fig.add_trace(go.Scatter(x=df.index, y=df['DGS10'], name='10Y', line=dict(color='blue', width=2)), row=1, col=1)
-    fig.add_trace(go.Scatter(x=df.index, y=df['DGS2'], name='2Y', line=dict(color='orange', width=2)), row=1, col=1)
-    fig.add_trace(go.Scatter(x=df.index, y=df['EFFR'], name='EFFR', line=dict(color='green', width=2)), row=1, col=1)
+    fig.add_trace(go.Scatter(x=df.index, y=df['DGS10'], name='10Y', meta='DGS10', line=dict(color='blue', width=2)), row=1, col=1)
+    fig.add_trace(go.Scatter(x=df.index, y=df['DGS2'], name='2Y', meta='DGS2', line=dict(color='orange', width=2)), row=1, col=1)
+    fig.add_trace(go.Scatter(x=df.index, y=df['EFFR'], name='EFFR', meta='EFFR', line=dict(color='green', width=2)), row=1, col=1)
     
     # 수익률 곡선
     fig.add_trace(
-        go.Scatter(x=df.index, y=df['YIELD_CURVE'], name='10Y-2Y',
+        go.Scatter(x=df.index, y=df['YIELD_CURVE'], name='10Y-2Y', meta='YIELD_CURVE',
                    line=dict(color='purple', width=2),
                    fill='tozeroy', fillcolor='rgba(128,0,128,0.1)'),
         row=2, col=1
@@ -1013,7 +1149,7 @@ def plot_scenario_analysis(df, period_name):
     
     # 정책 스프레드
     fig.add_trace(
-        go.Scatter(x=df.index, y=df['POLICY_SPREAD'], name='2Y-EFFR',
+        go.Scatter(x=df.index, y=df['POLICY_SPREAD'], name='2Y-EFFR', meta='POLICY_SPREAD',
                    line=dict(color='orange', width=2),
                    fill='tozeroy', fillcolor='rgba(255,165,0,0.1)'),
         row=3, col=1
@@ -1029,8 +1165,179 @@ def plot_scenario_analysis(df, period_name):
     
     return fig
 
+def plot_indicator_features(df, features, col, title, unit):
+    """개별 지표 값 + 이동평균 + 1년 z-score"""
+    fig = make_subplots(
+        rows=2, cols=1,
+        subplot_titles=(f'{title} & 이동평균', f'1년 z-score ({Z_WINDOW}일)'),
+        vertical_spacing=0.12,
+        row_heights=[0.65, 0.35]
+    )
+    
+    fig.add_trace(go.Scatter(x=df.index, y=df[col], name=title, line=dict(color='black', width=2)), row=1, col=1)
+    fig.add_trace(go.Scatter(x=features.index, y=features[f'{col}_MA7'], name='MA7', line=dict(color='orange', width=1.5)), row=1, col=1)
+    fig.add_trace(go.Scatter(x=features.index, y=features[f'{col}_MA30'], name='MA30', line=dict(color='blue', width=1.5, dash='dot')), row=1, col=1)
+    
+    fig.add_trace(
+        go.Scatter(x=features.index, y=features[f'{col}_Z{Z_WINDOW}'], name='z-score',
+                   line=dict(color='purple', width=1.5),
+                   fill='tozeroy', fillcolor='rgba(128,0,128,0.1)'),
+        row=2, col=1
+    )
+    for level in (-2, 2):
+        fig.add_hline(y=level, line_dash="dash", line_color="gray", row=2, col=1)
+    
+    fig.update_layout(height=600, yaxis_title=unit, showlegend=True, hovermode='x unified')
+    
+    return fig
+
+def plot_recession_probability(model, recessions, start_date):
+    """경기침체 확률 경로 (전체 표본 적합 / 확장 구간 재적합) + 경기침체 구간 음영"""
+    full = model['prob_full'].loc[start_date:] * 100
+    rt = model['prob_expanding'].loc[start_date:] * 100
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=full.index, y=full, name='전체 표본 적합', line=dict(color='gray', width=1.5, dash='dot')))
+    fig.add_trace(go.Scatter(x=rt.index, y=rt, name='실시간 재현 (확장 구간 재적합)',
+                             line=dict(color='darkred', width=2.5), fill='tozeroy', fillcolor='rgba(139,0,0,0.08)'))
+    for peak, trough in zip(recessions['peak'], recessions['trough']):
+        if trough >= full.index[0]:
+            fig.add_vrect(x0=max(peak, full.index[0]), x1=trough, fillcolor="gray", opacity=0.2, layer="below", line_width=0)
+    fig.add_hline(y=50, line_dash="dash", line_color="red")
+    
+    coef = ", ".join(f"{c} {b:+.2f}" for c, b in model['coef'].items())
+    fig.update_layout(
+        height=380,
+        title_text=f"<b>경기침체 확률 ({model['link']})</b><br><sub>{coef} · 회색: NBER 경기침체</sub>",
+        yaxis=dict(title='확률 (%)', range=[0, 100]),
+        hovermode='x unified'
+    )
+    return fig
+
+def plot_risk_simulation(bands, high_cutoff):
+    """몬테카를로 위험 점수 분위 밴드 + HIGH RISK / 시나리오 2 확률"""
+    fig = make_subplots(
+        rows=2, cols=1,
+        subplot_titles=('위험 점수 분포 (5-95%, 25-75%, 중앙값)', 'HIGH RISK / 시나리오 2 확률'),
+        vertical_spacing=0.15,
+        row_heights=[0.55, 0.45]
+    )
+    x = bands.index
+    for lo, hi, alpha, label in (('q5', 'q95', 0.12, '5-95%'), ('q25', 'q75', 0.25, '25-75%')):
+        fig.add_trace(go.Scatter(x=x, y=bands[hi], line=dict(width=0), showlegend=False, hoverinfo='skip'), row=1, col=1)
+        fig.add_trace(go.Scatter(x=x, y=bands[lo], line=dict(width=0), fill='tonexty',
+                                 fillcolor=f'rgba(220,20,60,{alpha})', name=label, hoverinfo='skip'), row=1, col=1)
+    fig.add_trace(go.Scatter(x=x, y=bands['q50'], name='중앙값', line=dict(color='crimson', width=2.5)), row=1, col=1)
+    fig.add_hline(y=high_cutoff, line_dash="dash", line_color="red", row=1, col=1)
+    
+    for col, name, color, dash in (('p_high', 'HIGH RISK 이상 (해당 주)', 'red', 'solid'),
+                                   ('p_high_ever', 'HIGH RISK 이상 (기간 중 1회 이상)', 'red', 'dot'),
+                                   ('p_s2', '시나리오 2 (해당 주)', 'darkred', 'solid'),
+                                   ('p_s2_ever', '시나리오 2 (기간 중 1회 이상)', 'darkred', 'dot')):
+        fig.add_trace(go.Scatter(x=x, y=bands[col] * 100, name=name, line=dict(color=color, width=2, dash=dash)), row=2, col=1)
+    
+    fig.update_xaxes(title_text='주 (오늘 기준)', row=2, col=1)
+    fig.update_yaxes(title_text='점수', row=1, col=1)
+    fig.update_yaxes(title_text='확률 (%)', range=[0, 100], row=2, col=1)
+    fig.update_layout(height=650, hovermode='x unified')
+    return fig
+
+def plot_risk_history(revised, realtime, levels):
+    """위험 점수 이력: 최신 수정값 기준 vs 당시 발표 기준"""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=revised.index, y=revised, name='최신 수정값 기준', line=dict(color='gray', width=1.5)))
+    fig.add_trace(go.Scatter(x=realtime.index, y=realtime, name='당시 발표 기준', line=dict(color='crimson', width=2)))
+    for cutoff, level, color in levels:
+        if cutoff is not None:
+            fig.add_hline(y=cutoff, line_dash="dot", line_color=color,
+                          annotation_text=level, annotation_position="top left")
+    fig.update_yaxes(title_text='점수')
+    fig.update_layout(height=420, hovermode='x unified')
+    return fig
+
+def plot_corr_heatmap(corr, labels, title):
+    """상관 행렬 히트맵 (-1 ~ 1)"""
+    names = [labels.get(c, c) for c in corr.columns]
+    values = corr.to_numpy()
+    fig = go.Figure(go.Heatmap(
+        z=values, x=names, y=names, zmin=-1, zmax=1, colorscale='RdBu_r', zmid=0,
+        text=np.where(np.isfinite(values), np.char.mod('%.2f', np.nan_to_num(values)), ''),
+        texttemplate='%{text}', textfont=dict(size=9),
+        hovertemplate='%{y} ~ %{x}: %{z:.2f}<extra></extra>'
+    ))
+    fig.update_layout(height=max(500, 32 * len(names)), title_text=title,
+                      xaxis=dict(tickangle=-45), yaxis=dict(autorange='reversed'))
+    return fig
+
+def plot_leadlag_heatmap(leadlag, labels):
+    """지표 쌍별 최대 상관 시차 히트맵 (색: 시차, 숫자: 상관)"""
+    names = [labels.get(c, c) for c in leadlag['columns']]
+    lag = leadlag['peak_lag'].to_numpy()
+    corr = leadlag['peak_corr'].to_numpy()
+    stab = leadlag['stability'].to_numpy()
+    text = np.where(np.isfinite(corr), np.char.mod('%+.2f', np.nan_to_num(corr)), '')
+    
+    fig = go.Figure(go.Heatmap(
+        z=lag, x=names, y=names,
+        zmin=-MAX_LAG_MONTHS, zmax=MAX_LAG_MONTHS, colorscale='RdBu', zmid=0,
+        text=text, texttemplate='%{text}', textfont=dict(size=9),
+        customdata=np.dstack([corr, stab]),
+        hovertemplate='%{y} → %{x}<br>최대 상관 시차: %{z}개월<br>상관: %{customdata[0]:+.2f}'
+                      '<br>구간 안정성: %{customdata[1]:.0%}<extra></extra>',
+        colorbar=dict(title='시차(개월)<br>+: 행 선행')
+    ))
+    fig.update_layout(
+        height=max(500, 32 * len(names)),
+        title_text="<b>선행·후행 히트맵</b><br><sub>색: 교차상관이 가장 큰 시차 (양수 = 행 지표가 열 지표를 선행) · 숫자: 그 시차의 상관</sub>",
+        xaxis=dict(tickangle=-45), yaxis=dict(autorange='reversed')
+    )
+    return fig
+
+def plot_leadlag_curve(curve, title):
+    """두 지표의 시차별 교차상관"""
+    fig = go.Figure(go.Bar(
+        x=curve.index, y=curve.values,
+        marker_color=np.where(curve.values >= 0, 'steelblue', 'indianred'),
+        hovertemplate='시차 %{x}개월: %{y:+.2f}<extra></extra>'
+    ))
+    fig.add_vline(x=0, line_dash="dash", line_color="gray")
+    fig.update_layout(height=320, title_text=title, xaxis_title='시차 (개월, 양수 = 선행 지표가 앞섬)',
+                      yaxis_title='상관', yaxis=dict(range=[-1, 1]))
+    return fig
+
+def plot_event_study(envelope, episodes, title, unit, anchor_label, show_episodes=False, with_current=True):
+    """역전 이벤트 기준 과거 분포(10-90%, 25-75%, 중앙값) + 최근 에피소드 경로 (with_current=False면 겹쳐 그리지 않음)"""
+    fig = go.Figure()
+    x = envelope.index
+    
+    for lo, hi, alpha, label in (('q10', 'q90', 0.12, '10-90%'), ('q25', 'q75', 0.25, '25-75%')):
+        fig.add_trace(go.Scatter(x=x, y=envelope[hi], line=dict(width=0), showlegend=False, hoverinfo='skip'))
+        fig.add_trace(go.Scatter(x=x, y=envelope[lo], line=dict(width=0), fill='tonexty',
+                                 fillcolor=f'rgba(70,130,180,{alpha})', name=label, hoverinfo='skip'))
+    fig.add_trace(go.Scatter(x=x, y=envelope['q50'], name='과거 중앙값', line=dict(color='steelblue', width=2.5)))
+    
+    past = episodes.columns[:-1] if with_current else episodes.columns
+    if show_episodes:
+        for name in past:
+            fig.add_trace(go.Scatter(x=x, y=episodes[name], name=name, line=dict(width=1, dash='dot'), opacity=0.6))
+    
+    if with_current:
+        current = episodes.columns[-1]
+        fig.add_trace(go.Scatter(x=x, y=episodes[current], name=f'최근 에피소드 ({current})',
+                                 line=dict(color='red', width=3)))
+    
+    fig.add_vline(x=0, line_dash="dash", line_color="gray")
+    fig.add_hline(y=0, line_color="lightgray")
+    fig.update_layout(
+        height=480,
+        title_text=f"<b>{title}</b><br><sub>{anchor_label} 월 대비 변화 ({unit})</sub>",
+        xaxis_title=f'{anchor_label} 기준 상대 월', yaxis_title=f'변화 ({unit})',
+        hovermode='x unified'
+    )
+    return fig
+
 # ============================================================
-# 8. 메인 앱
+# 9. 메인 앱
 # ============================================================
 def main():
       
@@ -1062,10 +1369,21 @@ def main():
         period_name = selected_period
     
     st.sidebar.success(f"✅ 기간: {period_name}")
+    range_mode = st.sidebar.toggle(
+        "🧭 차트 기간 이동 (브라우저)", value=False,
+        help="전체 이력 차트를 한 번만 받고 60일/1년/2년/5년/전체 이동과 확대는 브라우저에서 처리합니다 (서버 재실행 없음)")
+    release_mode = st.sidebar.toggle(
+        "📅 발표 시점 기준 정렬", value=False,
+        help="월간/분기 지표를 관측 기간 시작일이 아니라 발표일(기간 종료 + 발표 시차)부터 반영해 위험도 평가와 "
+             "시나리오 분포를 계산합니다 (관측일 기준은 아직 발표되지 않은 값을 앞당겨 씀). 당시 발표 기준을 함께 켜면 "
+             "레지스트리 시차 대신 ALFRED 실제 첫 발표일을 씁니다")
+    pit_mode = st.sidebar.toggle(
+        "⏳ 당시 발표 기준 (point-in-time)", value=False,
+        help="과거 위험 점수와 시나리오 분포를 사후 수정된 최신 값 대신 그날까지 실제로 발표된 값(ALFRED)으로 계산합니다")
     
     if st.sidebar.button("🔄 데이터 새로고침", type="primary"):
-        st.cache_data.clear()
-        st.rerun()
+        st.session_state['force_refresh'] = True
+        st.toast("백그라운드에서 최신 데이터를 수집합니다. 완료되면 다음 새로고침부터 반영됩니다.")
 
     st.sidebar.markdown("---")
     st.sidebar.markdown("### 📚 추가 학습 자료")
@@ -1079,77 +1397,152 @@ def main():
     
     # 데이터 로드
     try:
-        series_dict = load_all_series(start_date)
-        df = build_master_df(series_dict)
+        dataset = load_all_series(start_date, force_refresh=st.session_state.pop('force_refresh', False))
+        df = slice_view(dataset, start_date)
     except Exception as e:
         st.error(f"❌ 데이터 로드 실패: {str(e)}")
         st.stop()
         return
     
+    refresher = get_refresher()
+    history_start = min(start_date, HISTORY_START)
+    icon, freshness = freshness_badge(refresher, history_start)
+    st.sidebar.caption(f"{icon} 데이터 상태: {freshness}")
+    
+    with st.sidebar.expander("📅 시리즈 업데이트 현황", expanded=False):
+        st.dataframe(series_status_table(refresher, history_start), hide_index=True, use_container_width=True)
+        st.caption("분기 연체율은 분기 종료 약 2개월 후, 주간 WALCL은 목요일에 발표됩니다. 발표 예정일이 지난 시리즈는 "
+                   "백그라운드에서 다시 수집되며, 그동안에는 마지막으로 수집에 성공한 데이터가 표시됩니다.")
+    
+    with st.sidebar.expander("💾 세션 메모리", expanded=False):
+        mem = memory_report(dataset['store'], df)
+        shared = np.shares_memory(df.to_numpy(), dataset['df'].to_numpy())
+        st.metric("공유 저장소 (원래 주기, float32)", f"{mem['after_bytes'] / 1024:,.0f} KB",
+                  delta=f"-{(1 - mem['after_bytes'] / mem['before_bytes']) * 100:.0f}% vs 기존", delta_color="inverse")
+        st.caption(f"기존 방식(세션마다 float64 시리즈 + 일간 정렬 프레임): {mem['before_bytes'] / 1024:,.0f} KB · "
+                   f"이 세션 전용 추가 메모리: {0 if shared else mem['view_bytes'] / 1024:,.0f} KB "
+                   f"({'공유 프레임 view' if shared else '복사본'}, {mem['rows']:,}행) · "
+                   f"데이터 버전 {dataset['version']}")
+    
     if df.empty:
         st.error("❌ 데이터가 없습니다.")
         st.stop()
         return
     
     # 분석
+    features = get_feature_store(dataset['version'], dataset['df']).loc[df.index[0]:]
     latest = df.iloc[-1]
     inversion_periods = find_inversion_periods(df['YIELD_CURVE'])
-    risk = assess_macro_risk(df)
+    # 당시 발표 기준 모드: 과거 날짜마다 그날까지 발표된 값(ALFRED vintage)으로 이력을 다시 계산
+    vindex, pit_df, vintage_records = None, None, None
+    if pit_mode:
+        try:
+            with st.spinner("📡 ALFRED 발표 이력 수집 중... (데이터 버전마다 한 번)"):
+                vindex, pit_full, vintage_errors, vintage_records = get_vintage_index(
+                    dataset['version'], dataset['store'], history_start)
+            pit_df = pit_full.iloc[pit_full.index.searchsorted(df.index[0]):]
+            if vintage_errors:
+                names = ", ".join(SERIES_REGISTRY[k]['name'] for k in vintage_errors)
+                st.sidebar.warning(f"⚠️ 발표 이력 수집 실패 ({names}): 해당 지표는 최신 값 기준")
+        except Exception as e:
+            st.sidebar.error(f"❌ 발표 이력 수집 실패: {str(e)}")
+    # 발표 시점 기준 정렬 모드: 위험도 / 시나리오 분포는 그날까지 발표된 값으로 (차트와 지표 카드는 관측일 기준)
+    # 발표일은 이 세션에서 당시 발표 기준 모드로 이 버전의 vintage를 받았을 때만 ALFRED 첫 발표일, 아니면 레지스트리 시차
+    # AI 분석에 넘기는 피처도 위험도와 같은 정렬 기준으로 (차트는 관측일 기준 features)
+    risk_df, risk_features, release_source = df, features, None
+    if release_mode:
+        release_source = 'vintage' if vintage_records else 'registry'
+        release_df = get_release_frame(dataset['version'], dataset['store'], history_start, release_source,
+                                       vintage_records)
+        risk_df = release_df.iloc[release_df.index.searchsorted(df.index[0]):]
+        risk_features = get_feature_store(dataset['version'], release_df, f'release_{release_source}').loc[df.index[0]:]
+    risk = assess_macro_risk(risk_df, risk_features, RISK_RULES, RISK_LEVELS)
+    # 수준 규칙이 못 잡는 급변(스프레드 급등 등)은 변화점 감지 결과로 경고에 추가 (점수는 그대로)
+    risk['warnings'].extend(recent_warnings(dataset['detectors'], SERIES_SPECS, df.index[-1]))
+    breaks = detector_events(dataset['detectors'], since=df.index[0])
+    # 긴 기간 차트는 기간/화면 폭에 맞는 가장 거친 집계 수준(주/월/분기)으로 그림
+    chart_df, chart_level = pyramid_view(dataset['pyramid'], df.index[0])
+    analog_index = get_analog_index(dataset['version'], dataset['df'])
+    analog_matches = query_analogs(analog_index, latest, k=5, as_of=df.index[-1])
+    analogs_text = format_analogs_for_prompt(analog_matches, analog_index)
     
     yc = latest['YIELD_CURVE']
     ps = latest['POLICY_SPREAD']
     scenario_num = determine_scenario(yc, ps)
     scenario_info = SCENARIOS[scenario_num]
+    # 공유 프레임은 읽기 전용이므로 시나리오 이력은 별도 Series로 유지
+    scenario_series = compute_scenario_series(risk_df if pit_df is None else pit_df)
+    regime_stats = get_regime_stats(dataset['version'], dataset['df'])
+    scenario_labels = {sn: info['title'] for sn, info in SCENARIOS.items()}
+    outlook = regime_outlook(regime_stats)
+    regime_text = format_regime_for_prompt(outlook, scenario_labels)
+    leadlag = get_leadlag(dataset['version'], dataset['store'], dataset['df'])
+    leadlag_text = format_leadlag_for_prompt(leadlag, LEADLAG_PROMPT_PAIRS)
+    event_study = get_event_study(dataset['version'], dataset['df'])
+    event_text = format_event_study_for_prompt(event_study, EVENT_PROMPT_COLUMNS)
+    recession_model = get_recession_model(dataset['version'], dataset['df'], dataset['pyramid'])
+    recession_text = format_recession_for_prompt(recession_model, latest) if recession_model else None
+    try:
+        simulation = get_simulation(dataset['version'], dataset['df'], SIM_SEED)
+        simulation_text = format_simulation_for_prompt(simulation)
+    except ValueError:
+        simulation, simulation_text = None, None
     
     # 상단 메트릭
     st.markdown("### 📊 핵심 지표")
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.metric("10년물 금리", f"{latest['DGS10']:.2f}%")
-        st.metric("2년물 금리", f"{latest['DGS2']:.2f}%")
-    
-    with col2:
-        st.metric("수익률 곡선", f"{yc:.2f}%p", 
-                  help="10Y-2Y 스프레드. 음수면 역전(침체 신호)")
-        st.metric("연준 기준금리", f"{latest['FEDFUNDS']:.2f}%")
-    
-    with col3:
-        st.metric("하이일드 스프레드", f"{latest['HY_SPREAD']:.2f}%")
-        st.metric("투자등급 스프레드", f"{latest['IG_SPREAD']:.2f}%")
-    
-    with col4:
-        if not pd.isna(latest.get('CC_DELINQ', np.nan)):
-            st.metric("신용카드 연체율", f"{latest['CC_DELINQ']:.2f}%")
-        if not pd.isna(latest.get('CRE_DELINQ_ALL', np.nan)):
-            st.metric("CRE 연체율", f"{latest['CRE_DELINQ_ALL']:.2f}%")
+    for column, metrics in zip(st.columns(len(KEY_METRICS)), KEY_METRICS):
+        with column:
+            for label, col, unit, help_text in metrics:
+                value = latest.get(col, np.nan)
+                if not pd.isna(value):
+                    st.metric(label, f"{value:.2f}{unit}", help=help_text)
     
     # 종합 위험도
     st.markdown("---")
     st.markdown("### 🚨 종합 위험도 평가")
     
-    risk_color_map = {
-        "🔴 CRITICAL RISK": "darkred",
-        "🔴 HIGH RISK": "red",
-        "🟡 MEDIUM RISK": "orange",
-        "🟢 LOW RISK": "green"
-    }
-    
+    risk_color = RISK_COLORS.get(risk['level'], 'gray')
     st.markdown(
         f"""
-        <div style='padding: 20px; border-radius: 10px; background-color: {risk_color_map.get(risk['level'], 'gray')}20; border-left: 5px solid {risk_color_map.get(risk['level'], 'gray')}'>
+        <div style='padding: 20px; border-radius: 10px; background-color: {risk_color}20; border-left: 5px solid {risk_color}'>
             <h2>{risk['level']}</h2>
             <p style='font-size: 18px;'><strong>리스크 점수:</strong> {risk['score']}/20</p>
         </div>
         """,
         unsafe_allow_html=True
     )
+    if RISK_CONFIG_SOURCE:
+        st.caption(f"⚙️ 보정된 위험도 기준 사용 중: {RISK_CONFIG_SOURCE}")
+    if release_mode:
+        st.caption(f"📅 발표 시점 기준: 월간/분기 지표는 발표일 이후 값만 반영한 점수입니다. "
+                   f"발표일 출처: {RELEASE_SOURCES[release_source]}")
     
     if risk['warnings']:
         st.markdown("**⚠️ 경고 신호:**")
         for w in risk['warnings']:
             st.warning(w)
     
+    if len(breaks):
+        with st.expander(f"🚨 변화점 감지 이력 ({len(breaks)}건, 분석 기간 내)", expanded=False):
+            st.dataframe(pd.DataFrame({
+                '날짜': breaks['date'].dt.strftime('%Y-%m-%d'),
+                '지표': [SERIES_SPECS[k]['name'] for k in breaks['series']],
+                '감지기': [DETECTOR_LABELS[d] for d in breaks['detector']],
+                '방향': breaks['direction'],
+                '값': breaks['value'].round(2),
+            }).iloc[::-1], hide_index=True, use_container_width=True)
+    
+    if risk['context']:
+        with st.expander("📐 평가 지표의 역사적 위치", expanded=False):
+            context_rows = [{
+                '지표': SERIES_SPECS[col]['name'],
+                '현재': latest[col],
+                '1년 z-score': f.get(f'Z{Z_WINDOW}', np.nan),
+                '역사적 백분위(%)': f.get('PCTL', np.nan),
+                '30일 변화': f.get('CHG30', np.nan),
+            } for col, f in risk['context'].items() if col in SERIES_SPECS]
+            st.dataframe(pd.DataFrame(context_rows).round(2), hide_index=True, use_container_width=True)
+    
     # 시나리오
     st.markdown("---")
     st.markdown("### 🎯 시장 시나리오")
@@ -1185,7 +1578,7 @@ def main():
         if auto_analysis or st.button("🚀 AI 분석 실행", type="primary", key="main_ai_analysis_btn"):
             with st.spinner("🧠 Gemini가 시장을 분석하고 있습니다..."):
                 try:
-                    analysis_summary = generate_market_summary(df, risk, scenario_info)
+                    analysis_summary = generate_market_summary(df, risk, scenario_info, regime_text, recession_text)
                     st.session_state['main_ai_analysis'] = analysis_summary
                 except Exception as e:
                     st.error(f"AI 분석 중 오류: {str(e)}")
@@ -1233,35 +1626,307 @@ def main():
     st.markdown("### 📈 위험관리 대시보드")
     
     try:
-        main_chart = plot_macro_risk_dashboard(df, inversion_periods, risk, period_name)
-        st.plotly_chart(main_chart, use_container_width=True)
+        if range_mode:
+            range_charts = get_range_charts(dataset['version'], dataset)
+            html, height = range_charts['dashboard']
+            components.html(set_initial_start(html, f"{df.index[0]:%Y-%m-%d}"), height=height + 40)
+            st.caption("🧭 차트 위 버튼/드래그로 기간을 바꿔도 서버는 다시 계산하지 않습니다. "
+                       + ("확대한 구간은 일간 데이터로 바뀝니다." if RANGE_API_URL else
+                          "최근 2년은 일간, 그 이전은 주간 마지막 값입니다."))
+        else:
+            main_chart = plot_macro_risk_dashboard(chart_df, inversion_periods, risk, period_name, breaks)
+            st.plotly_chart(compact_figure(main_chart), use_container_width=True)
+        if chart_level != 'D' and not range_mode:
+            st.caption(f"📉 차트 해상도: {LEVEL_LABELS[chart_level]} (구간 마지막 값, {len(chart_df):,}점 / 일간 {len(df):,}행) · "
+                       "위험도·경고·역전 구간은 일간 데이터 기준")
     except Exception as e:
         st.error(f"차트 생성 오류: {str(e)}")
         st.exception(e)
     
+    # 경기침체 확률
+    if recession_model is not None:
+        p_now = current_probability(recession_model, latest)
+        st.markdown(f"### 📉 향후 {HORIZON_MONTHS}개월 내 경기침체 확률")
+        c1, c2, c3 = st.columns(3)
+        c1.metric("현재 (전체 표본 계수)", "-" if pd.isna(p_now) else f"{p_now:.1%}")
+        rt = recession_model['prob_expanding'].dropna()
+        if len(rt):
+            c2.metric("실시간 재현 (확장 구간)", f"{rt.iloc[-1]:.1%}",
+                      delta=f"{(rt.iloc[-1] - rt.iloc[-4]) * 100:+.1f}%p (3개월)" if len(rt) > 3 else None,
+                      delta_color="inverse")
+        c3.metric("표본", f"{recession_model['n_obs']}개월", help="레이블이 확정된 월 수 (경기침체 일자: nber_recessions.csv)")
+        try:
+            st.plotly_chart(plot_recession_probability(recession_model, RECESSIONS, df.index[0]), use_container_width=True)
+        except Exception as e:
+            st.error(f"경기침체 확률 차트 오류: {str(e)}")
+    
     # 탭
     st.markdown("---")
-    tab1, tab2, tab3 = st.tabs(["📊 시나리오 분석", "🤖 AI 분석 & 챗봇", "📖 해석 가이드"])
+    tab1, tab_leadlag, tab_corr, tab_event, tab2, tab3 = st.tabs(
+        ["📊 시나리오 분석", "⏱️ 선행·후행", "🔗 상관 구조", "📐 역전 이벤트 스터디", "🤖 AI 분석 & 챗봇", "📖 해석 가이드"])
     
     with tab1:
         st.markdown("### 금리 스프레드 분석")
         
         try:
-            scenario_chart = plot_scenario_analysis(df, period_name)
-            st.plotly_chart(scenario_chart, use_container_width=True)
+            if range_mode:
+                html, height = get_range_charts(dataset['version'], dataset)['scenario']
+                components.html(set_initial_start(html, f"{df.index[0]:%Y-%m-%d}"), height=height + 40)
+            else:
+                scenario_chart = plot_scenario_analysis(chart_df, period_name)
+                st.plotly_chart(compact_figure(scenario_chart), use_container_width=True)
         except Exception as e:
             st.error(f"시나리오 차트 오류: {str(e)}")
         
         # 시나리오 통계
-        df['Scenario'] = df.apply(lambda row: determine_scenario(row['YIELD_CURVE'], row['POLICY_SPREAD']), axis=1)
-        
         st.markdown("### 시나리오 분포")
-        scenario_counts = df['Scenario'].value_counts().sort_index()
+        scenario_counts = scenario_series.value_counts().sort_index()
         
         for sn in [1, 2, 3, 4]:
             count = scenario_counts.get(sn, 0)
             pct = (count / len(df)) * 100 if len(df) > 0 else 0
             st.progress(pct / 100, text=f"{SCENARIOS[sn]['title']}: {count}일 ({pct:.1f}%)")
+        if pit_df is not None:
+            st.caption("⏳ 당시 발표 기준: 날짜마다 그날까지 실제로 발표된 값으로 판별한 분포입니다.")
+        
+        if pit_df is not None:
+            st.markdown("### ⏳ 위험 점수 이력: 당시 발표 기준 vs 최신 수정값")
+            revised_score = risk_score_series(df, RISK_RULES)
+            pit_score = risk_score_series(pit_df, RISK_RULES)
+            gap = revised_score - pit_score
+            c1, c2, c3 = st.columns(3)
+            c1.metric("점수가 달라진 날", f"{(gap != 0).mean():.0%}")
+            c2.metric("평균 차이 (수정값 - 당시)", f"{gap.mean():+.2f}점")
+            c3.metric("수정 이력 반영 지표", f"{len(vindex['revised'])}개",
+                      help=", ".join(SERIES_SPECS[k]['name'] for k in vindex['revised']))
+            st.plotly_chart(compact_figure(plot_risk_history(revised_score, pit_score, RISK_LEVELS)),
+                            use_container_width=True)
+            st.caption("분기 연체율과 연준 자산 등은 발표 후에도 수정됩니다. 당시 발표 기준 점수는 그날 알 수 있었던 값만 씁니다. "
+                       "ALFRED 보관 시작 이전 시점에는 그 지표 값이 없는 것으로 계산됩니다.")
+            
+            default_as_of = max(df.index[0], df.index[-1] - pd.DateOffset(years=1))
+            as_of = st.date_input("🔎 조회 시점 (그날 알려진 값으로 평가)", value=default_as_of.date(),
+                                  min_value=df.index[0].date(), max_value=df.index[-1].date())
+            known = as_of_master_df(vindex, as_of)
+            revised = df.iloc[:df.index.searchsorted(pd.Timestamp(as_of), side='right')]
+            if len(known) and len(revised):
+                col_then, col_now = st.columns(2)
+                for column, frame, label in ((col_then, known, "당시 발표 기준"), (col_now, revised, "최신 수정값 기준")):
+                    r = assess_macro_risk(frame, None, RISK_RULES, RISK_LEVELS)
+                    sn = determine_scenario(frame['YIELD_CURVE'].iloc[-1], frame['POLICY_SPREAD'].iloc[-1])
+                    column.markdown(f"**{label}** ({frame.index[-1]:%Y-%m-%d})")
+                    column.metric("위험도", r['level'], help=f"리스크 점수 {r['score']}")
+                    column.caption(f"시나리오: {SCENARIOS[sn]['title']}")
+                rule_columns = list(dict.fromkeys(rule['column'] for rule in RISK_RULES if rule['column'] in known.columns))
+                st.dataframe(pd.DataFrame([{
+                    '지표': SERIES_SPECS[col]['name'] if col in SERIES_SPECS else col,
+                    '당시 값': known[col].dropna().iloc[-1] if known[col].notna().any() else np.nan,
+                    '최신 수정값': revised[col].dropna().iloc[-1] if revised[col].notna().any() else np.nan,
+                } for col in rule_columns]).round(3), hide_index=True, use_container_width=True)
+            else:
+                st.info("선택한 시점에 발표된 데이터가 없습니다.")
+        
+        # 레짐 전이 / 지속 기간
+        st.markdown("### 🔁 시나리오 전이 & 지속 기간")
+        st.caption("전체 이력의 날짜별 시나리오를 연속 구간으로 묶어 계산한 통계입니다. "
+                   "남은 기간은 같은 시나리오의 과거 완료 구간 중 현재 지속 일수보다 길었던 구간 기준입니다.")
+        if outlook:
+            rem = outlook['remaining']
+            c1, c2, c3, c4 = st.columns(4)
+            c1.metric("현재 지속", f"{outlook['streak']:,}일")
+            c2.metric("남은 기간 (중앙값)", "-" if pd.isna(rem['median']) else f"{rem['median']:,.0f}일",
+                      help=f"표본 {rem['n']}/{rem['n_total']}개 구간")
+            c3.metric(f"{END_WITHIN_DAYS[1]}일 내 종료 확률",
+                      "-" if pd.isna(rem[f'end_within_{END_WITHIN_DAYS[1]}']) else f"{rem[f'end_within_{END_WITHIN_DAYS[1]}']:.0%}")
+            c4.metric("일별 유지 확률", f"{outlook['stay_prob']:.1%}")
+            if rem['n'] == 0:
+                st.info(f"과거에 {outlook['streak']:,}일 넘게 이어진 같은 시나리오 구간이 없습니다 (역사적 최장 기록 경신 중).")
+        
+        short_labels = {sn: f"S{sn}" for sn in SCENARIOS}
+        col_tm, col_dur = st.columns(2)
+        with col_tm:
+            st.markdown("**전환 시 다음 시나리오 확률** (행: 현재 → 열: 다음)")
+            st.dataframe(transition_table(regime_stats, short_labels).apply(
+                lambda col: col.map(lambda p: "-" if pd.isna(p) else f"{p:.0%}")),
+                         use_container_width=True)
+        with col_dur:
+            st.markdown("**시나리오별 과거 지속 기간 (일)**")
+            dur_rows = []
+            for sn, lengths in regime_stats['durations'].items():
+                dur_rows.append({
+                    '시나리오': short_labels[sn],
+                    '구간 수': len(lengths),
+                    '중앙값': np.median(lengths) if len(lengths) else np.nan,
+                    '평균': lengths.mean() if len(lengths) else np.nan,
+                    '최장': lengths.max() if len(lengths) else np.nan,
+                })
+            st.dataframe(pd.DataFrame(dur_rows).round(0), hide_index=True, use_container_width=True)
+        
+        if outlook and not outlook['forward'].empty:
+            st.markdown(f"**{SCENARIOS[outlook['state']]['title']} 이후 변화 분포** (10% / 중앙값 / 90%, 상승 비율)")
+            fwd = outlook['forward'].copy()
+            fwd['기간'] = fwd['horizon'].map(HORIZON_LABELS)
+            fwd['분포'] = fwd.apply(lambda r: f"{r['p10']:+.2f} / {r['median']:+.2f} / {r['p90']:+.2f} ({r['up_ratio']:.0%}↑)", axis=1)
+            st.dataframe(fwd.pivot(index='column', columns='기간', values='분포').reindex(columns=[l for l in HORIZON_LABELS.values() if l in set(fwd['기간'])]),
+                         use_container_width=True)
+        
+        # 몬테카를로 전망
+        st.markdown(f"### 🎲 향후 {SIM_HORIZON_WEEKS // 4}개월 몬테카를로 전망")
+        if simulation is None:
+            st.info("시뮬레이션에 필요한 과거 데이터가 부족합니다.")
+        else:
+            st.caption(f"과거 주간 결합 변화 {simulation['n_samples']:,}개를 {simulation['block']}주 블록으로 부트스트랩한 "
+                       f"{simulation['n_paths']:,}개 경로에 현재 위험 규칙과 시나리오 판정을 적용했습니다.")
+            b = simulation['bands']
+            cols = st.columns(len(SIM_CHECKPOINTS))
+            for c, (name, w) in zip(cols, SIM_CHECKPOINTS.items()):
+                if w in b.index:
+                    c.metric(f"{name} 후 HIGH RISK 이상", f"{b.at[w, 'p_high']:.0%}",
+                             help=f"기간 중 한 번이라도: {b.at[w, 'p_high_ever']:.0%} · 시나리오 2: {b.at[w, 'p_s2']:.0%}")
+            try:
+                st.plotly_chart(plot_risk_simulation(b, simulation['high_cutoff']), use_container_width=True)
+            except Exception as e:
+                st.error(f"시뮬레이션 차트 오류: {str(e)}")
+            scen = simulation['scenarios'].copy()
+            scen.index = [SCENARIOS[sn]['title'] for sn in scen.index]
+            st.dataframe(scen.apply(lambda col: col.map(lambda p: f"{p:.0%}")), use_container_width=True)
+        
+        # 과거 유사 상황
+        st.markdown("### 🔎 과거 유사 상황")
+        st.caption("수익률 곡선·정책 스프레드·HY/IG 스프레드·연체율을 전체 이력 기준으로 표준화해 현재와 가장 가까운 시점 "
+                   "(최근 1년 제외, 서로 120일 이상 떨어진 에피소드)과 그 이후 변화입니다.")
+        if analog_matches.empty:
+            st.info("유사 시점을 찾을 수 없습니다.")
+        else:
+            analog_table = analog_matches.copy()
+            analog_table['date'] = analog_table['date'].dt.strftime('%Y-%m-%d')
+            analog_table = analog_table.rename(columns={'date': '날짜', 'distance': '거리'})
+            for name, label in HORIZON_LABELS.items():
+                analog_table.columns = [c.replace(f'_{name}', f' {label} 후 Δ') for c in analog_table.columns]
+            st.dataframe(analog_table.round(2), hide_index=True, use_container_width=True)
+            
+            medians = summarize_outcomes(analog_matches, analog_index)
+            cols = st.columns(len(HORIZON_LABELS))
+            for c, (name, label) in zip(cols, HORIZON_LABELS.items()):
+                hy = medians.get(('HY_SPREAD', name), np.nan)
+                c.metric(f"{label} 후 HY 스프레드 변화 (중앙값)", "-" if pd.isna(hy) else f"{hy:+.2f}%p")
+    
+    with tab_leadlag:
+        st.markdown("### ⏱️ 지표 간 선행·후행 관계")
+        st.caption(f"각 지표를 원래 주기에서 월 단위로 맞추고 12개월 변화로 바꾼 뒤, 모든 쌍의 ±{MAX_LAG_MONTHS}개월 교차상관을 계산했습니다 "
+                   f"({leadlag['months']}개월, 전체 이력). 구간 안정성은 15년 롤링 구간 {leadlag['n_windows']}개 중 "
+                   "최대 상관 시차가 전체 기간 값과 ±3개월 이내인 비율입니다.")
+        ll_labels = {k: spec['name'] for k, spec in SERIES_SPECS.items()}
+        
+        try:
+            st.plotly_chart(plot_leadlag_heatmap(leadlag, ll_labels), use_container_width=True)
+        except Exception as e:
+            st.error(f"선행·후행 차트 오류: {str(e)}")
+        
+        col_a, col_b = st.columns(2)
+        ll_cols = leadlag['columns']
+        with col_a:
+            lead_col = st.selectbox("선행 후보", ll_cols, format_func=lambda c: ll_labels.get(c, c),
+                                    index=ll_cols.index('HY_SPREAD') if 'HY_SPREAD' in ll_cols else 0)
+        with col_b:
+            lag_col = st.selectbox("후행 후보", ll_cols, format_func=lambda c: ll_labels.get(c, c),
+                                   index=ll_cols.index('CC_DELINQ') if 'CC_DELINQ' in ll_cols else min(1, len(ll_cols) - 1))
+        if lead_col != lag_col:
+            k = leadlag['peak_lag'].at[lead_col, lag_col]
+            r = leadlag['peak_corr'].at[lead_col, lag_col]
+            st.plotly_chart(plot_leadlag_curve(pair_curve(leadlag, lead_col, lag_col),
+                                               f"{ll_labels.get(lead_col, lead_col)} → {ll_labels.get(lag_col, lag_col)}"),
+                            use_container_width=True)
+            if not pd.isna(k):
+                c1, c2, c3 = st.columns(3)
+                c1.metric("최대 상관 시차", f"{int(k):+d}개월")
+                c2.metric("상관", f"{r:+.2f}")
+                c3.metric("구간 안정성", "-" if pd.isna(leadlag['stability'].at[lead_col, lag_col])
+                          else f"{leadlag['stability'].at[lead_col, lag_col]:.0%}")
+        
+        with st.expander("📋 주요 선행 관계 (|상관| ≥ 0.3)", expanded=False):
+            table = leadlag_table(leadlag)
+            table['lead'] = table['lead'].map(lambda c: ll_labels.get(c, c))
+            table['lag'] = table['lag'].map(lambda c: ll_labels.get(c, c))
+            st.dataframe(table.rename(columns={'lead': '선행', 'lag': '후행', 'months': '시차(개월)', 'corr': '상관',
+                                               'stability': '구간 안정성', 'lag_std': '시차 표준편차'}).round(2),
+                         hide_index=True, use_container_width=True)
+    
+    with tab_corr:
+        st.markdown("### 🔗 지표 간 상관 구조")
+        corr_state = get_correlations(dataset['version'], dataset['df'], dataset['store'])
+        corr_labels = {k: spec['name'] for k, spec in SERIES_SPECS.items()}
+        st.caption(f"일간 변화 기준 {CORR_WINDOW}영업일 롤링 상관입니다. 새 날짜가 들어오면 누적 모멘트에 그 행만 더하고 "
+                   "창 밖으로 나간 행을 빼서 갱신합니다. 레짐별 상관은 같은 시나리오였던 날 전체로 계산합니다.")
+        
+        corr_view = st.radio("보기", ["시점별 롤링 상관", "시나리오별 상관"], horizontal=True, key="corr_view")
+        if corr_view == "시점별 롤링 상관":
+            snap_dates = corr_state['snapshot_dates']
+            if not snap_dates:
+                st.info("롤링 상관을 계산할 데이터가 부족합니다.")
+            else:
+                snap_date = st.select_slider("기준 시점", options=snap_dates, value=snap_dates[-1],
+                                             format_func=lambda d: d.strftime('%Y-%m-%d'))
+                st.plotly_chart(plot_corr_heatmap(snapshot_corr(corr_state, snap_dates.index(snap_date)), corr_labels,
+                                                  f"<b>{snap_date:%Y-%m-%d} 기준 {CORR_WINDOW}일 롤링 상관</b>"),
+                                use_container_width=True)
+                
+                col_a, col_b = st.columns(2)
+                c_cols = corr_state['columns']
+                with col_a:
+                    corr_a = st.selectbox("지표 A", c_cols, format_func=lambda c: corr_labels.get(c, c), key="corr_a",
+                                          index=c_cols.index('HY_SPREAD') if 'HY_SPREAD' in c_cols else 0)
+                with col_b:
+                    corr_b = st.selectbox("지표 B", c_cols, format_func=lambda c: corr_labels.get(c, c), key="corr_b",
+                                          index=c_cols.index('DGS10') if 'DGS10' in c_cols else min(1, len(c_cols) - 1))
+                if corr_a != corr_b:
+                    path = pair_corr_path(corr_state, corr_a, corr_b)
+                    fig = go.Figure(go.Scatter(x=path.index, y=path.values, line=dict(color='purple', width=2)))
+                    fig.add_hline(y=0, line_dash="dash", line_color="gray")
+                    fig.update_layout(height=300, yaxis=dict(range=[-1, 1], title='상관'),
+                                      title_text=f"{corr_labels.get(corr_a, corr_a)} ~ {corr_labels.get(corr_b, corr_b)} 롤링 상관")
+                    st.plotly_chart(fig, use_container_width=True)
+        else:
+            regime = st.radio("시나리오", [1, 2, 3, 4], format_func=lambda sn: SCENARIOS[sn]['title'], key="corr_regime")
+            corr_df, n_days = regime_corr(corr_state, regime)
+            if n_days == 0:
+                st.info("해당 시나리오였던 날이 없습니다.")
+            else:
+                st.plotly_chart(plot_corr_heatmap(corr_df, corr_labels, f"<b>{SCENARIOS[regime]['title']}</b> ({n_days:,}일)"),
+                                use_container_width=True)
+    
+    with tab_event:
+        st.markdown("### 📐 수익률 곡선 역전 이벤트 스터디")
+        episodes_list = event_study['episodes']
+        if len(episodes_list) < 2:
+            st.info("비교할 과거 역전 에피소드가 부족합니다.")
+        else:
+            st.caption(f"전체 이력에서 {len(episodes_list)}개 역전 에피소드(90일 이내 재역전은 합치고 20일 미만은 제외)를 찾아 "
+                       "각 지표를 월 단위로 정렬했습니다. 음영은 최근 에피소드를 뺀 과거 에피소드 분포입니다 "
+                       "(역전이 진행 중이면 역전 해소 기준은 해소된 에피소드 전체).")
+            col_ind, col_anchor = st.columns([3, 2])
+            with col_ind:
+                ev_indicator = st.selectbox("지표", list(INDICATOR_MAP), key="event_indicator",
+                                            index=list(INDICATOR_MAP).index('하이일드스프레드') if '하이일드스프레드' in INDICATOR_MAP else 0)
+            with col_anchor:
+                ev_anchor = st.radio("기준 시점", list(EVENT_ANCHORS), format_func=EVENT_ANCHORS.get, horizontal=True)
+            show_episodes = st.checkbox("과거 에피소드 개별 경로 표시", value=False)
+            
+            ev_col, ev_unit, ev_title = INDICATOR_MAP[ev_indicator]
+            if ev_col not in event_study['columns'] or not event_study['stats'][ev_anchor]:
+                st.info(f"{ev_title}: 이벤트 스터디 데이터가 없습니다.")
+            else:
+                envelope, ep_paths = event_paths(event_study, ev_anchor, ev_col)
+                st.plotly_chart(plot_event_study(envelope, ep_paths, ev_title, ev_unit, EVENT_ANCHORS[ev_anchor], show_episodes,
+                                                 with_current=event_study['current'][ev_anchor] is not None),
+                                use_container_width=True)
+                st.dataframe(
+                    pd.DataFrame({
+                        '에피소드 (시작 ~ 해소)': [f"{s:%Y-%m-%d} ~ {e:%Y-%m-%d}" for s, e in episodes_list],
+                        '기간(일)': [(e - s).days for s, e in episodes_list],
+                    }),
+                    hide_index=True, use_container_width=True
+                )
     
     with tab2:
         st.markdown("### 🤖 AI 분석")
@@ -1292,7 +1957,9 @@ def main():
                     try:
                         # 분석 깊이에 따라 다른 함수 호출
                         if comprehensive_depth == "딥다이브":
-                            analysis = generate_comprehensive_analysis_deep_dive(df, risk)
+                            analysis = generate_comprehensive_analysis_deep_dive(df, risk, risk_features, analogs_text, regime_text,
+                                                                                leadlag_text, event_text, recession_text,
+                                                                                simulation_text)
                         else:
                             analysis = generate_comprehensive_analysis(df, risk, depth=comprehensive_depth)
                         
@@ -1339,39 +2006,29 @@ def main():
                 st.markdown("**📊 지표 카테고리**")
                 indicator_category = st.radio(
                     "카테고리",
-                    ["금리", "스프레드", "연체율", "기타"],
+                    list(INDICATOR_CATEGORIES.keys()),
                     horizontal=False,
                     label_visibility="collapsed"
                 )
             
             with col2:
-                if indicator_category == "금리":
-                    indicator = st.selectbox(
-                        "세부 지표",
-                        ["수익률곡선", "10년물금리", "2년물금리", "연준기준금리", "유효연방기금금리"]
-                    )
-                elif indicator_category == "스프레드":
-                    indicator = st.selectbox(
-                        "세부 지표",
-                        ["금리괴리", "정책스프레드", "하이일드스프레드", "투자등급스프레드"]
-                    )
-                elif indicator_category == "연체율":
-                    indicator = st.selectbox(
-                        "세부 지표",
-                        ["신용카드연체율", "소비자연체율", "오토연체율", "CRE연체율", "부동산연체율"]
-                    )
-                else:
-                    indicator = st.selectbox(
-                        "세부 지표",
-                        ["연준총자산", "CRE대출총액"]
-                    )
+                indicator = st.selectbox(
+                    "세부 지표",
+                    INDICATOR_CATEGORIES[indicator_category]
+                )
+            
+            ind_col, ind_unit, ind_title = INDICATOR_MAP[indicator]
+            if ind_col in df.columns:
+                with st.expander("📈 이동평균 / z-score 차트", expanded=False):
+                    st.plotly_chart(plot_indicator_features(df, features, ind_col, ind_title, ind_unit),
+                                    use_container_width=True)
             
             depth = st.select_slider("분석 깊이", ["요약", "기본", "딥다이브"], value="기본")
             
             if st.button("🔍 지표 분석 실행", type="primary", key="indicator_analysis_btn"):
                 with st.spinner(f"🧠 {indicator} 분석 중..."):
                     try:
-                        analysis = generate_indicator_analysis(df, indicator, depth)
+                        analysis = generate_indicator_analysis(df, indicator, depth, risk_features, analogs_text, regime_text)
                         st.session_state['indicator'] = analysis
                         st.session_state['indicator_name'] = indicator
                     except Exception as e:
@@ -1596,13 +2253,32 @@ def main():
     st.markdown("---")
     st.markdown("### 💾 데이터 다운로드")
     
-    csv_data = df.to_csv()
-    st.download_button(
-        "📊 전체 데이터 다운로드 (CSV)",
-        csv_data,
-        f"macro_data_{datetime.now().strftime('%Y%m%d')}.csv",
-        "text/csv"
-    )
+    # 내보내기는 분석 기간과 무관하게 공유 데이터셋 전체 이력 기준 (버전별 1회 생성 후 모든 세션이 재사용)
+    col_table, col_format = st.columns(2)
+    with col_table:
+        export_table = st.selectbox("데이터", list(EXPORT_TABLES), format_func=EXPORT_TABLES.get, key='export_table')
+    with col_format:
+        export_format = st.selectbox("형식", available_formats(), format_func=lambda f: EXPORT_FORMATS[f]['label'],
+                                     key='export_format')
+    
+    future = request_export(get_export_cache(), dataset, export_table, export_format, RISK_RULES, RISK_LEVELS,
+                            get_feature_store(dataset['version'], dataset['df']))
+    if not future.done():
+        st.info("⏳ 내보내기 파일을 백그라운드에서 만드는 중입니다 (데이터 버전마다 한 번). 잠시 후 확인을 누르세요.")
+        st.button("🔄 확인", key='export_check')
+    elif future.exception() is not None:
+        st.error(f"내보내기 생성 실패: {future.exception()}")
+    else:
+        export_bytes = future.result()
+        st.download_button(
+            f"📊 {EXPORT_TABLES[export_table]} 다운로드 ({EXPORT_FORMATS[export_format]['label']}, "
+            f"{len(export_bytes) / 1024:,.0f} KB)",
+            export_bytes,
+            export_filename(dataset, export_table, export_format),
+            EXPORT_FORMATS[export_format]['mime']
+        )
+        st.caption(f"{dataset['df'].index[0]:%Y-%m-%d} ~ {dataset['df'].index[-1]:%Y-%m-%d} 전체 이력 · "
+                   f"데이터 버전 {dataset['version']}")
     
     # 푸터
     st.markdown("---")
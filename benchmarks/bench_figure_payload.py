@@ -0,0 +1,104 @@
+"""차트 페이로드 벤치마크: 텍스트 JSON vs plotly 기본 직렬화 vs 바이너리 + 날짜축 공유 (25년 일간 대시보드)
+
+브라우저 파싱 시간은 node가 있으면 JSON.parse + typed array 복원 시간으로 잰다 (렌더링 시간은 제외).
+
+사용법: python benchmarks/bench_figure_payload.py
+"""
+import gzip
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import warnings
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.io.json import to_json_plotly
+from plotly.subplots import make_subplots
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bench_master_df import make_fixture  # noqa: E402
+from figure_codec import encode_figure  # noqa: E402
+from series_registry import load_registry, panel_traces  # noqa: E402
+from series_store import build_series_store, build_master_df  # noqa: E402
+
+PARSE_SCRIPT = r"""
+const fs = require('fs');
+const T = {f8: Float64Array, f4: Float32Array, i4: Int32Array, i2: Int16Array, i1: Int8Array, u1: Uint8Array};
+function decode(a) { const b = Buffer.from(a.bdata, 'base64'); return new T[a.dtype](b.buffer, b.byteOffset, b.length / T[a.dtype].BYTES_PER_ELEMENT); }
+function walk(o) {
+  if (Array.isArray(o)) { o.forEach(walk); return; }
+  if (o && typeof o === 'object') for (const k in o) { if (o[k] && o[k].bdata) o[k] = decode(o[k]); else walk(o[k]); }
+}
+for (const path of process.argv.slice(2)) {
+  const text = fs.readFileSync(path, 'utf8');
+  let best = Infinity;
+  for (let i = 0; i < 20; i++) {
+    const t0 = process.hrtime.bigint();
+    const p = JSON.parse(text);
+    walk(p);
+    if (p.arrays) { const arrays = p.arrays.map(decode); p.data.forEach(tr => ['x', 'y'].forEach(k => { if (tr[k] && tr[k].ref !== undefined) tr[k] = arrays[tr[k].ref]; })); }
+    best = Math.min(best, Number(process.hrtime.bigint() - t0) / 1e6);
+  }
+  console.log(best.toFixed(2));
+}
+"""
+
+def dashboard_figure(df, specs, panels):
+    """plot_macro_risk_dashboard와 같은 구성 (패널별 시리즈, 모두 같은 일간 날짜축)"""
+    panels = [(panel, [m for m in members if m['key'] in df.columns]) for panel, members in panel_traces(specs, panels)]
+    panels = [(panel, members) for panel, members in panels if members]
+    fig = make_subplots(rows=len(panels), cols=1, subplot_titles=tuple(p['title'] for p, _ in panels))
+    for row, (panel, members) in enumerate(panels, start=1):
+        for spec in members:
+            fig.add_trace(go.Scatter(x=df.index, y=df[spec['key']], name=spec['legend'], meta=spec['key']), row=row, col=1)
+    fig.update_layout(height=360 * len(panels), hovermode='x unified')
+    return fig
+
+def text_json(fig):
+    """plotly 5 방식: 날짜는 ISO 문자열, 값은 십진 문자열 (trace마다 반복)"""
+    spec = fig.to_plotly_json()
+    for trace, tr in zip(fig.data, spec['data']):
+        tr['x'] = list(pd.DatetimeIndex(trace.x).strftime('%Y-%m-%dT%H:%M:%S'))
+        tr['y'] = [None if np.isnan(v) else float(v) for v in np.asarray(trace.y, dtype=np.float64)]
+    return json.dumps(spec, default=str)
+
+def run():
+    df = build_master_df(build_series_store(make_fixture(0)))
+    specs, panels = load_registry()
+    fig = dashboard_figure(df, specs, panels)
+    payloads = {
+        '텍스트 JSON (plotly 5)': text_json(fig),
+        'plotly 기본 to_json': fig.to_json(),
+        '바이너리 + 날짜축 공유': to_json_plotly(encode_figure(fig)),
+    }
+
+    print(f"\n## 25년 일간 대시보드: trace {len(fig.data)}개 x {len(df):,}행")
+    tmp = tempfile.mkdtemp()
+    try:
+        paths = []
+        for i, body in enumerate(payloads.values()):
+            paths.append(os.path.join(tmp, f"p{i}.json"))
+            with open(paths[-1], 'w') as f:
+                f.write(body)
+        parse_ms = [None] * len(paths)
+        if shutil.which('node'):
+            script = os.path.join(tmp, 'parse.js')
+            with open(script, 'w') as f:
+                f.write(PARSE_SCRIPT)
+            out = subprocess.run(['node', script, *paths], capture_output=True, text=True, check=True).stdout.split()
+            parse_ms = [float(v) for v in out]
+        for (name, body), ms in zip(payloads.items(), parse_ms):
+            raw = body.encode('utf-8')
+            parse = f"{ms:7.2f} ms" if ms is not None else "      -"
+            print(f"- {name:22s}: {len(raw) / 1024:8.0f} KB (gzip {len(gzip.compress(raw)) / 1024:6.0f} KB), 파싱 {parse}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+if __name__ == '__main__':
+    warnings.simplefilter('ignore')
+    run()
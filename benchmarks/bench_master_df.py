@@ -0,0 +1,132 @@
+"""build_master_df 벤치마크: 기존 열별 reindex vs 단일 패스 블록 정렬 vs 증분 모드 vs 발표일 기준 정렬
+
+사용법: python benchmarks/bench_master_df.py
+"""
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from series_store import build_series_store, build_master_df, extend_master_df, days_to_index, expand_values  # noqa: E402
+from series_registry import load_registry  # noqa: E402
+from release_lag import registry_release_days, release_master_df  # noqa: E402
+
+CORE_DAILY = ['DGS10', 'DGS2', 'T10Y2Y', 'HY_SPREAD', 'IG_SPREAD', 'EFFR']
+CORE_QUARTERLY = ['CC_DELINQ', 'CONS_DELINQ', 'AUTO_DELINQ', 'CRE_DELINQ_ALL',
+                  'CRE_DELINQ_TOP100', 'CRE_DELINQ_SMALL', 'RE_DELINQ_ALL']
+
+def make_fixture(n_extra=0, start='2000-01-03', end='2025-10-01', seed=0):
+    """FRED와 같은 주기 구성의 합성 시리즈 (n_extra개 추가 시리즈는 주기를 섞어 생성)"""
+    rng = np.random.default_rng(seed)
+    daily = pd.bdate_range(start, end)
+    weekly = pd.date_range(start, end, freq='W-WED')
+    monthly = pd.date_range('1990-01-01', end, freq='MS')
+    quarterly = pd.date_range('1990-01-01', end, freq='QS')
+
+    def walk(index, level, step):
+        return pd.Series(np.round(level + np.cumsum(rng.normal(0, step, len(index))), 2), index=index)
+
+    sd = {k: walk(daily, 3, 0.05) for k in CORE_DAILY}
+    sd['FEDFUNDS'] = walk(monthly, 2, 0.1)
+    sd['WALCL'] = pd.Series(np.round(rng.normal(7e6, 1e5, len(weekly))), index=weekly)
+    for k in CORE_QUARTERLY:
+        sd[k] = walk(quarterly, 2, 0.2)
+    sd['CRE_LOAN_AMT'] = walk(monthly, 2000, 5)
+
+    freqs = [daily, daily, weekly, monthly, quarterly]   # EXTRA_ 시리즈 주기 순서 (EXTRA_FREQS와 같음)
+    for i in range(n_extra):
+        sd[f'EXTRA_{i:03d}'] = walk(freqs[i % len(freqs)], 3, 0.05)
+    return sd
+
+EXTRA_FREQS = ['D', 'D', 'W', 'M', 'Q']
+EXTRA_LAGS = {'D': 1, 'W': 1, 'M': 14, 'Q': 60}
+
+def fixture_specs(series_dict):
+    """발표 시차 정렬용 스펙 (레지스트리 + EXTRA_ 시리즈는 주기별 대표 시차)"""
+    specs, _ = load_registry()
+    for i, key in enumerate(k for k in series_dict if k.startswith('EXTRA_')):
+        freq = EXTRA_FREQS[i % len(EXTRA_FREQS)]
+        specs[key] = {'key': key, 'freq': freq, 'lag_days': EXTRA_LAGS[freq]}
+    return specs
+
+def merge_asof_release_df(store, specs):
+    """참고용: 열마다 pd.merge_asof(발표일 기준)로 붙이는 발표일 기준 정렬 (원 시리즈만)"""
+    release = registry_release_days(store, specs)
+    base = pd.DataFrame({'t': days_to_index(store['DGS10']['days'])})
+    out = {}
+    for key, rec in store.items():
+        days = release.get(key, rec['days'])
+        right = pd.DataFrame({'t': days_to_index(days), 'v': expand_values(rec)})
+        out[key] = pd.merge_asof(base, right, on='t')['v'].to_numpy()
+    return pd.DataFrame(out, index=base['t'])
+
+def legacy_build_master_df(series_dict):
+    """변경 전 구현 (열마다 reindex(ffill) 후 DataFrame에 하나씩 추가)"""
+    base = series_dict['DGS10']
+    df = pd.DataFrame({'DGS10': base})
+    for name, s in series_dict.items():
+        if name == 'DGS10':
+            continue
+        df[name] = s.reindex(df.index, method='ffill')
+    df['YIELD_CURVE_DIRECT'] = series_dict['T10Y2Y'].reindex(df.index, method='ffill')
+    df['YIELD_CURVE_CALC'] = df['DGS10'] - df['DGS2']
+    df['YIELD_CURVE'] = df['YIELD_CURVE_DIRECT'].fillna(df['YIELD_CURVE_CALC'])
+    df['RATE_GAP'] = df['DGS10'] - df['FEDFUNDS']
+    df['POLICY_SPREAD'] = df['DGS2'] - df['EFFR']
+    return df.dropna(subset=['DGS10'])
+
+def concat_build_master_df(series_dict):
+    """참고용: pd.concat 외부 조인 + ffill 후 기준 날짜축으로 reindex"""
+    wide = pd.concat(series_dict, axis=1, sort=True).ffill()
+    df = wide.reindex(series_dict['DGS10'].index)
+    df['YIELD_CURVE_DIRECT'] = df['T10Y2Y']
+    df['YIELD_CURVE_CALC'] = df['DGS10'] - df['DGS2']
+    df['YIELD_CURVE'] = df['YIELD_CURVE_DIRECT'].fillna(df['YIELD_CURVE_CALC'])
+    df['RATE_GAP'] = df['DGS10'] - df['FEDFUNDS']
+    df['POLICY_SPREAD'] = df['DGS2'] - df['EFFR']
+    return df
+
+def timeit(fn, *args, repeat=5):
+    """최소 실행 시간 (ms)"""
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+def run(n_extra):
+    sd = make_fixture(n_extra)
+    store = build_series_store(sd)
+
+    # 증분 모드: 마지막 하루만 새로 들어온 상황
+    cutoff = sd['DGS10'].index[-1]
+    prev_store = build_series_store({k: s[s.index < cutoff] for k, s in sd.items()})
+    prev_df = build_master_df(prev_store)
+
+    expected = legacy_build_master_df(sd)
+    result = build_master_df(store)
+    assert np.array_equal(expected.to_numpy(), result[expected.columns].to_numpy(), equal_nan=True)
+
+    specs = fixture_specs(sd)
+    released = release_master_df(store, specs)
+    reference = merge_asof_release_df(store, specs)
+    assert np.array_equal(reference.to_numpy(), released[reference.columns].to_numpy(), equal_nan=True)
+
+    print(f"\n## 시리즈 {len(sd)}개, 기준 행 {len(result):,}개 (발표일 기준은 발표일 계산 포함, 열별 asof는 pd.merge_asof 참고)")
+    print(f"- 기존 열별 reindex      : {timeit(legacy_build_master_df, sd, repeat=3):8.1f} ms")
+    print(f"- concat + ffill (참고)  : {timeit(concat_build_master_df, sd, repeat=3):8.1f} ms")
+    print(f"- 단일 패스 블록 정렬    : {timeit(build_master_df, store):8.1f} ms")
+    print(f"- 증분 모드 (1일 추가)   : {timeit(extend_master_df, prev_df, prev_store, store):8.1f} ms")
+    print(f"- 발표일 기준 열별 asof  : {timeit(merge_asof_release_df, store, specs, repeat=3):8.1f} ms")
+    print(f"- 발표일 기준 단일 패스 : {timeit(release_master_df, store, specs):8.1f} ms")
+
+if __name__ == '__main__':
+    warnings.simplefilter('ignore')
+    run(0)
+    run(284)
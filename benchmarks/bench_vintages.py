@@ -0,0 +1,81 @@
+"""발표 이력(vintage) 벤치마크: 날짜마다 as_of_master_df vs realtime_frame 한 번 (searchsorted 두 번)
+
+합성 ALFRED 이력(첫 발표 → 수정 → 일부 재수정 / 삭제, 1970년 이전 관측치 포함)으로 realtime_frame의
+각 행이 그날 기준 as_of 스냅샷의 마지막 행과 같은지 확인한 뒤 시간을 잰다.
+
+사용법: python benchmarks/bench_vintages.py
+"""
+import os
+import sys
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bench_master_df import make_fixture, timeit  # noqa: E402
+from series_store import build_series_store, record_to_series  # noqa: E402
+from vintages import as_of_master_df, build_vintage_index, compact_vintages, realtime_frame, vintage_nbytes  # noqa: E402
+
+# 시리즈별 첫 발표 시차 (일)
+VINTAGE_LAGS = {'CC_DELINQ': 150, 'CRE_DELINQ_ALL': 150, 'FEDFUNDS': 35, 'WALCL': 8}
+
+def make_vintages(store, seed=0):
+    """합성 ALFRED 발표 이력 (realtime_start / date / value 열) {컬럼: DataFrame}"""
+    rng = np.random.default_rng(seed)
+    frames = {}
+    for key, lag in VINTAGE_LAGS.items():
+        s = record_to_series(store[key])
+        # 1970년 이전(음수 일수) 관측치도 키 패킹에 들어가도록 앞쪽에 덧붙임
+        early = pd.date_range('1962-01-01', periods=24, freq='QS')
+        s = pd.concat([pd.Series(np.round(rng.normal(2, 0.3, len(early)), 2), index=early), s])
+        rows = []
+        for d, v in s.items():
+            first = d + pd.Timedelta(days=lag)
+            rows.append((first, d, round(v + 0.3, 2)))
+            rows.append((first + pd.Timedelta(days=91), d, round(v + 0.1, 2)))
+            u = rng.random()
+            if u < 0.2:
+                rows.append((first + pd.Timedelta(days=400), d, round(v, 2)))
+            elif u < 0.25:
+                # 관측치 삭제 후 재발표
+                rows.append((first + pd.Timedelta(days=200), d, np.nan))
+                rows.append((first + pd.Timedelta(days=500), d, round(v - 0.1, 2)))
+        frames[key] = pd.DataFrame(rows, columns=['realtime_start', 'date', 'value'])
+    return frames
+
+def check_realtime_frame(vindex, frame, dates):
+    """realtime_frame 행 == 그날 as_of 스냅샷의 마지막 행 (다르면 AssertionError)"""
+    for d in dates:
+        snap = as_of_master_df(vindex, d)
+        assert snap.index[-1] == d, (d, snap.index[-1])
+        expected = snap.iloc[-1]
+        assert np.array_equal(expected.to_numpy(), frame.loc[d, expected.index].to_numpy(), equal_nan=True), d
+
+def per_date_as_of(vindex, dates):
+    """참고용: 날짜마다 as_of 스냅샷을 만들어 마지막 행만 모음"""
+    return pd.DataFrame([as_of_master_df(vindex, d).iloc[-1] for d in dates])
+
+def run(n_extra, n_dates=200):
+    store = build_series_store(make_fixture(n_extra, seed=1))
+    records = {k: compact_vintages(f) for k, f in make_vintages(store).items()}
+    vindex = build_vintage_index(store, records)
+    frame = realtime_frame(vindex)
+
+    rng = np.random.default_rng(1)
+    dates = frame.index[np.sort(rng.choice(len(frame), n_dates, replace=False))]
+    check_realtime_frame(vindex, frame, dates)
+
+    sample = dates[::10]
+    per_date = timeit(per_date_as_of, vindex, sample, repeat=1) / len(sample)
+    print(f"\n## 시리즈 {len(store)}개, 수정 이력 {len(records)}개, 기준 행 {len(frame):,}개 "
+          f"(as-of 인덱스 {vintage_nbytes(vindex) / 1e6:.1f} MB, {n_dates}개 날짜 일치 확인)")
+    print(f"- as-of 인덱스 생성         : {timeit(build_vintage_index, store, records, repeat=3):8.1f} ms")
+    print(f"- 날짜별 as_of (1일당)      : {per_date:8.1f} ms  (전체 {per_date * len(frame) / 1000:,.0f} s 추정)")
+    print(f"- realtime_frame (전체 이력) : {timeit(realtime_frame, vindex, repeat=3):8.1f} ms")
+
+if __name__ == '__main__':
+    warnings.simplefilter('ignore')
+    run(0)
+    run(284)
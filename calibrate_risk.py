@@ -0,0 +1,260 @@
+"""assess_macro_risk 임계값/가중치 보정 스윕
+
+규칙별 임계값 이동(offset)과 점수 가중치, HIGH RISK 기준 점수의 격자 전체를
+과거 데이터에 적용해, 경기침체 정점 전 'HIGH RISK' 신호의 선행 기간과 오경보 비율로 순위를 매긴다.
+
+사용법:
+    python calibrate_risk.py --data macro_master_20250101_1a2b3c4d.csv
+    FRED_API_KEY=... python calibrate_risk.py --start 1990-01-01 --write-config risk_config.json
+
+--data에는 대시보드 '💾 데이터 다운로드'에서 '정렬된 마스터 프레임 (영업일)' / CSV로 받은 파일
+(macro_master_<날짜>_<버전>.csv, 첫 컬럼 date)이나 API의 /export/master?format=csv 응답을 쓴다.
+결과 설정(risk_config.json)은 대시보드가 시작할 때 기본 임계값 대신 읽어 들인다.
+"""
+import argparse
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from macro_core import (
+    DEFAULT_RISK_RULES, DEFAULT_RISK_LEVELS, RECESSIONS_PATH,
+    load_recession_dates, rule_points, rule_values
+)
+
+# 규칙별 임계값 이동 단위 (offset 1 = 이만큼 이동)
+RULE_STEPS = {
+    'yield_curve': 0.1,
+    'dgs10': 0.25,
+    'hy_spread': 0.5,
+    'rate_gap': 0.25,
+    'cc_delinq': 0.5,
+    'cre_delinq': 0.5,
+    'auto_delinq': 0.25,
+}
+
+CHUNK_SIZE = 2048
+
+# ============================================================
+# 격자 구성
+# ============================================================
+def rule_candidates(rule, offsets, weights):
+    """규칙 하나의 후보 목록 [(offset, weight, tiers)]"""
+    step = RULE_STEPS.get(rule['name'], 0.0)
+    out = []
+    for off, w in itertools.product(offsets, weights):
+        tiers = [dict(t, threshold=round(t['threshold'] + off * step, 4), points=t['points'] * w)
+                 for t in rule['tiers']]
+        out.append((off, w, tiers))
+    return out
+
+def contribution_matrices(df, rules, candidates):
+    """규칙별 (날짜 × 후보) 점수 행렬 - 격자 평가 시 열만 골라 더한다"""
+    mats = []
+    for rule, cands in zip(rules, candidates):
+        values = rule_values(df, rule)
+        mats.append(np.stack([rule_points(values, rule, tiers) for _, _, tiers in cands], axis=1).astype(np.float32))
+    return mats
+
+def recession_windows(index, recessions, lookback_months):
+    """데이터 범위 안의 경기침체별 (선행 창 mask, 정점 날짜) 및 경보 허용 구간 mask"""
+    dates = pd.DatetimeIndex(index)
+    covered = np.zeros(len(dates), dtype=bool)
+    windows = []
+    for peak, trough in zip(recessions['peak'], recessions['trough']):
+        lead_start = peak - pd.DateOffset(months=lookback_months)
+        if lead_start < dates[0] or peak > dates[-1]:
+            continue
+        windows.append(((dates >= lead_start) & (dates <= peak), peak))
+        covered |= (dates >= lead_start) & (dates <= trough)
+    return windows, covered
+
+# ============================================================
+# 격자 평가 (워커 프로세스)
+# ============================================================
+_W = {}
+
+def _init_worker(mats, cutoffs, dims, windows, covered, day_numbers):
+    _W.update(mats=mats, cutoffs=cutoffs, dims=dims, windows=windows, covered=covered, days=day_numbers)
+
+def evaluate_chunk(start, stop):
+    """평탄화된 격자 인덱스 [start, stop) 평가 → 지표 배열 dict"""
+    flat = np.arange(start, stop)
+    multi = np.unravel_index(flat, _W['dims'])
+
+    # (날짜 × 조합) 점수: 규칙별 후보 열을 골라 브로드캐스트 합산
+    score = np.zeros((len(_W['days']), len(flat)), dtype=np.float32)
+    for r, mat in enumerate(_W['mats']):
+        score += mat[:, multi[r]]
+    signal = score >= _W['cutoffs'][multi[-1]][None, :]
+
+    hits = np.zeros(len(flat))
+    lead_sum = np.zeros(len(flat))
+    for mask, peak in _W['windows']:
+        sub = signal[mask]
+        has = sub.any(axis=0)
+        first = sub.argmax(axis=0)
+        lead_days = (np.datetime64(peak, 'D').astype(np.int64) - _W['days'][mask][first]).astype(np.float64)
+        hits += has
+        lead_sum += np.where(has, lead_days, 0.0)
+
+    outside = ~_W['covered']
+    false_days = (signal & outside[:, None]).sum(axis=0)
+    return {
+        'flat': flat,
+        'hits': hits,
+        'lead_days': np.divide(lead_sum, hits, out=np.full(len(flat), np.nan), where=hits > 0),
+        'false_alarm_rate': false_days / max(outside.sum(), 1),
+        'signal_rate': signal.mean(axis=0),
+    }
+
+# ============================================================
+# 실행
+# ============================================================
+def run_sweep(df, recessions, rules=None, vary=None, offsets=(-1, 0, 1), weights=(1.0,),
+              cutoffs=(5, 6, 7, 8, 9), lookback_months=24, penalty=2.0, workers=None, sample='W-FRI'):
+    """격자 전체를 평가해 순위표(DataFrame) 반환
+
+    sample 주기(기본 주간)의 마지막 관측치로 줄여 평가한다. 일별 대비 선행 기간 오차는 1주 이내.
+    """
+    rules = DEFAULT_RISK_RULES if rules is None else rules
+    if sample:
+        df = df.resample(sample).last()
+    vary = set(r['name'] for r in rules) if not vary else set(vary)
+    candidates = [rule_candidates(r, offsets if r['name'] in vary else (0,),
+                                  weights if r['name'] in vary else (1.0,)) for r in rules]
+
+    mats = contribution_matrices(df, rules, candidates)
+    cutoffs = np.asarray(cutoffs, dtype=np.float32)
+    dims = tuple(len(c) for c in candidates) + (len(cutoffs),)
+    windows, covered = recession_windows(df.index, recessions, lookback_months)
+    if not windows:
+        raise ValueError("데이터 범위 안에 평가할 경기침체 구간이 없습니다.")
+    day_numbers = df.index.values.astype('datetime64[D]').astype(np.int64)
+
+    total = int(np.prod(dims))
+    bounds = [(s, min(s + CHUNK_SIZE, total)) for s in range(0, total, CHUNK_SIZE)]
+    init_args = (mats, cutoffs, dims, windows, covered, day_numbers)
+
+    if workers == 1 or len(bounds) == 1:
+        _init_worker(*init_args)
+        parts = [evaluate_chunk(s, e) for s, e in bounds]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args) as pool:
+            parts = list(pool.map(evaluate_chunk, *zip(*bounds)))
+
+    res = {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+    multi = np.unravel_index(res['flat'], dims)
+
+    table = pd.DataFrame({
+        'hit_rate': res['hits'] / len(windows),
+        'mean_lead_months': res['lead_days'] / 30.44,
+        'false_alarm_rate': res['false_alarm_rate'],
+        'signal_rate': res['signal_rate'],
+    })
+    table['objective'] = (table['hit_rate'] * (1 + table['mean_lead_months'].fillna(0) / lookback_months)
+                          - penalty * table['false_alarm_rate'])
+    for r, (rule, cands) in enumerate(zip(rules, candidates)):
+        if rule['name'] in vary:
+            table[f"{rule['name']}_offset"] = np.array([cands[i][0] for i in multi[r]]) * RULE_STEPS.get(rule['name'], 0.0)
+            table[f"{rule['name']}_weight"] = [cands[i][1] for i in multi[r]]
+    table['high_cutoff'] = cutoffs[multi[-1]]
+
+    # 현재 기본 설정 위치 표시
+    baseline = np.ones(total, dtype=bool)
+    for r, cands in enumerate(candidates):
+        base_idx = [i for i, (off, w, _) in enumerate(cands) if off == 0 and w == 1.0]
+        baseline &= np.isin(multi[r], base_idx)
+    baseline &= cutoffs[multi[-1]] == DEFAULT_RISK_LEVELS[1][0]
+    table['is_current'] = baseline
+
+    table = table.sort_values(['objective', 'hit_rate', 'mean_lead_months'], ascending=[False, False, False])
+    table.insert(0, 'rank', np.arange(1, len(table) + 1))
+    return table.reset_index(drop=True)
+
+def config_from_row(row, rules, lookback_months):
+    """순위표 한 행 → risk_config.json 내용"""
+    cfg_rules = {}
+    for rule in rules:
+        off = row.get(f"{rule['name']}_offset", 0.0)
+        w = row.get(f"{rule['name']}_weight", 1.0)
+        cfg_rules[rule['name']] = {
+            'thresholds': [round(float(t['threshold'] + off), 4) for t in rule['tiers']],
+            'points': [float(t['points'] * w) for t in rule['tiers']],
+        }
+    high = float(row['high_cutoff'])
+    critical = max(DEFAULT_RISK_LEVELS[0][0], high + 1)
+    medium = min(DEFAULT_RISK_LEVELS[2][0], high - 1)
+    return {
+        'rules': cfg_rules,
+        'levels': [float(critical), high, float(medium)],
+        'source': (f"calibrate_risk.py {pd.Timestamp.now():%Y-%m-%d} · 적중 {row['hit_rate']:.0%}, "
+                   f"평균 선행 {row['mean_lead_months']:.1f}개월, 오경보 {row['false_alarm_rate']:.1%} "
+                   f"(선행 창 {lookback_months}개월)"),
+    }
+
+def load_master(args):
+    """CSV(대시보드 다운로드) 또는 FRED에서 마스터 프레임 로드"""
+    if args.data:
+        df = pd.read_csv(args.data, index_col=0, parse_dates=True)
+        return df.drop(columns=['Scenario'], errors='ignore').sort_index()
+
+    api_key = args.fred_api_key or os.environ.get('FRED_API_KEY')
+    if not api_key:
+        raise SystemExit("--data 또는 FRED_API_KEY가 필요합니다.")
+    from fred_loader import load_dataset
+    return load_dataset(api_key, args.start)['df']
+
+def main():
+    parser = argparse.ArgumentParser(description="assess_macro_risk 임계값/가중치 보정 스윕")
+    parser.add_argument('--data', help="마스터 프레임 CSV 내보내기 파일 (macro_master_*.csv, 없으면 FRED에서 수집)")
+    parser.add_argument('--fred-api-key')
+    parser.add_argument('--start', default='1990-01-01')
+    parser.add_argument('--recessions', default=RECESSIONS_PATH, help="peak,trough 컬럼 CSV")
+    parser.add_argument('--rules', help="보정할 규칙 이름 (쉼표 구분, 기본: 전체)")
+    parser.add_argument('--steps', type=int, default=1, help="규칙별 임계값 이동 범위 (-steps..+steps)")
+    parser.add_argument('--weights', default='1.0', help="점수 가중치 후보 (예: 0.5,1,1.5)")
+    parser.add_argument('--cutoffs', default='5,6,7,8,9', help="HIGH RISK 기준 점수 후보")
+    parser.add_argument('--lookback-months', type=int, default=24)
+    parser.add_argument('--penalty', type=float, default=2.0, help="오경보 비율 페널티")
+    parser.add_argument('--sample', default='W-FRI', help="평가 주기 (pandas resample 규칙, 빈 값이면 일별)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--out', help="전체 순위표 CSV 저장 경로")
+    parser.add_argument('--write-config', help="1위 조합을 risk_config.json 형식으로 저장")
+    args = parser.parse_args()
+
+    df = load_master(args)
+    recessions = load_recession_dates(args.recessions)
+    table = run_sweep(
+        df, recessions,
+        vary=args.rules.split(',') if args.rules else None,
+        offsets=range(-args.steps, args.steps + 1),
+        weights=[float(w) for w in args.weights.split(',')],
+        cutoffs=[float(c) for c in args.cutoffs.split(',')],
+        lookback_months=args.lookback_months,
+        penalty=args.penalty,
+        workers=args.workers,
+        sample=args.sample or None,
+    )
+
+    with pd.option_context('display.width', 200, 'display.max_columns', 40):
+        print(table.head(args.top).round(3).to_string(index=False))
+        current = table[table['is_current']]
+        if len(current):
+            print("\n현재 설정:")
+            print(current.round(3).to_string(index=False))
+
+    if args.out:
+        table.to_csv(args.out, index=False)
+    if args.write_config:
+        cfg = config_from_row(table.iloc[0], DEFAULT_RISK_RULES, args.lookback_months)
+        with open(args.write_config, 'w', encoding='utf-8') as f:
+            json.dump(cfg, f, ensure_ascii=False, indent=2)
+        print(f"\n설정 저장: {args.write_config}")
+
+if __name__ == '__main__':
+    main()
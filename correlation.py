@@ -0,0 +1,176 @@
+import numpy as np
+import pandas as pd
+
+from macro_core import scenario_codes
+from series_store import first_changed_store_day
+
+# ============================================================
+# 증분 롤링 상관 행렬 / 레짐별 상관
+# ============================================================
+# 지표 쌍마다 (관측 수, 합, 제곱합, 곱의 합)을 k×k 행렬로 유지하고
+# 하루가 추가되면 그 행을 더하고 창 밖으로 나가는 행을 빼서 O(k²)에 갱신한다 (전체 창 재계산 없음).
+# 결측은 쌍별로 처리한다 (두 지표가 모두 관측된 날만 그 쌍의 합에 포함).
+# 레짐별 상관은 같은 방식의 누적합을 시나리오 번호별로 따로 쌓은 것이다.
+# 스냅샷마다 누적 상태 체크포인트를 남겨, 저장소에서 과거 값이 수정되면 그 날짜 직전
+# 체크포인트부터 다시 쌓는다 (체크포인트보다 오래된 수정이면 전체 재계산).
+
+CORR_WINDOW = 126
+SNAPSHOT_STEP = 21
+CORR_MIN_OBS = 30
+REGIME_STATES = (1, 2, 3, 4)
+CORR_CHECKPOINTS = 24
+
+def _empty_moments(k):
+    return {name: np.zeros((k, k)) for name in ('n', 'sx', 'sxx', 'sxy')}
+
+def _add_row(m, x, sign=1.0):
+    """모멘트 행렬에 한 행을 더하거나(sign=1) 뺌(sign=-1) - O(k²)"""
+    valid = np.isfinite(x)
+    v = np.where(valid, x, 0.0)
+    both = np.outer(valid, valid)
+    m['n'] += sign * both
+    m['sx'] += sign * (v[:, None] * both)
+    m['sxx'] += sign * ((v * v)[:, None] * both)
+    m['sxy'] += sign * np.outer(v, v)
+
+def moments_to_corr(m, min_obs=CORR_MIN_OBS):
+    """모멘트 행렬 → 쌍별 상관 행렬 (관측 부족/분산 0이면 NaN)"""
+    n, sx, sxx, sxy = m['n'], m['sx'], m['sxx'], m['sxy']
+    sy, syy = sx.T, sxx.T
+    cov = n * sxy - sx * sy
+    var = np.clip(n * sxx - sx * sx, 0, None) * np.clip(n * syy - sy * sy, 0, None)
+    ok = (n >= min_obs) & (var > 0)
+    corr = np.divide(cov, np.sqrt(var), out=np.full(cov.shape, np.nan), where=ok)
+    return np.clip(corr, -1.0, 1.0)
+
+def init_state(columns, window=CORR_WINDOW, changes=True):
+    """롤링/레짐 상관 누적 상태"""
+    k = len(columns)
+    return {
+        'columns': list(columns),
+        'window': window,
+        'changes': changes,
+        'rolling': _empty_moments(k),
+        'regimes': {s: _empty_moments(k) for s in REGIME_STATES},
+        'ring': np.full((window, k), np.nan),
+        'rows_seen': 0,
+        'last_date': None,
+        'snapshots': [],
+        'snapshot_dates': [],
+        'checkpoints': [],
+    }
+
+def _checkpoint(state):
+    """되돌아갈 지점: 누적 모멘트 / 창 / 처리 행 수 (스냅샷 목록은 개수만)"""
+    return {
+        'rolling': {k: v.copy() for k, v in state['rolling'].items()},
+        'regimes': {s: {k: v.copy() for k, v in m.items()} for s, m in state['regimes'].items()},
+        'ring': state['ring'].copy(),
+        'rows_seen': state['rows_seen'],
+        'last_date': state['last_date'],
+        'n_snapshots': len(state['snapshots']),
+    }
+
+def push_rows(state, X, codes, dates, step=SNAPSHOT_STEP, checkpoints=CORR_CHECKPOINTS):
+    """행들을 순서대로 반영 (행마다 O(k²)), step행마다 롤링 상관 스냅샷 + 체크포인트 저장"""
+    window = state['window']
+    ring = state['ring']
+    for x, code, date in zip(X, codes, dates):
+        pos = state['rows_seen'] % window
+        if state['rows_seen'] >= window:
+            _add_row(state['rolling'], ring[pos], -1.0)
+        _add_row(state['rolling'], x)
+        ring[pos] = x
+        if code in state['regimes']:
+            _add_row(state['regimes'][code], x)
+        state['rows_seen'] += 1
+        state['last_date'] = date
+        if state['rows_seen'] % step == 0:
+            state['snapshots'].append(moments_to_corr(state['rolling']).astype(np.float32))
+            state['snapshot_dates'].append(date)
+            state['checkpoints'] = (state['checkpoints'] + [_checkpoint(state)])[-checkpoints:]
+    return state
+
+def _daily_inputs(df, columns, changes):
+    """마스터 프레임 → (입력 행렬, 시나리오 번호, 날짜)"""
+    levels = df[columns].to_numpy(dtype=np.float64)
+    codes = scenario_codes(df['YIELD_CURVE'].to_numpy(), df['POLICY_SPREAD'].to_numpy())
+    if not changes:
+        return levels, codes, df.index
+    # 일간 변화: 저주기 시리즈는 ffill 값이라 발표일에만 0이 아닌 변화가 생김
+    X = np.vstack([np.full((1, len(columns)), np.nan), np.diff(levels, axis=0)])
+    return X, codes, df.index
+
+def _resume_state(previous, changed, dates):
+    """저장소가 처음 달라진 날짜(changed) 이전까지 쌓인 상태의 복사본 (되돌아갈 지점이 없으면 None)
+
+    마스터 프레임 행은 그날까지의 관측치로만 정해지므로 changed 이전 행의 입력은 그대로다.
+    """
+    candidates = [previous] + previous['checkpoints'][::-1]
+    for point in candidates:
+        if point['last_date'] is None:
+            continue
+        if changed is not None and point['last_date'] >= changed:
+            continue
+        n = point['rows_seen']
+        # 날짜축이 이전 계산과 같은 데이터에서 이어지는지 확인
+        if n > len(dates) or dates[n - 1] != point['last_date']:
+            return None
+        state = dict(previous)
+        state['rolling'] = {k: v.copy() for k, v in point['rolling'].items()}
+        state['regimes'] = {s: {k: v.copy() for k, v in m.items()} for s, m in point['regimes'].items()}
+        state['ring'] = point['ring'].copy()
+        state['rows_seen'] = n
+        state['last_date'] = point['last_date']
+        n_snapshots = point['n_snapshots'] if point is not previous else len(previous['snapshots'])
+        state['snapshots'] = previous['snapshots'][:n_snapshots]
+        state['snapshot_dates'] = previous['snapshot_dates'][:n_snapshots]
+        state['checkpoints'] = [c for c in previous['checkpoints'] if c['rows_seen'] <= n]
+        return state
+    return None
+
+def build_correlations(df, columns, window=CORR_WINDOW, changes=True, previous=None, step=SNAPSHOT_STEP,
+                       store=None, previous_store=None):
+    """전체 이력 롤링/레짐 상관
+
+    previous 상태가 같은 설정이고 그 계산에 쓴 저장소(previous_store)와 지금 저장소(store)가 주어지면
+    처음 달라진 날짜 직전 체크포인트부터 그 뒤 행만 다시 반영한다.
+    """
+    columns = [c for c in columns if c in df.columns]
+    X, codes, dates = _daily_inputs(df, columns, changes)
+
+    state = None
+    if (previous is not None and store is not None and previous_store is not None
+            and previous['columns'] == columns and previous['window'] == window
+            and previous['changes'] == changes):
+        changed = first_changed_store_day(previous_store, store)
+        if changed is not None and len(dates):
+            # 시리즈 구성이 바뀐 경우(int32 최솟값)도 날짜축 첫날로 맞춰 전체 재계산
+            changed = pd.Timestamp(max(np.datetime64(changed, 'D'), dates[0].to_datetime64()))
+        state = _resume_state(previous, changed, dates)
+
+    if state is None:
+        state = init_state(columns, window, changes)
+    n = state['rows_seen']
+    push_rows(state, X[n:], codes[n:], dates[n:], step)
+    return state
+
+def current_corr(state):
+    """가장 최근 창의 상관 행렬 DataFrame"""
+    return pd.DataFrame(moments_to_corr(state['rolling']), index=state['columns'], columns=state['columns'])
+
+def snapshot_corr(state, i):
+    """i번째 스냅샷 상관 행렬 DataFrame"""
+    return pd.DataFrame(state['snapshots'][i], index=state['columns'], columns=state['columns'])
+
+def regime_corr(state, regime):
+    """레짐(시나리오) 기간 전체의 상관 행렬 DataFrame + 관측일 수"""
+    m = state['regimes'][regime]
+    return (pd.DataFrame(moments_to_corr(m), index=state['columns'], columns=state['columns']),
+            int(np.diag(m['n']).max()) if len(m['n']) else 0)
+
+def pair_corr_path(state, a, b):
+    """두 지표의 스냅샷별 롤링 상관 Series"""
+    i, j = state['columns'].index(a), state['columns'].index(b)
+    return pd.Series([s[i, j] for s in state['snapshots']], index=pd.DatetimeIndex(state['snapshot_dates']),
+                     name=f'{a}~{b}')
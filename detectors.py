@@ -0,0 +1,234 @@
+import numpy as np
+import pandas as pd
+
+from series_store import expand_values, days_to_index, first_changed_day
+
+# ============================================================
+# 온라인 변화점 / 이상 감지 (CUSUM, EWMA 관리도, Bayesian online change-point)
+# ============================================================
+# 각 시리즈의 원래 주기 관측치 변화량을 한 번에 하나씩 처리하며, 시리즈별 상태는 크기가 고정된
+# 값들(스칼라 + 길이 BOCPD_MAX_RUN 배열)뿐이다. 상태에 마지막 처리 날짜를 남겨 두므로
+# 새 관측치만 수집된 경우(증분 수집) 과거 이력을 다시 처리하지 않고 이어서 갱신한다.
+# 과거 관측치가 수정되면 최근 DETECTOR_CHECKPOINTS개 관측치 직후 상태 중 수정일 이전 것에서 다시 처리한다
+# (분기 연체율 수정은 대개 최근 몇 분기라 체크포인트 안에 들고, 그보다 오래된 수정만 처음부터 다시 처리).
+# 변화량은 EWMA 평균/분산으로 표준화한 z를 세 감지기에 공통으로 넣는다.
+
+DETECTOR_SERIES = ['HY_SPREAD', 'IG_SPREAD', 'CC_DELINQ', 'CONS_DELINQ', 'AUTO_DELINQ', 'CRE_DELINQ_ALL']
+
+# 주기별 (기준 통계 span, 워밍업 관측 수, 경고로 표시할 최근 일수)
+FREQ_PARAMS = {
+    'D': {'span': 252, 'warmup': 60, 'recent_days': 30},
+    'W': {'span': 104, 'warmup': 26, 'recent_days': 60},
+    'M': {'span': 60, 'warmup': 24, 'recent_days': 120},
+    'Q': {'span': 20, 'warmup': 12, 'recent_days': 200},
+}
+
+CUSUM_K = 0.5
+CUSUM_H = 5.0
+EWMA_LAMBDA = 0.2
+EWMA_L = 3.0
+BOCPD_MAX_RUN = 64
+BOCPD_HAZARD = 1 / 100
+BOCPD_PRIOR_VAR = 1.0
+BOCPD_SHORT_RUN = 5
+BOCPD_THRESHOLD = 0.5
+MAX_EVENTS = 50
+DETECTOR_CHECKPOINTS = 8
+
+DETECTOR_LABELS = {'cusum': 'CUSUM', 'ewma': 'EWMA', 'bocpd': '변화점'}
+
+def init_detector(freq='D'):
+    """시리즈 하나의 감지기 상태 (크기 고정)"""
+    log_r = np.full(BOCPD_MAX_RUN, -np.inf)
+    log_r[0] = 0.0
+    return {
+        'freq': freq,
+        'n': 0,
+        'last_day': None,
+        'last_value': None,
+        'mean': 0.0,
+        'var': 0.0,
+        'cusum_pos': 0.0,
+        'cusum_neg': 0.0,
+        'ewma': 0.0,
+        'ewma_alarm': False,
+        'log_r': log_r,
+        'run_sum': np.zeros(BOCPD_MAX_RUN),
+        'run_n': np.zeros(BOCPD_MAX_RUN),
+        'bocpd_alarm': False,
+        'events': [],
+        # 최근 관측치 직후 상태 [(관측일, 상태)] - 수정 발표 시 되돌아갈 지점
+        'checkpoints': [],
+    }
+
+def _logsumexp(a):
+    m = np.max(a)
+    return m + np.log(np.exp(a - m).sum()) if np.isfinite(m) else m
+
+def _bocpd_step(st, z):
+    """고정 길이 run-length 분포 갱신 (정규 평균 이동, 분산 1) → 짧은 run 확률"""
+    log_r, run_sum, run_n = st['log_r'], st['run_sum'], st['run_n']
+    post_prec = run_n + 1.0 / BOCPD_PRIOR_VAR
+    mu = run_sum / post_prec
+    pred_var = 1.0 + 1.0 / post_prec
+    log_pred = -0.5 * (np.log(2 * np.pi * pred_var) + (z - mu) ** 2 / pred_var)
+
+    growth = log_r + log_pred + np.log(1 - BOCPD_HAZARD)
+    cp = _logsumexp(log_r + log_pred + np.log(BOCPD_HAZARD))
+    new_r = np.empty_like(log_r)
+    new_r[0] = cp
+    new_r[1:] = growth[:-1]
+    # 최대 길이에 도달한 run은 마지막 칸에 합쳐 상태 크기를 고정
+    new_r[-1] = np.logaddexp(growth[-2], growth[-1])
+    new_r -= _logsumexp(new_r)
+
+    new_sum = np.empty_like(run_sum)
+    new_n = np.empty_like(run_n)
+    new_sum[0], new_n[0] = 0.0, 0.0
+    new_sum[1:], new_n[1:] = run_sum[:-1] + z, run_n[:-1] + 1
+    new_sum[-1], new_n[-1] = run_sum[-1] + z, run_n[-1] + 1
+
+    st['log_r'], st['run_sum'], st['run_n'] = new_r, new_sum, new_n
+    # 새 관측치까지 포함한 짧은 run(= 최근 변화점) 확률
+    return float(np.exp(new_r[1:BOCPD_SHORT_RUN + 1]).sum())
+
+def _event(st, key, day, detector, direction, value, stat):
+    st['events'].append({'series': key, 'day': int(day), 'detector': detector,
+                         'direction': direction, 'value': float(value), 'stat': float(stat)})
+    if len(st['events']) > MAX_EVENTS:
+        del st['events'][0]
+
+def update_detector(st, key, day, value):
+    """관측치 하나 처리 (O(1))"""
+    params = FREQ_PARAMS.get(st['freq'], FREQ_PARAMS['D'])
+    prev = st['last_value']
+    st['last_day'], st['last_value'] = int(day), float(value)
+    if prev is None:
+        return
+    d = value - prev
+    st['n'] += 1
+    alpha = 2.0 / (params['span'] + 1)
+
+    if st['n'] > params['warmup'] and st['var'] > 0:
+        z = (d - st['mean']) / np.sqrt(st['var'])
+        z = float(np.clip(z, -10, 10))
+        direction = '상승' if z > 0 else '하락'
+
+        # CUSUM (양방향, 경보 후 초기화)
+        st['cusum_pos'] = max(0.0, st['cusum_pos'] + z - CUSUM_K)
+        st['cusum_neg'] = max(0.0, st['cusum_neg'] - z - CUSUM_K)
+        if st['cusum_pos'] > CUSUM_H or st['cusum_neg'] > CUSUM_H:
+            up = st['cusum_pos'] > CUSUM_H
+            _event(st, key, day, 'cusum', '상승' if up else '하락', value, max(st['cusum_pos'], st['cusum_neg']))
+            st['cusum_pos'] = st['cusum_neg'] = 0.0
+
+        # EWMA 관리도 (관리 한계를 넘는 순간만 기록)
+        st['ewma'] = EWMA_LAMBDA * z + (1 - EWMA_LAMBDA) * st['ewma']
+        limit = EWMA_L * np.sqrt(EWMA_LAMBDA / (2 - EWMA_LAMBDA))
+        out = abs(st['ewma']) > limit
+        if out and not st['ewma_alarm']:
+            _event(st, key, day, 'ewma', '상승' if st['ewma'] > 0 else '하락', value, st['ewma'] / limit)
+        st['ewma_alarm'] = out
+
+        # Bayesian online change-point
+        p_short = _bocpd_step(st, z)
+        alarm = p_short > BOCPD_THRESHOLD
+        if alarm and not st['bocpd_alarm']:
+            _event(st, key, day, 'bocpd', direction, value, p_short)
+        st['bocpd_alarm'] = alarm
+
+    # 기준 통계는 판정 후 갱신 (이번 변화가 자기 기준을 흐리지 않도록)
+    delta = d - st['mean']
+    st['mean'] += alpha * delta
+    st['var'] = (1 - alpha) * (st['var'] + alpha * delta * delta)
+
+def _snapshot(st):
+    out = {k: v for k, v in st.items() if k not in ('events', 'checkpoints')}
+    for k in ('log_r', 'run_sum', 'run_n'):
+        out[k] = st[k].copy()
+    return out
+
+def _resume_state(prev, old_rec, rec):
+    """이전 상태에서 이어서 처리할 (상태, 마지막 처리 위치) (되돌아갈 지점이 없으면 None)"""
+    if old_rec is None:
+        # 이전 저장소가 없으면 마지막 처리 관측치가 그대로인지만 확인
+        pos = int(np.searchsorted(rec['days'], prev['last_day']))
+        values = expand_values(rec)
+        if pos < len(rec['days']) and rec['days'][pos] == prev['last_day'] and values[pos] == prev['last_value']:
+            return _copy_detector(prev), pos
+        return None
+    changed = first_changed_day(old_rec, rec)
+    if changed is None or changed > prev['last_day']:
+        return _copy_detector(prev), int(np.searchsorted(rec['days'], prev['last_day']))
+    # 수정일 이전의 가장 늦은 체크포인트로 되돌림 (그 뒤 이벤트는 다시 감지)
+    points = [i for i, (day, _) in enumerate(prev.get('checkpoints', [])) if day < changed]
+    if not points:
+        return None
+    i = points[-1]
+    day, snap = prev['checkpoints'][i]
+    st = _snapshot(snap)
+    st['events'] = [dict(e) for e in prev['events'] if e['day'] <= day]
+    st['checkpoints'] = list(prev['checkpoints'][:i + 1])
+    return st, int(np.searchsorted(rec['days'], day))
+
+def run_detectors(store, specs, columns=DETECTOR_SERIES, previous=None, previous_store=None):
+    """저장소의 감지 대상 시리즈를 처리 (previous 상태가 있으면 이어서)
+
+    previous_store(previous를 만들 때의 저장소)가 있으면 처음 바뀐 관측일을 찾아 새 관측치만,
+    과거 값이 수정됐으면 수정일 이전 체크포인트부터 다시 처리한다.
+    """
+    states = {}
+    for key in columns:
+        if key not in store:
+            continue
+        rec = store[key]
+        values = expand_values(rec)
+        prev = previous.get(key) if previous else None
+        resumed = None
+        if prev is not None and prev['last_day'] is not None:
+            old_rec = previous_store.get(key) if previous_store is not None else None
+            resumed = _resume_state(prev, old_rec, rec)
+        st, pos = resumed if resumed is not None else (init_detector(specs[key]['freq']), -1)
+        days, vals = rec['days'][pos + 1:], values[pos + 1:]
+        for i, (day, value) in enumerate(zip(days, vals)):
+            update_detector(st, key, day, value)
+            if i >= len(days) - DETECTOR_CHECKPOINTS:
+                st['checkpoints'] = (st['checkpoints'] + [(int(day), _snapshot(st))])[-DETECTOR_CHECKPOINTS:]
+        states[key] = st
+    return states
+
+def _copy_detector(st):
+    """공유 캐시에 있는 이전 상태를 건드리지 않도록 복사"""
+    out = dict(st)
+    for k in ('log_r', 'run_sum', 'run_n'):
+        out[k] = st[k].copy()
+    out['events'] = [dict(e) for e in st['events']]
+    out['checkpoints'] = list(st.get('checkpoints', []))
+    return out
+
+def detector_events(states, since=None):
+    """모든 감지 이벤트 DataFrame (since 이후만)"""
+    rows = [e for st in states.values() for e in st['events']]
+    events = pd.DataFrame(rows, columns=['series', 'day', 'detector', 'direction', 'value', 'stat'])
+    events['date'] = days_to_index(events['day'].to_numpy(dtype=np.int64))
+    if since is not None:
+        events = events[events['date'] >= pd.Timestamp(since)]
+    return events.sort_values('date').reset_index(drop=True)
+
+def recent_warnings(states, specs, as_of):
+    """주기별 최근 기간 안의 감지 이벤트 → 위험 경고 문구 목록 (시리즈별 가장 최근 것만)"""
+    messages = []
+    for key, st in states.items():
+        if not st['events']:
+            continue
+        recent_days = FREQ_PARAMS.get(st['freq'], FREQ_PARAMS['D'])['recent_days']
+        last = st['events'][-1]
+        date = days_to_index([last['day']])[0]
+        if (pd.Timestamp(as_of) - date).days > recent_days:
+            continue
+        detectors = sorted({DETECTOR_LABELS[e['detector']] for e in st['events']
+                            if (date - days_to_index([e['day']])[0]).days <= recent_days})
+        arrow = "📈" if last['direction'] == '상승' else "📉"
+        messages.append(f"{arrow} {specs[key]['name']} 급변 감지 ({'/'.join(detectors)}, {last['direction']}, "
+                        f"{date:%Y-%m-%d} {last['value']:.2f})")
+    return messages
@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+
+from macro_core import find_inversion_periods
+
+# ============================================================
+# 수익률 곡선 역전 이벤트 스터디
+# ============================================================
+# 역전 시작/종료 시점을 기준으로 모든 지표를 월 단위 창(-24 ~ +36개월)에 맞춰
+# (이벤트 × 상대 월 × 지표) 3차원 배열을 한 번의 인덱싱으로 만들고
+# 평균/중앙값/분위 경로를 계산한다. 가장 최근 에피소드는 분포에서 빼고 현재 경로로 따로 겹쳐 그린다.
+# 역전이 진행 중이면 역전 해소 기준에는 현재 에피소드가 없으므로 해소된 에피소드 전체가 분포다.
+
+PRE_MONTHS = 24
+POST_MONTHS = 36
+MIN_EPISODE_DAYS = 20
+MERGE_GAP_DAYS = 90
+EVENT_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+EVENT_ANCHORS = {'start': '역전 시작', 'end': '역전 해소'}
+
+def inversion_episodes(yield_curve, min_days=MIN_EPISODE_DAYS, merge_gap_days=MERGE_GAP_DAYS):
+    """find_inversion_periods 결과에서 짧은 재역전은 합치고 짧은 역전은 버린 에피소드 [(시작, 종료)]"""
+    merged = []
+    for start, end in find_inversion_periods(yield_curve):
+        if merged and (start - merged[-1][1]).days < merge_gap_days:
+            merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return [(s, e) for s, e in merged if (e - s).days >= min_days]
+
+def build_event_study(df, pre=PRE_MONTHS, post=POST_MONTHS, episodes=None):
+    """역전 에피소드 기준 이벤트 스터디 (데이터 버전별 1회 생성)
+
+    반환 dict의 'windows'[anchor]는 (이벤트, 상대 월, 지표) 배열로 이벤트 시점 값 대비 변화량이다.
+    """
+    monthly = df.resample('MS').last()
+    episodes = inversion_episodes(df['YIELD_CURVE']) if episodes is None else episodes
+    X = monthly.to_numpy(dtype=np.float64)
+    k = X.shape[1]
+    offsets = np.arange(-pre, post + 1)
+
+    # 창이 데이터 밖으로 나가는 부분은 NaN 패딩 행을 가리키도록
+    padded = np.vstack([np.full((pre, k), np.nan), X, np.full((post + 1, k), np.nan)])
+    last_day = df.index[-1]
+    ongoing = bool(episodes) and episodes[-1][1] == last_day and df['YIELD_CURVE'].iloc[-1] < 0
+
+    result = {
+        'columns': list(monthly.columns),
+        'offsets': offsets,
+        'episodes': episodes,
+        'ongoing': ongoing,
+        'windows': {},
+        'dates': {},
+        'stats': {},
+        'current': {},
+    }
+    for anchor in EVENT_ANCHORS:
+        dates = [s if anchor == 'start' else e for s, e in episodes]
+        if anchor == 'end' and ongoing:
+            dates = dates[:-1]
+        months = monthly.index.searchsorted(pd.DatetimeIndex(dates).to_period('M').to_timestamp())
+        # (이벤트 × 상대 월) 위치 → 한 번에 (이벤트 × 상대 월 × 지표)
+        positions = months[:, None] + offsets[None, :] + pre
+        levels = padded[positions] if len(dates) else np.empty((0, len(offsets), k))
+        base = levels[:, pre:pre + 1, :]
+        windows = levels - base
+
+        # 가장 최근 에피소드는 분포에서 제외하고 현재 경로로 사용 (아직 창이 다 차지 않은 경우가 대부분)
+        # 진행 중인 역전은 해소 시점이 없어 이미 빠졌으므로 해소 기준에서는 남은 에피소드가 모두 과거
+        has_current = not (anchor == 'end' and ongoing)
+        hist = windows[:-1] if has_current else windows
+        stats = {}
+        if len(hist):
+            stats['mean'] = np.nanmean(hist, axis=0)
+            for q, path in zip(EVENT_QUANTILES, np.nanquantile(hist, EVENT_QUANTILES, axis=0)):
+                stats[f'q{int(q * 100)}'] = path
+            stats['count'] = np.isfinite(hist).sum(axis=0)
+
+        result['windows'][anchor] = windows
+        result['dates'][anchor] = pd.DatetimeIndex(dates)
+        result['stats'][anchor] = stats
+        result['current'][anchor] = windows[-1] if has_current and len(dates) else None
+    return result
+
+def event_paths(study, anchor, column):
+    """한 지표의 분위 경로 DataFrame (index: 상대 월) + 에피소드별 경로 DataFrame"""
+    j = study['columns'].index(column)
+    stats = study['stats'][anchor]
+    envelope = pd.DataFrame({name: path[:, j] for name, path in stats.items()}, index=study['offsets'])
+    episodes = pd.DataFrame(study['windows'][anchor][:, :, j].T, index=study['offsets'],
+                            columns=[d.strftime('%Y-%m') for d in study['dates'][anchor]])
+    return envelope, episodes
+
+def format_event_study_for_prompt(study, columns, horizons=(12, 24)):
+    """프롬프트용 역전 시작 이후 지표 변화 중앙값 요약"""
+    stats = study['stats'].get('start', {})
+    if not stats:
+        return "데이터 없음"
+    offsets = list(study['offsets'])
+    dates = study['dates']['start']
+    lines = [f"- 과거 역전 에피소드 {len(dates) - 1}개 기준 (역전 시작 월 값 대비 변화, 중앙값 [25-75%]), "
+             f"최근 에피소드 시작 {dates[-1].strftime('%Y-%m')}{' (진행 중)' if study['ongoing'] else ''}"]
+    for col in columns:
+        if col not in study['columns']:
+            continue
+        j = study['columns'].index(col)
+        parts = []
+        for h in horizons:
+            if h not in offsets:
+                continue
+            i = offsets.index(h)
+            med, lo, hi = stats['q50'][i, j], stats['q25'][i, j], stats['q75'][i, j]
+            if not np.isnan(med):
+                parts.append(f"{h}개월 후 {med:+.2f} [{lo:+.2f}, {hi:+.2f}]")
+        cur = study['current']['start']
+        if cur is not None:
+            seen = np.flatnonzero(np.isfinite(cur[:, j]))
+            if len(seen) and offsets[seen[-1]] > 0:
+                parts.append(f"최근 에피소드 {offsets[seen[-1]]}개월 시점 {cur[seen[-1], j]:+.2f}")
+        if parts:
+            lines.append(f"- {col}: " + ", ".join(parts))
+    return "\n".join(lines)
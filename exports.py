@@ -0,0 +1,142 @@
+import io
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from features import compute_features
+from macro_core import risk_score_series, risk_level_series, scenario_series
+from series_store import record_index, expand_values
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # CSV만 제공
+    pa = pq = None
+
+# ============================================================
+# 대량 내보내기 (Parquet / Arrow IPC / CSV)
+# ============================================================
+# 내보내기 파일은 (데이터 버전, 표, 형식)마다 전용 스레드에서 한 번만 만들어 캐시하고,
+# 대시보드 세션과 API 서버가 같은 바이트를 그대로 내려보낸다 (클릭마다 다시 직렬화하지 않음).
+
+EXPORT_TABLES = {
+    'master': '정렬된 마스터 프레임 (영업일)',
+    'native': '원래 주기 시리즈 (long 형식)',
+    'features': '피처 (이동평균 / z-score / 백분위 / 변화)',
+    'risk': '위험 점수 / 등급 이력',
+    'scenario': '시나리오 이력',
+}
+
+EXPORT_FORMATS = {
+    'parquet': {'label': 'Parquet', 'ext': 'parquet', 'mime': 'application/vnd.apache.parquet'},
+    'arrow': {'label': 'Arrow IPC', 'ext': 'arrow', 'mime': 'application/vnd.apache.arrow.stream'},
+    'csv': {'label': 'CSV', 'ext': 'csv', 'mime': 'text/csv'},
+}
+
+CSV_CHUNK_ROWS = 5000
+EXPORT_CACHE_ENTRIES = 16
+
+def available_formats():
+    """설치된 라이브러리로 만들 수 있는 형식"""
+    return [f for f in EXPORT_FORMATS if f == 'csv' or pa is not None]
+
+def native_frame(store):
+    """압축 저장소 → (date, series, value) long 형식 (시리즈별 원래 관측일만)"""
+    parts = [pd.DataFrame({'date': record_index(rec), 'series': key, 'value': expand_values(rec)})
+             for key, rec in store.items()]
+    frame = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=['date', 'series', 'value'])
+    frame['series'] = pd.Categorical(frame['series'], categories=list(store))
+    return frame
+
+def export_frame(dataset, table, risk_rules=None, risk_levels=None, features=None):
+    """내보낼 DataFrame (날짜 인덱스 표는 date 컬럼으로 풀어서)"""
+    df = dataset['df']
+    if table == 'master':
+        frame = df
+    elif table == 'native':
+        if dataset.get('store') is None:
+            raise ValueError("원래 주기 시리즈 저장소가 없는 데이터셋입니다")
+        return native_frame(dataset['store'])
+    elif table == 'features':
+        frame = compute_features(df) if features is None else features
+    elif table == 'risk':
+        score = risk_score_series(df, risk_rules)
+        frame = pd.DataFrame({'RISK_SCORE': score, 'RISK_LEVEL': risk_level_series(score, risk_levels)})
+    elif table == 'scenario':
+        frame = scenario_series(df).to_frame()
+    else:
+        raise ValueError(f"알 수 없는 내보내기 표: {table}")
+    return frame.rename_axis('date').reset_index()
+
+def iter_csv_chunks(frame, chunk_rows=CSV_CHUNK_ROWS):
+    """CSV를 행 묶음 단위 바이트로 (전체 문자열을 한 번에 만들지 않음)"""
+    for start in range(0, max(len(frame), 1), chunk_rows):
+        part = frame.iloc[start:start + chunk_rows]
+        yield part.to_csv(index=False, header=(start == 0), date_format='%Y-%m-%d').encode('utf-8')
+
+def encode_export(frame, fmt, version=''):
+    """DataFrame → 내보내기 바이트"""
+    if fmt == 'csv':
+        buf = io.BytesIO()
+        for chunk in iter_csv_chunks(frame):
+            buf.write(chunk)
+        return buf.getvalue()
+    if pa is None:
+        raise ValueError("pyarrow가 설치되어 있지 않아 Parquet/Arrow 형식을 만들 수 없습니다")
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), b'data_version': version.encode()})
+    sink = io.BytesIO()
+    if fmt == 'parquet':
+        pq.write_table(table, sink, compression='zstd')
+    elif fmt == 'arrow':
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        raise ValueError(f"알 수 없는 내보내기 형식: {fmt}")
+    return sink.getvalue()
+
+def build_export(dataset, table, fmt, risk_rules=None, risk_levels=None, features=None):
+    """(표, 형식) 내보내기 바이트 생성"""
+    frame = export_frame(dataset, table, risk_rules, risk_levels, features)
+    return encode_export(frame, fmt, dataset['version'])
+
+def export_filename(dataset, table, fmt):
+    """macro_{표}_{마지막 날짜}_{버전 앞 8자}.{확장자}"""
+    last = dataset['df'].index[-1].strftime('%Y%m%d')
+    return f"macro_{table}_{last}_{dataset['version'][:8]}.{EXPORT_FORMATS[fmt]['ext']}"
+
+# ============================================================
+# 버전별 내보내기 캐시 (백그라운드 생성)
+# ============================================================
+def new_export_cache(max_entries=EXPORT_CACHE_ENTRIES, workers=1):
+    """(버전, 표, 형식) → Future 캐시 + 생성 전용 스레드 풀"""
+    return {
+        'entries': OrderedDict(),
+        'lock': threading.Lock(),
+        'pool': ThreadPoolExecutor(max_workers=workers, thread_name_prefix='export'),
+        'max_entries': max_entries,
+    }
+
+def request_export(cache, dataset, table, fmt, risk_rules=None, risk_levels=None, features=None):
+    """내보내기 Future (이미 있으면 그대로, 없으면 백그라운드 생성 시작 - 호출 측은 기다리지 않음)"""
+    key = (dataset['version'], table, fmt)
+    with cache['lock']:
+        future = cache['entries'].get(key)
+        if future is not None and not (future.done() and future.exception() is not None):
+            cache['entries'].move_to_end(key)
+            return future
+        future = cache['pool'].submit(build_export, dataset, table, fmt, risk_rules, risk_levels, features)
+        cache['entries'][key] = future
+        # 오래된 버전부터 정리 (생성 중인 것은 남김)
+        for old in [k for k, f in cache['entries'].items() if f.done()][:max(0, len(cache['entries']) - cache['max_entries'])]:
+            cache['entries'].pop(old)
+    return future
+
+def export_nbytes(cache):
+    """캐시에 완성된 내보내기 바이트 합계"""
+    with cache['lock']:
+        done = [f for f in cache['entries'].values() if f.done() and f.exception() is None]
+    return int(np.sum([len(f.result()) for f in done])) if done else 0
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+# ============================================================
+# 피처 스토어 (이동평균 / z-score / 백분위 / 기간별 변화)
+# ============================================================
+# 마스터 프레임 전체 컬럼에 대해 한 번에 계산하고 데이터 버전별로 캐시한다.
+# 컬럼 이름 규칙: {컬럼}_MA7, {컬럼}_MA30, {컬럼}_Z252, {컬럼}_PCTL,
+#                {컬럼}_CHG{h} (절대 변화), {컬럼}_PCT{h} (변화율 %)
+
+MA_WINDOWS = (7, 30)
+Z_WINDOW = 252
+Z_MIN_PERIODS = 20
+CHANGE_HORIZONS = (7, 30, 90)
+
+def compute_features(df):
+    """모든 컬럼의 롤링/순위/변화 피처를 프레임 단위 연산으로 한 번에 계산"""
+    frames = []
+
+    for w in MA_WINDOWS:
+        frames.append(df.rolling(w, min_periods=1).mean().add_suffix(f'_MA{w}'))
+
+    roll = df.rolling(Z_WINDOW, min_periods=Z_MIN_PERIODS)
+    mean, std = roll.mean(), roll.std()
+    frames.append(((df - mean) / std.where(std > 0)).add_suffix(f'_Z{Z_WINDOW}'))
+
+    # 확장 구간 백분위 (그날까지의 전체 이력 중 현재 값의 위치, 0-100)
+    frames.append((df.expanding(min_periods=1).rank(pct=True) * 100).add_suffix('_PCTL'))
+
+    for h in CHANGE_HORIZONS:
+        prev = df.shift(h)
+        diff = df - prev
+        frames.append(diff.add_suffix(f'_CHG{h}'))
+        frames.append((diff / prev.where(prev != 0) * 100).add_suffix(f'_PCT{h}'))
+
+    return pd.concat(frames, axis=1).astype(np.float64)
+
+def feature_suffixes():
+    """피처 접미사 목록 (MA7, MA30, Z252, PCTL, CHG7, PCT7, ...)"""
+    suffixes = [f'MA{w}' for w in MA_WINDOWS] + [f'Z{Z_WINDOW}', 'PCTL']
+    for h in CHANGE_HORIZONS:
+        suffixes += [f'CHG{h}', f'PCT{h}']
+    return suffixes
+
+def latest_features(features, col):
+    """한 지표의 마지막 행 피처 dict ({'MA7': ..., 'Z252': ..., 'CHG30': ...})"""
+    out = {}
+    for suffix in feature_suffixes():
+        name = f'{col}_{suffix}'
+        if name in features.columns and len(features) > 0:
+            out[suffix] = features[name].iloc[-1]
+    return out
+
+def describe_feature_context(features, col, unit=''):
+    """프롬프트/경고용 한 줄 요약 (이동평균, z-score, 역사적 백분위)"""
+    f = latest_features(features, col)
+    parts = []
+    if not pd.isna(f.get('MA7', np.nan)) and not pd.isna(f.get('MA30', np.nan)):
+        parts.append(f"MA7 {f['MA7']:.2f}{unit} / MA30 {f['MA30']:.2f}{unit}")
+    if not pd.isna(f.get(f'Z{Z_WINDOW}', np.nan)):
+        parts.append(f"1년 z-score {f[f'Z{Z_WINDOW}']:+.2f}")
+    if not pd.isna(f.get('PCTL', np.nan)):
+        parts.append(f"역사적 백분위 {f['PCTL']:.0f}%")
+    return " | ".join(parts)
@@ -0,0 +1,129 @@
+import base64
+import hashlib
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.io.json import to_json_plotly
+from plotly.offline import get_plotlyjs_version
+
+# ============================================================
+# 차트 직렬화 (typed array 바이너리 + 날짜축 공유 + 유효 자릿수 반올림)
+# ============================================================
+# 기본 fig.to_html/to_json은 trace마다 같은 날짜 배열을 ISO 문자열로 다시 쓰고 값도 긴 십진 문자열로 쓴다.
+#   compact_figure : 날짜 x는 epoch ms 숫자, y는 반올림한 float32로 바꿈 (plotly 6+는 numpy 배열을 bdata로 직렬화)
+#   figure_page    : 모든 x/y 배열을 base64 typed array로 한 번씩만 싣고 (같은 내용은 공유) 브라우저에서 풀어 그림
+
+FIGURE_DECIMALS = 4
+_DTYPES = {np.dtype(np.float64): 'f8', np.dtype(np.float32): 'f4', np.dtype(np.int32): 'i4',
+           np.dtype(np.int16): 'i2', np.dtype(np.int8): 'i1', np.dtype(np.uint8): 'u1'}
+
+# 압축 페이로드 → Plotly 입력 (같은 배열을 참조하는 trace는 같은 TypedArray 객체를 공유)
+FIGURE_LOADER = """
+function decodeFigure(p) {
+  var T = {f8: Float64Array, f4: Float32Array, i4: Int32Array, i2: Int16Array, i1: Int8Array, u1: Uint8Array};
+  var arrays = p.arrays.map(function (a) {
+    var s = atob(a.bdata), b = new Uint8Array(s.length);
+    for (var i = 0; i < s.length; i++) b[i] = s.charCodeAt(i);
+    return new T[a.dtype](b.buffer);
+  });
+  p.data.forEach(function (tr) {
+    ['x', 'y'].forEach(function (k) { if (tr[k] && tr[k].ref !== undefined) tr[k] = arrays[tr[k].ref]; });
+  });
+  return p;
+}
+"""
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><script src="__PLOTLY_SRC__"></script></head>
+<body style="margin: 0">
+<div id="fig" style="width: 100%; height: __HEIGHT__px"></div>
+<script>
+__LOADER__
+var fig = decodeFigure(__PAYLOAD__);
+Plotly.newPlot('fig', fig.data, fig.layout, {responsive: true}).then(function () {
+__POST_SCRIPT__
+});
+</script>
+</body></html>
+"""
+
+def _is_dates(values):
+    if isinstance(values, (pd.DatetimeIndex, pd.Series)) and pd.api.types.is_datetime64_any_dtype(values):
+        return True
+    arr = np.asarray(values)
+    return arr.dtype.kind == 'M' or (arr.dtype == object and len(arr) > 0 and isinstance(arr[0], pd.Timestamp))
+
+def date_ms(values):
+    """날짜 배열 → epoch ms (float64, Plotly 날짜축이 그대로 받는 숫자)"""
+    return (pd.DatetimeIndex(values).asi8 // 10**6).astype(np.float64)
+
+def round_values(values, decimals=FIGURE_DECIMALS):
+    """유효 자릿수로 반올림 (반올림 격자가 float32에 정확히 들어가면 float32)"""
+    arr = np.round(np.asarray(values, dtype=np.float64), decimals)
+    finite = arr[np.isfinite(arr)]
+    if not len(finite) or np.abs(finite).max() * 10 ** decimals < 2 ** 24:
+        return arr.astype(np.float32)
+    return arr
+
+def _numeric(values):
+    arr = np.asarray(values)
+    return arr.dtype.kind in 'fiu' and arr.ndim == 1
+
+def compact_figure(fig, decimals=FIGURE_DECIMALS):
+    """trace 배열을 바이너리 직렬화에 맞게 교체 (날짜 x → epoch ms, 숫자 y → 반올림 float32)"""
+    has_dates = False
+    for tr in fig.data:
+        x, y = getattr(tr, 'x', None), getattr(tr, 'y', None)
+        if x is not None and len(x) and _is_dates(x):
+            tr.x = date_ms(x)
+            has_dates = True
+        if y is not None and len(y) and _numeric(y):
+            tr.y = round_values(y, decimals)
+    if has_dates:
+        fig.update_xaxes(type='date')
+    return fig
+
+def _bdata(arr):
+    arr = np.ascontiguousarray(arr)
+    return {'dtype': _DTYPES[arr.dtype], 'bdata': base64.b64encode(arr.tobytes()).decode('ascii')}
+
+def encode_figure(fig, decimals=FIGURE_DECIMALS):
+    """Figure → {'data', 'layout', 'arrays'} (x/y는 arrays 참조, 같은 내용의 배열은 한 번만, 원본은 그대로)"""
+    fig = compact_figure(go.Figure(fig), decimals)
+    spec = fig.to_plotly_json()
+    arrays, refs = [], {}
+    # plotly 버전에 따라 to_plotly_json 배열 형식이 달라서 원본 trace 배열에서 직접 인코딩
+    for trace, tr in zip(fig.data, spec['data']):
+        for key in ('x', 'y'):
+            values = getattr(trace, key, None)
+            if values is None or isinstance(values, str) or not _numeric(values):
+                continue
+            arr = np.asarray(values)
+            if arr.dtype not in _DTYPES:
+                arr = arr.astype(np.float64)
+            digest = hashlib.blake2b(arr.dtype.str.encode() + arr.tobytes(), digest_size=16).digest()
+            if digest not in refs:
+                refs[digest] = len(arrays)
+                arrays.append(_bdata(arr))
+            tr[key] = {'ref': refs[digest]}
+    return {'data': spec['data'], 'layout': spec['layout'], 'arrays': arrays}
+
+def plotly_cdn_src():
+    return f"https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"
+
+def figure_page(fig, plotly_src, post_script='', decimals=FIGURE_DECIMALS):
+    """독립 차트 HTML (plotly_src: plotly.js 경로 또는 'cdn', post_script의 {plot_id}는 차트 div id)"""
+    payload = to_json_plotly(encode_figure(fig, decimals)).replace('</', '<\\/')
+    return (PAGE_TEMPLATE
+            .replace('__PLOTLY_SRC__', plotly_cdn_src() if plotly_src == 'cdn' else plotly_src)
+            .replace('__HEIGHT__', str(fig.layout.height or 600))
+            .replace('__LOADER__', FIGURE_LOADER)
+            .replace('__POST_SCRIPT__', (post_script or '').replace('{plot_id}', 'fig'))
+            .replace('__PAYLOAD__', payload))
+
+def payload_nbytes(fig, compact=True, decimals=FIGURE_DECIMALS):
+    """차트 JSON 크기 (compact=False면 기본 fig.to_json)"""
+    if not compact:
+        return len(fig.to_json().encode('utf-8'))
+    return len(to_json_plotly(encode_figure(fig, decimals)).encode('utf-8'))
@@ -0,0 +1,208 @@
+import os
+import pickle
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+
+import pandas as pd
+
+from series_registry import REGISTRY_PATH, load_registry, fetched_series, is_series_due, vintage_series
+from series_store import build_series_store, build_shared_dataset, compact_series, record_index, same_record
+from vintages import compact_vintages
+
+# ============================================================
+# FRED 동시 수집 (스레드 풀 + 요청 속도 제한)
+# ============================================================
+# FRED API 제한은 키당 분당 120회. 여유를 두고 110회로 제한
+MAX_CALLS_PER_MINUTE = 110
+MAX_WORKERS = 8
+MAX_RETRIES = 3
+
+_rate_lock = threading.Lock()
+_next_slot = [0.0]
+
+def _wait_for_slot(calls_per_minute):
+    """프로세스 공용 요청 간격 유지 (모든 배치/스레드가 공유)"""
+    interval = 60.0 / calls_per_minute
+    with _rate_lock:
+        now = time.monotonic()
+        slot = max(now, _next_slot[0])
+        _next_slot[0] = slot + interval
+    delay = slot - time.monotonic()
+    if delay > 0:
+        time.sleep(delay)
+
+_HTTP_STATUS = re.compile(r'HTTP Error (\d{3})')
+
+def _http_status(e):
+    """예외 또는 그 원인 체인의 HTTP 상태 코드 (없으면 None)
+
+    fredapi는 HTTPError를 받아 FRED 오류 메시지만 담은 ValueError로 다시 올리므로 __context__까지 본다.
+    """
+    while e is not None:
+        if isinstance(e, HTTPError):
+            return e.code
+        m = _HTTP_STATUS.search(str(e))
+        if m:
+            return int(m.group(1))
+        e = e.__cause__ or e.__context__
+    return None
+
+def _call_with_retries(call, calls_per_minute, retries):
+    """요청 속도 제한 + 429/5xx/시간 초과 지수 백오프 재시도"""
+    for attempt in range(retries):
+        _wait_for_slot(calls_per_minute)
+        try:
+            return call()
+        except Exception as e:
+            msg = str(e)
+            status = _http_status(e)
+            transient = (status == 429 or (status is not None and 500 <= status < 600)
+                         or "Too Many" in msg or "timed out" in msg.lower())
+            if not transient or attempt == retries - 1:
+                raise
+            time.sleep(2 ** attempt)
+
+def fetch_series(fred, series_id, start_date, calls_per_minute=MAX_CALLS_PER_MINUTE, retries=MAX_RETRIES):
+    """단일 시리즈 수집 + forward-fill (429/일시 오류는 지수 백오프 재시도)"""
+    data = _call_with_retries(lambda: fred.get_series(series_id, observation_start=start_date),
+                              calls_per_minute, retries)
+    if len(data) == 0:
+        return pd.Series(dtype=float)
+    return data.sort_index().ffill()
+
+def fetch_vintages(fred, series_id, start_date, calls_per_minute=MAX_CALLS_PER_MINUTE, retries=MAX_RETRIES):
+    """단일 시리즈의 ALFRED 전체 발표 이력 (realtime_start / date / value, start_date 이후 관측치만)"""
+    data = _call_with_retries(lambda: fred.get_series_all_releases(series_id), calls_per_minute, retries)
+    if len(data) == 0:
+        return pd.DataFrame(columns=['realtime_start', 'date', 'value'])
+    return data[pd.to_datetime(data['date']) >= pd.Timestamp(start_date)]
+
+def fetch_series_batch(fred, specs, start_date, max_workers=MAX_WORKERS, fetch=fetch_series):
+    """시리즈 묶음을 동시 수집. ({컬럼: Series}, {컬럼: 오류 메시지}) 반환
+
+    스레드 안에서는 Streamlit 호출을 하지 않고 오류만 모아 호출 측에서 표시한다.
+    fetch=fetch_vintages면 시리즈 대신 발표 이력 DataFrame을 받는다.
+    """
+    results = {}
+    errors = {}
+    if not specs:
+        return results, errors
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(specs))) as pool:
+        futures = {
+            spec['key']: pool.submit(fetch, fred, spec['fred_id'], start_date)
+            for spec in specs
+        }
+        for key, future in futures.items():
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                errors[key] = str(e)
+                results[key] = pd.Series(dtype=float)
+
+    return results, errors
+
+# ============================================================
+# 헤드리스 데이터셋 로드 (보정 도구 / 알림 / API 서버용)
+# ============================================================
+def load_dataset(api_key, start_date, registry_path=None):
+    """레지스트리의 모든 시리즈를 수집해 공유 데이터셋 dict 생성 (Streamlit 없이)"""
+    from fredapi import Fred
+
+    specs, _ = load_registry(registry_path or REGISTRY_PATH)
+    results, errors = fetch_series_batch(Fred(api_key=api_key), list(fetched_series(specs).values()), start_date)
+    return build_shared_dataset(build_series_store(results), errors)
+
+def save_snapshot(path, dataset, fetch_state, start_date):
+    """헤드리스 실행 사이에 유지할 상태 저장 (압축 저장소 / 수집 오류 / 수집 상태 / 변화점 감지 상태)"""
+    snapshot = {
+        'start_date': start_date,
+        'store': dataset['store'],
+        'errors': dataset['errors'],
+        'detectors': dataset.get('detectors'),
+        'fetch_state': fetch_state,
+    }
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+def load_snapshot(path, start_date):
+    """save_snapshot 파일 → (데이터셋, 수집 상태) (없거나 시작일이 다르면 (None, {}))"""
+    if not path or not os.path.exists(path):
+        return None, {}
+    with open(path, 'rb') as f:
+        snapshot = pickle.load(f)
+    if snapshot['start_date'] != start_date:
+        return None, {}
+    dataset = build_shared_dataset(snapshot['store'], snapshot['errors'])
+    dataset['detectors'] = snapshot['detectors']
+    return dataset, snapshot['fetch_state']
+
+def refresh_dataset(fred, specs, start_date, previous=None, state=None, force=False, now=None):
+    """발표 시점이 지난 시리즈만 다시 수집해 직전 데이터셋을 증분 갱신 → (데이터셋, 재수집 시리즈)
+
+    state는 {컬럼: {'last_fetch', 'last_obs', 'first_seen'}} 수집 상태로, 호출 측이 보관해 다음 호출에 넘긴다.
+    first_seen은 마지막 관측일이 늘어날 때마다 (그 관측일, 수집 시각)을 쌓은 목록이다 (release_lag.fetched_caps).
+    수집에 실패한 시리즈는 직전 레코드를 그대로 쓰고, 다시 수집에 성공할 때까지 errors에 남는다.
+    """
+    now = pd.Timestamp.now() if now is None else now
+    state = {} if state is None else state
+    fetched = fetched_series(specs)
+    old_store = previous['store'] if previous is not None else {}
+
+    due = []
+    for key, spec in fetched.items():
+        entry = state.setdefault(key, {'last_fetch': None, 'last_obs': None})
+        if key not in old_store or is_series_due(spec, entry, now, force):
+            due.append(key)
+
+    results, errors = fetch_series_batch(fred, [fetched[k] for k in due], start_date)
+    # 이번에 다시 받지 않은 시리즈의 이전 실패는 유지 (성공해야 지워짐)
+    old_errors = previous['errors'] if previous is not None else {}
+    errors = {**{k: msg for k, msg in old_errors.items() if k in fetched and k not in due}, **errors}
+    store = {k: rec for k, rec in old_store.items() if k in fetched}
+    for key in due:
+        entry = state[key]
+        entry['last_fetch'] = now
+        rec = compact_series(results[key])
+        # 실패했거나 빈 응답이면 마지막으로 성공한 레코드 유지
+        if key in store and (key in errors or len(rec['days']) == 0):
+            continue
+        store[key] = rec
+        if len(rec['days']) > 0:
+            entry['last_obs'] = record_index(rec)[-1]
+            # 이 수집에서 처음 받은 관측치는 늦어도 지금 발표된 것
+            seen = entry.setdefault('first_seen', [])
+            if not seen or entry['last_obs'] > seen[-1][0]:
+                seen.append((entry['last_obs'], now))
+
+    if previous is not None and not due:
+        return previous, due
+    return build_shared_dataset(store, errors, previous=previous), due
+
+# ============================================================
+# ALFRED 발표 이력 수집 (당시 발표 기준 조회용, vintages.py)
+# ============================================================
+def refresh_vintages(fred, specs, store, start_date, previous=None):
+    """수정 이력 시리즈의 vintage 레코드 수집 → {'records', 'basis', 'errors'}
+
+    basis는 vintage를 받을 때의 최신 값 레코드로, 최신 값이 바뀐 시리즈만 다시 받는다.
+    수집에 실패한 시리즈는 직전 레코드를 그대로 쓰고 다음 호출에서 다시 시도한다.
+    """
+    targets = {k: spec for k, spec in vintage_series(specs).items() if k in store}
+    previous = previous or {'records': {}, 'basis': {}, 'errors': {}}
+    records = {k: rec for k, rec in previous['records'].items() if k in targets}
+    basis = {k: rec for k, rec in previous['basis'].items() if k in targets}
+    due = [k for k in targets if k not in records or not same_record(basis[k], store[k])]
+
+    results, errors = fetch_series_batch(fred, [targets[k] for k in due], start_date, fetch=fetch_vintages)
+    for key in due:
+        if key in errors:
+            continue
+        records[key] = compact_vintages(results[key])
+        basis[key] = store[key]
+    return {'records': records, 'basis': basis, 'errors': errors}
@@ -0,0 +1,173 @@
+import numpy as np
+import pandas as pd
+
+from series_store import DERIVED_COLUMNS, record_to_series
+
+# ============================================================
+# 선행·후행 (lead-lag) 교차상관 엔진
+# ============================================================
+# 각 시리즈를 원래 주기에서 월 단위로 리샘플(분기 시리즈는 관측 월만 값, 나머지 NaN)하고
+# 12개월 변화로 정상화한 뒤, 모든 지표 쌍의 -36~+36개월 교차상관을 FFT로 한 번에 계산한다.
+# 결측은 마스크의 FFT로 겹치는 관측 수를 구해 정규화한다.
+# 부호 규칙: lag k > 0 이면 행 지표가 열 지표를 k개월 선행 (corr(x_i(t), x_j(t+k)) 최대).
+
+MAX_LAG_MONTHS = 36
+CHANGE_MONTHS = 12
+MIN_OVERLAP = 36
+STABILITY_WINDOW = 180
+STABILITY_STEP = 60
+STABILITY_TOLERANCE = 3
+# 한 번에 irfft할 (주파수 × 행 블록 × 열) 원소 수 상한 - 지표 수가 늘어도 메모리 일정
+BLOCK_BUDGET = 4_000_000
+
+# 같은 값을 다른 경로로 계산한 중복 컬럼은 제외
+EXCLUDED_COLUMNS = ('YIELD_CURVE_DIRECT', 'YIELD_CURVE_CALC')
+
+def monthly_panel(store, df, columns=None):
+    """원래 주기 저장소 → 월 단위 패널 (월 마지막 관측치, 분기 시리즈는 관측 월만)"""
+    cols = {}
+    for key, rec in store.items():
+        if len(rec['days']) == 0 or key in EXCLUDED_COLUMNS:
+            continue
+        cols[key] = record_to_series(rec).resample('MS').last()
+    # 파생 시리즈는 일간 마스터 프레임에서 월말 값
+    derived = [c for c in DERIVED_COLUMNS if c in df.columns and c not in cols and c not in EXCLUDED_COLUMNS]
+    if derived:
+        monthly = df[derived].resample('MS').last()
+        for c in derived:
+            cols[c] = monthly[c]
+    panel = pd.DataFrame(cols).sort_index()
+    if columns is not None:
+        panel = panel[[c for c in columns if c in panel.columns]]
+    return panel
+
+def _standardize(X):
+    """열별 표준화 후 NaN → 0, 관측 마스크 반환"""
+    mask = np.isfinite(X)
+    cnt = np.maximum(mask.sum(axis=0), 1)
+    mu = np.where(mask, X, 0.0).sum(axis=0) / cnt
+    Z = np.where(mask, X - mu, 0.0)
+    sd = np.sqrt((Z ** 2).sum(axis=0) / cnt)
+    sd[sd == 0] = 1.0
+    return Z / sd, mask.astype(np.float64)
+
+def cross_correlation(X, max_lag=MAX_LAG_MONTHS, min_overlap=MIN_OVERLAP, block_budget=BLOCK_BUDGET):
+    """(시간 × 지표) 배열 → (지표 × 지표 × 2*max_lag+1) 교차상관 큐브 (FFT, 행 블록 단위)"""
+    T, N = X.shape
+    Z, M = _standardize(X)
+    nfft = 1 << int(np.ceil(np.log2(2 * T)))
+    FZ = np.fft.rfft(Z, n=nfft, axis=0)
+    FM = np.fft.rfft(M, n=nfft, axis=0)
+    # irfft 결과에서 lag -max_lag..+max_lag 위치 (음수 lag는 뒤쪽에 감김)
+    take = np.r_[np.arange(nfft - max_lag, nfft), np.arange(0, max_lag + 1)]
+
+    out = np.full((N, N, len(take)), np.nan, dtype=np.float32)
+    block = max(1, block_budget // (FZ.shape[0] * N))
+    for i0 in range(0, N, block):
+        i1 = min(i0 + block, N)
+        # c[k] = Σ_t x_i(t) x_j(t+k)  ←  irfft(conj(F_i) * F_j)
+        # c_ji[k] = c_ij[-k] 이므로 j >= i0 열만 계산하고 나머지는 lag를 뒤집어 채운다
+        num = np.fft.irfft(np.conj(FZ[:, i0:i1, None]) * FZ[:, None, i0:], n=nfft, axis=0)[take]
+        cnt = np.rint(np.fft.irfft(np.conj(FM[:, i0:i1, None]) * FM[:, None, i0:], n=nfft, axis=0)[take])
+        corr = np.divide(num, cnt, out=np.full(num.shape, np.nan), where=cnt >= min_overlap)
+        corr = np.clip(np.moveaxis(corr, 0, -1), -1, 1)
+        out[i0:i1, i0:] = corr
+        out[i0:, i0:i1] = np.swapaxes(corr, 0, 1)[..., ::-1]
+    return out
+
+def peak_lags(cube, lags):
+    """교차상관 큐브 → (최대 |상관| lag, 그때 상관) 행렬"""
+    absval = np.where(np.isfinite(cube), np.abs(cube), -1.0)
+    idx = absval.argmax(axis=-1)
+    peak = np.take_along_axis(cube, idx[..., None], axis=-1)[..., 0]
+    lag = lags[idx].astype(np.float64)
+    missing = absval.max(axis=-1) < 0
+    lag[missing] = np.nan
+    return lag, np.where(missing, np.nan, peak)
+
+def build_leadlag(store, df, columns=None, max_lag=MAX_LAG_MONTHS, change_months=CHANGE_MONTHS,
+                  window=STABILITY_WINDOW, step=STABILITY_STEP, tolerance=STABILITY_TOLERANCE):
+    """모든 지표 쌍의 선행·후행 관계 (데이터 버전별 1회 생성)
+
+    stability: 전체 기간 최대 lag와 ±tolerance개월 이내인 롤링 구간(window개월, step개월 간격) 비율
+    """
+    panel = monthly_panel(store, df, columns)
+    changes = panel - panel.shift(change_months)
+    X = changes.to_numpy(dtype=np.float64)
+    lags = np.arange(-max_lag, max_lag + 1)
+
+    cube = cross_correlation(X, max_lag)
+    lag, peak = peak_lags(cube, lags)
+
+    # 롤링 구간별 최대 lag
+    window_lags = []
+    for start in range(0, max(len(X) - window, 0) + 1, step):
+        sub = X[start:start + window]
+        if len(sub) < window:
+            break
+        w_lag, _ = peak_lags(cross_correlation(sub, max_lag), lags)
+        window_lags.append(w_lag)
+    if window_lags:
+        W = np.stack(window_lags)
+        valid = np.isfinite(W)
+        n_valid = valid.sum(axis=0)
+        close = (np.abs(W - lag) <= tolerance) & valid
+        stability = np.divide(close.sum(axis=0), n_valid, out=np.full(lag.shape, np.nan), where=n_valid > 0)
+        lag_std = np.sqrt(np.divide(np.where(valid, (W - lag) ** 2, 0).sum(axis=0), n_valid,
+                                    out=np.full(lag.shape, np.nan), where=n_valid > 0))
+    else:
+        stability = np.full(lag.shape, np.nan)
+        lag_std = np.full(lag.shape, np.nan)
+
+    np.fill_diagonal(lag, np.nan)
+    np.fill_diagonal(peak, np.nan)
+    names = list(panel.columns)
+    return {
+        'columns': names,
+        'lags': lags,
+        'cube': cube,
+        'peak_lag': pd.DataFrame(lag, index=names, columns=names),
+        'peak_corr': pd.DataFrame(peak, index=names, columns=names),
+        'stability': pd.DataFrame(stability, index=names, columns=names),
+        'lag_std': pd.DataFrame(lag_std, index=names, columns=names),
+        'n_windows': len(window_lags),
+        'months': len(panel),
+    }
+
+def pair_curve(leadlag, lead, lag_col):
+    """두 지표의 lag별 상관 Series (index: lag 개월, 양수 = lead가 선행)"""
+    i = leadlag['columns'].index(lead)
+    j = leadlag['columns'].index(lag_col)
+    return pd.Series(leadlag['cube'][i, j], index=leadlag['lags'], name=f'{lead}→{lag_col}')
+
+def leadlag_table(leadlag, min_abs_corr=0.3):
+    """쌍별 요약 표 (선행 방향으로 정리, |상관| 기준 내림차순)"""
+    lag, corr = leadlag['peak_lag'], leadlag['peak_corr']
+    rows = []
+    cols = leadlag['columns']
+    for a in range(len(cols)):
+        for b in range(a + 1, len(cols)):
+            k, r = lag.iat[a, b], corr.iat[a, b]
+            if pd.isna(k) or abs(r) < min_abs_corr:
+                continue
+            lead, follow = (cols[a], cols[b]) if k >= 0 else (cols[b], cols[a])
+            rows.append({
+                'lead': lead, 'lag': follow, 'months': abs(int(k)), 'corr': r,
+                'stability': leadlag['stability'].iat[a, b], 'lag_std': leadlag['lag_std'].iat[a, b],
+            })
+    table = pd.DataFrame(rows, columns=['lead', 'lag', 'months', 'corr', 'stability', 'lag_std'])
+    return table.reindex(table['corr'].abs().sort_values(ascending=False).index).reset_index(drop=True)
+
+def format_leadlag_for_prompt(leadlag, pairs):
+    """프롬프트용 주요 쌍 선행 관계 텍스트 [(선행 후보, 후행 후보)]"""
+    lines = []
+    for a, b in pairs:
+        if a not in leadlag['columns'] or b not in leadlag['columns']:
+            continue
+        k, r = leadlag['peak_lag'].at[a, b], leadlag['peak_corr'].at[a, b]
+        if pd.isna(k):
+            continue
+        direction = f"{a}가 {b}를 {int(k)}개월 선행" if k > 0 else (
+            f"{b}가 {a}를 {int(-k)}개월 선행" if k < 0 else "동행")
+        lines.append(f"- {a} vs {b}: {direction} (상관 {r:+.2f}, 구간 안정성 {leadlag['stability'].at[a, b]:.0%})")
+    return "\n".join(lines) if lines else "데이터 없음"
@@ -0,0 +1,256 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from features import latest_features
+
+# ============================================================
+# 위험도 / 시나리오 판정 핵심 로직 (Streamlit 비의존)
+# ============================================================
+# 대시보드, 보정 도구, 알림/API 등 모든 소비자가 같은 규칙을 쓰도록 여기 모아 둔다.
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+RISK_CONFIG_PATH = os.environ.get("MACRO_RISK_CONFIG", os.path.join(_HERE, "risk_config.json"))
+RECESSIONS_PATH = os.environ.get("MACRO_RECESSIONS_PATH", os.path.join(_HERE, "nber_recessions.csv"))
+
+# 규칙별 단계(tier)는 위에서부터 검사해 처음 만족하는 단계의 점수만 더한다.
+# latest_valid=True면 마지막 행 대신 마지막 유효 관측치(분기 연체율)를 사용한다.
+DEFAULT_RISK_RULES = [
+    {
+        'name': 'yield_curve', 'column': 'YIELD_CURVE', 'direction': 'below', 'latest_valid': False,
+        'tiers': [
+            {'threshold': 0.0, 'points': 3, 'message': "🔴 수익률 곡선 역전 (경기침체 전조)"},
+            {'threshold': 0.3, 'points': 1, 'message': "⚠️ 수익률 곡선 평탄화 (역전 임박)"},
+        ],
+    },
+    {
+        'name': 'dgs10', 'column': 'DGS10', 'direction': 'above', 'latest_valid': False,
+        'tiers': [
+            {'threshold': 4.5, 'points': 2, 'message': "⚠️ 10년물 금리 고점 영역"},
+            {'threshold': 4.0, 'points': 1, 'message': "💡 10년물 금리 상승 추세"},
+        ],
+    },
+    {
+        'name': 'hy_spread', 'column': 'HY_SPREAD', 'direction': 'above', 'latest_valid': False,
+        'tiers': [
+            {'threshold': 5.0, 'points': 3, 'message': "🔴 하이일드 스프레드 급등"},
+            {'threshold': 4.5, 'points': 2, 'message': "⚠️ 하이일드 스프레드 확대"},
+        ],
+    },
+    {
+        'name': 'rate_gap', 'column': 'RATE_GAP', 'direction': 'above', 'latest_valid': False,
+        'tiers': [
+            {'threshold': 1.0, 'points': 2, 'message': "💧 금리 괴리 과도 확대"},
+            {'threshold': 0.5, 'points': 1, 'message': "💧 금리 괴리 확대"},
+        ],
+    },
+    {
+        'name': 'cc_delinq', 'column': 'CC_DELINQ', 'direction': 'above', 'latest_valid': True,
+        'tiers': [
+            {'threshold': 5.0, 'points': 3, 'message': "🔴 신용카드 연체율 >{threshold:g}%"},
+            {'threshold': 3.5, 'points': 2, 'message': "🪳 신용카드 연체율 급등"},
+        ],
+    },
+    {
+        'name': 'cre_delinq', 'column': 'CRE_DELINQ_ALL', 'direction': 'above', 'latest_valid': True,
+        'tiers': [
+            {'threshold': 3.0, 'points': 3, 'message': "🔴 CRE 연체율 >{threshold:g}%"},
+            {'threshold': 2.0, 'points': 2, 'message': "🏢 CRE 연체율 상승"},
+        ],
+    },
+    {
+        'name': 'auto_delinq', 'column': 'AUTO_DELINQ', 'direction': 'above', 'latest_valid': True,
+        'tiers': [
+            {'threshold': 3.0, 'points': 2, 'message': "🚗 오토론 연체율 >{threshold:g}%"},
+            {'threshold': 2.5, 'points': 1, 'message': "🚗 오토론 연체율 상승세"},
+        ],
+    },
+]
+
+# (최소 점수, 등급, 색상) - 위에서부터 검사
+DEFAULT_RISK_LEVELS = [
+    (10, "🔴 CRITICAL RISK", "darkred"),
+    (7, "🔴 HIGH RISK", "red"),
+    (4, "🟡 MEDIUM RISK", "orange"),
+    (None, "🟢 LOW RISK", "green"),
+]
+
+HIGH_RISK_LEVEL = "🔴 HIGH RISK"
+
+def load_risk_config(path=RISK_CONFIG_PATH):
+    """보정된 위험도 설정(JSON)이 있으면 기본 규칙에 덮어써 (규칙, 등급, 출처) 반환
+
+    형식: {"rules": {"hy_spread": {"thresholds": [5.5, 4.8], "points": [3, 2]}, ...},
+           "levels": [10, 7, 4], "source": "..."}
+    """
+    rules = [dict(r, tiers=[dict(t) for t in r['tiers']]) for r in DEFAULT_RISK_RULES]
+    levels = list(DEFAULT_RISK_LEVELS)
+    if not path or not os.path.exists(path):
+        return rules, levels, None
+
+    with open(path, encoding='utf-8') as f:
+        cfg = json.load(f)
+
+    by_name = {r['name']: r for r in rules}
+    for name, override in cfg.get('rules', {}).items():
+        if name not in by_name:
+            raise ValueError(f"risk_config: 알 수 없는 규칙 '{name}'")
+        tiers = by_name[name]['tiers']
+        for tier, th in zip(tiers, override.get('thresholds', [])):
+            tier['threshold'] = float(th)
+        for tier, pts in zip(tiers, override.get('points', [])):
+            tier['points'] = pts
+
+    cutoffs = cfg.get('levels')
+    if cutoffs:
+        levels = [(c, lv, color) for c, (_, lv, color) in zip(cutoffs, levels[:-1])] + [levels[-1]]
+
+    return rules, levels, cfg.get('source', os.path.basename(path))
+
+def _tier_hit(value, tier, direction):
+    """단일 값의 단계 충족 여부 (NaN은 항상 False)"""
+    return value < tier['threshold'] if direction == 'below' else value > tier['threshold']
+
+def risk_level(score, levels=DEFAULT_RISK_LEVELS):
+    """점수 → (등급, 색상)"""
+    for cutoff, level, color in levels:
+        if cutoff is None or score >= cutoff:
+            return level, color
+    return levels[-1][1], levels[-1][2]
+
+def assess_macro_risk(df, features=None, rules=None, levels=None):
+    """종합 위험도 평가 (features가 있으면 입력 지표의 z-score/백분위/변화 포함)"""
+    rules = DEFAULT_RISK_RULES if rules is None else rules
+    levels = DEFAULT_RISK_LEVELS if levels is None else levels
+    latest = df.iloc[-1]
+    risk_score = 0
+    warnings_ = []
+
+    for rule in rules:
+        col = rule['column']
+        if rule['latest_valid']:
+            if col not in df.columns:
+                continue
+            valid = df[col].dropna()
+            if len(valid) == 0:
+                continue
+            value = valid.iloc[-1]
+        else:
+            value = latest[col]
+
+        for tier in rule['tiers']:
+            if _tier_hit(value, tier, rule['direction']):
+                risk_score += tier['points']
+                warnings_.append(tier['message'].format(threshold=tier['threshold']))
+                break
+
+    level, color = risk_level(risk_score, levels)
+
+    return {
+        "score": risk_score,
+        "level": level,
+        "color": color,
+        "warnings": warnings_,
+        "latest": latest,
+        "context": {r['column']: latest_features(features, r['column']) for r in rules} if features is not None else {}
+    }
+
+def rule_points(values, rule, tiers=None):
+    """규칙 하나의 날짜별 점수 배열 (벡터화)"""
+    tiers = rule['tiers'] if tiers is None else tiers
+    conds = [values < t['threshold'] if rule['direction'] == 'below' else values > t['threshold'] for t in tiers]
+    return np.select(conds, [t['points'] for t in tiers], 0)
+
+def rule_values(df, rule):
+    """규칙 입력 값 배열 (latest_valid 규칙은 마지막 유효값으로 ffill)"""
+    if rule['column'] not in df.columns:
+        return np.full(len(df), np.nan)
+    s = df[rule['column']]
+    if rule['latest_valid']:
+        s = s.ffill()
+    return s.to_numpy(dtype=np.float64)
+
+def risk_score_series(df, rules=None):
+    """모든 날짜의 위험 점수 (assess_macro_risk를 날짜마다 적용한 것과 같은 값)"""
+    rules = DEFAULT_RISK_RULES if rules is None else rules
+    score = np.zeros(len(df))
+    for rule in rules:
+        score += rule_points(rule_values(df, rule), rule)
+    if np.array_equal(score, np.round(score)):
+        score = score.astype(np.int64)
+    return pd.Series(score, index=df.index, name='RISK_SCORE')
+
+def risk_level_series(score, levels=None):
+    """점수 Series → 등급 Series"""
+    levels = DEFAULT_RISK_LEVELS if levels is None else levels
+    conds = [score >= c for c, _, _ in levels if c is not None]
+    labels = [lv for c, lv, _ in levels if c is not None]
+    return pd.Series(np.select(conds, labels, levels[-1][1]), index=score.index, name='RISK_LEVEL')
+
+# ============================================================
+# 시나리오 / 역전 구간
+# ============================================================
+def determine_scenario(yield_curve, policy_spread):
+    """금리 스프레드 기반 시나리오 판별"""
+    inverted = yield_curve < 0
+    easing_expected = policy_spread < 0
+
+    if inverted and not easing_expected:
+        return 1  # 스태그플레이션
+    elif inverted and easing_expected:
+        return 2  # 침체 경고
+    elif not inverted and not easing_expected:
+        return 3  # 건강한 성장
+    else:
+        return 4  # 정책 전환점
+
+def scenario_codes(yield_curve, policy_spread):
+    """determine_scenario의 벡터화 버전 (ndarray 입력 → int 배열)"""
+    inverted = np.asarray(yield_curve) < 0
+    easing = np.asarray(policy_spread) < 0
+    return np.select([inverted & ~easing, inverted & easing, ~inverted & ~easing], [1, 2, 3], 4)
+
+def scenario_series(df):
+    """날짜별 시나리오 번호"""
+    codes = scenario_codes(df['YIELD_CURVE'].to_numpy(), df['POLICY_SPREAD'].to_numpy())
+    return pd.Series(codes, index=df.index, name='Scenario')
+
+def find_inversion_periods(yield_curve_series):
+    """수익률 곡선 역전 구간 탐지"""
+    inversions = []
+    in_inv = False
+    start = None
+
+    for date, val in yield_curve_series.items():
+        if pd.isna(val):
+            continue
+        if val < 0 and not in_inv:
+            in_inv = True
+            start = date
+        elif val >= 0 and in_inv:
+            inversions.append((start, date))
+            in_inv = False
+
+    if in_inv:
+        inversions.append((start, yield_curve_series.index[-1]))
+
+    return inversions
+
+# ============================================================
+# 경기침체 일자 (로컬 파일)
+# ============================================================
+def load_recession_dates(path=RECESSIONS_PATH):
+    """경기침체 정점/저점 CSV (peak, trough 컬럼) → DataFrame"""
+    rec = pd.read_csv(path, parse_dates=['peak', 'trough'])
+    return rec.sort_values('peak').reset_index(drop=True)
+
+def recession_indicator(index, recessions):
+    """날짜별 경기침체 여부 (정점 다음 날 ~ 저점, 0/1 배열)"""
+    dates = pd.DatetimeIndex(index).values
+    flag = np.zeros(len(dates), dtype=np.int8)
+    for peak, trough in zip(recessions['peak'].values, recessions['trough'].values):
+        flag[(dates > peak) & (dates <= trough)] = 1
+    return flag
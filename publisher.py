@@ -0,0 +1,160 @@
+import html
+import json
+import os
+import shutil
+
+import pandas as pd
+import plotly
+from plotly.offline import get_plotlyjs
+
+from figure_codec import figure_page
+from range_nav import range_chart_html
+
+# ============================================================
+# 정적 스냅샷 발행 (데이터 버전별 HTML / JSON 번들)
+# ============================================================
+# 오늘 수치와 차트만 보는 독자는 Streamlit 세션 없이 일반 파일 서버에서 이 번들을 받는다.
+#
+#   {out_dir}/index.html                 최신 버전 페이지 (짧게 캐시)
+#   {out_dir}/latest.json                최신 버전 스냅샷 JSON (짧게 캐시)
+#   {out_dir}/plotly-{버전}.min.js        모든 차트가 같이 쓰는 plotly.js (한 번만 받음)
+#   {out_dir}/v/{데이터 버전}/            index.html, snapshot.json, 차트별 독립 HTML (변하지 않음 - 길게 캐시)
+#   {out_dir}/v/{데이터 버전}/daily/{연도}.json   기간 이동 차트가 확대 시 받아 가는 연도별 일간 데이터 (range_nav.py)
+#
+# 버전 디렉터리는 임시 이름으로 다 쓴 뒤 이름을 바꾸고, 최신 포인터(index.html / latest.json)도
+# 원자적으로 교체하므로 파일 서버는 반쯤 쓴 번들을 내보내지 않는다.
+
+PUBLISH_DIR = os.environ.get("MACRO_PUBLISH_DIR")   # 없으면 발행 안 함
+KEEP_VERSIONS = 3
+
+FIGURE_TITLES = {
+    'dashboard': '📈 위험관리 대시보드',
+    'scenario': '📊 금리 스프레드 분석',
+}
+
+DEFAULT_FIGURE_HEIGHT = 900
+
+PAGE_CSS = """
+body { font-family: -apple-system, 'Segoe UI', 'Noto Sans KR', sans-serif; margin: 0 auto; max-width: 1200px; padding: 16px; color: #222; }
+.metrics { display: grid; grid-template-columns: repeat(4, 1fr); gap: 12px; }
+.metric { padding: 10px 14px; border: 1px solid #e5e5e5; border-radius: 8px; }
+.metric .label { font-size: 13px; color: #666; }
+.metric .value { font-size: 26px; }
+.box { padding: 20px; border-radius: 10px; margin: 12px 0; }
+.warning { background: #fff8e1; padding: 8px 12px; border-radius: 6px; margin: 6px 0; }
+.ai { display: grid; grid-template-columns: repeat(3, 1fr); gap: 12px; }
+.ai div { padding: 12px; border-radius: 8px; background: #f5f7fa; white-space: pre-wrap; }
+iframe { width: 100%; border: 0; }
+.caption { font-size: 12px; color: #888; }
+"""
+
+def plotly_js_name():
+    """공유 plotly.js 파일 이름 (plotly 버전이 바뀌면 새 파일)"""
+    return f"plotly-{plotly.__version__}.min.js"
+
+def _write_atomic(path, data):
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data.encode('utf-8') if isinstance(data, str) else data)
+    os.replace(tmp, path)
+
+def write_plotly_js(out_dir):
+    """공유 plotly.js를 한 번만 기록"""
+    path = os.path.join(out_dir, plotly_js_name())
+    if not os.path.exists(path):
+        _write_atomic(path, get_plotlyjs())
+    return path
+
+def figure_html(fig, plotly_src):
+    """차트 하나를 독립 HTML로 (plotly.js는 공유 파일을 script src로 참조)"""
+    return figure_page(fig, plotly_src)
+
+def _to_json(obj):
+    if isinstance(obj, (pd.Timestamp, pd.Period)):
+        return str(obj)
+    if hasattr(obj, 'item'):
+        return obj.item()
+    raise TypeError(f"JSON으로 바꿀 수 없는 값: {type(obj)}")
+
+def render_index(snapshot, prefix=''):
+    """번들 첫 페이지 (핵심 지표 / 위험도 / 시나리오 / AI 요약 / 차트 iframe)"""
+    esc = html.escape
+    risk, scenario, summary = snapshot['risk'], snapshot['scenario'], snapshot.get('summary')
+    metrics = "".join(
+        f"<div class='metric'><div class='label'>{esc(m['label'])}</div><div class='value'>{m['value']:.2f}{esc(m['unit'])}</div></div>"
+        for m in snapshot['metrics'] if m['value'] is not None)
+    warnings = "".join(f"<div class='warning'>{esc(w)}</div>" for w in risk['warnings'])
+    assets = "".join(f"<li><b>{esc(a)}</b>: {esc(v)}</li>" for a, v in scenario['assets'].items())
+    parts = [
+        "<!DOCTYPE html><html lang='ko'><head><meta charset='utf-8'>",
+        "<meta name='viewport' content='width=device-width, initial-scale=1'>",
+        f"<title>매크로 credit risk · {esc(snapshot['as_of'])}</title><style>{PAGE_CSS}</style></head><body>",
+        "<h1>🏦 매크로 credit risk (과거 경제반영 후행지표)</h1>",
+        f"<p class='caption'>데이터 기준일 {esc(snapshot['as_of'])} · {esc(snapshot['period_name'])} · "
+        f"발행 {esc(snapshot['published_at'])} · 데이터 버전 {esc(snapshot['version'])}</p>",
+        f"<h2>📊 핵심 지표</h2><div class='metrics'>{metrics}</div>",
+        f"<h2>🚨 종합 위험도 평가</h2><div class='box' style='background-color: {risk['color']}20; border-left: 5px solid {risk['color']}'>"
+        f"<h2>{esc(risk['level'])}</h2><p style='font-size: 18px;'><strong>리스크 점수:</strong> {risk['score']}/{risk['max_score']}</p></div>",
+        warnings,
+        f"<h2>🎯 시장 시나리오</h2><div class='box' style='background-color: {scenario['color']}20; border-left: 5px solid {scenario['color']}'>"
+        f"<h3>{esc(scenario['title'])}</h3><p><strong>의미:</strong> {esc(scenario['meaning'])}</p>"
+        f"<p><strong>위험도:</strong> {esc(scenario['risk'])}</p></div>",
+        f"<details><summary>📋 자산군별 권장 비중 (참고용)</summary><ul>{assets}</ul></details>",
+    ]
+    if summary:
+        parts.append(
+            "<h2>🤖 AI 시장 분석 요약</h2><div class='ai'>"
+            f"<div><b>🎯 현재 시장 상황</b><br>{esc(summary.get('market_status', ''))}</div>"
+            f"<div><b>⚠️ 주요 리스크</b><br>{esc(summary.get('key_risks', ''))}</div>"
+            f"<div><b>💡 투자 전략</b><br>{esc(summary.get('strategy', ''))}</div></div>"
+            f"<details><summary>📖 상세 AI 분석 보기</summary><div style='white-space: pre-wrap'>"
+            f"{esc(summary.get('full_analysis', ''))}</div></details>")
+    for name, fig in snapshot['figures'].items():
+        parts.append(f"<h2>{esc(FIGURE_TITLES.get(name, name))}</h2>"
+                     f"<iframe src='{prefix}{fig['file']}' loading='lazy' style='height: {fig['height'] + 20}px'></iframe>")
+    parts.append("</body></html>")
+    return "\n".join(parts)
+
+def publish_snapshot(out_dir, snapshot, figures, chunks=None, initial_start=None, keep=KEEP_VERSIONS):
+    """데이터 버전 번들 기록 + 최신 포인터 교체 → 버전 디렉터리 (이미 발행된 버전이면 포인터만 갱신)
+
+    chunks({연도: 바이트})가 있으면 차트는 기간 이동 차트로 쓰고 연도별 일간 파일을 같이 기록한다.
+    """
+    version = snapshot['version']
+    versions_dir = os.path.join(out_dir, 'v')
+    target = os.path.join(versions_dir, version)
+    os.makedirs(versions_dir, exist_ok=True)
+    write_plotly_js(out_dir)
+    snapshot = {**snapshot, 'figures': {name: {'file': f"{name}.html", 'height': fig.layout.height or DEFAULT_FIGURE_HEIGHT}
+                                        for name, fig in figures.items()}}
+    body = json.dumps(snapshot, ensure_ascii=False, default=_to_json, indent=1)
+
+    if not os.path.isdir(target):
+        staging = f"{target}.tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        src = f"../../{plotly_js_name()}"
+        for name, fig in figures.items():
+            page = (range_chart_html(fig, src, 'daily/{year}.json', initial_start) if chunks
+                    else figure_html(fig, src))
+            _write_atomic(os.path.join(staging, f"{name}.html"), page)
+        if chunks:
+            os.makedirs(os.path.join(staging, 'daily'))
+            for yr, chunk in chunks.items():
+                _write_atomic(os.path.join(staging, 'daily', f"{yr}.json"), chunk)
+        _write_atomic(os.path.join(staging, 'snapshot.json'), body)
+        _write_atomic(os.path.join(staging, 'index.html'), render_index(snapshot))
+        os.replace(staging, target)
+
+    _write_atomic(os.path.join(out_dir, 'latest.json'), body)
+    _write_atomic(os.path.join(out_dir, 'index.html'), render_index(snapshot, prefix=f"v/{version}/"))
+    prune_versions(out_dir, keep)
+    return target
+
+def prune_versions(out_dir, keep=KEEP_VERSIONS):
+    """오래된 버전 디렉터리 정리 (최근 keep개 유지)"""
+    versions_dir = os.path.join(out_dir, 'v')
+    dirs = sorted((os.path.join(versions_dir, d) for d in os.listdir(versions_dir) if not d.endswith('.tmp')),
+                  key=os.path.getmtime, reverse=True)
+    for old in dirs[keep:]:
+        shutil.rmtree(old, ignore_errors=True)
@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+
+from series_store import freeze_frame
+
+# ============================================================
+# 다중 해상도 집계 피라미드 (일 / 주 / 월 / 분기)
+# ============================================================
+# pyramid = {수준: {'index': 구간 마지막 영업일, 'label': 구간 라벨, 'starts': 구간 첫 행 번호(일간 기준),
+#                   'last' / 'mean' / 'min' / 'max': 집계 DataFrame}}
+# 'D'는 마스터 프레임 그대로 (복사 없음). 긴 기간 차트/조회는 기간과 픽셀 폭에 맞는 가장 거친 수준을 골라
+# 일간 행 전체 대신 수백 행만 읽는다. 새 데이터가 들어오면 바뀐 행이 속한 구간부터만 다시 집계한다.
+
+LEVELS = ['D', 'W', 'M', 'Q']   # 고운 → 거친 순
+LEVEL_FREQS = {'W': 'W-FRI', 'M': 'M', 'Q': 'Q'}
+LEVEL_LABELS = {'D': '일간', 'W': '주간', 'M': '월간', 'Q': '분기'}
+AGGREGATES = ('last', 'mean', 'min', 'max')
+
+# 차트 한 점당 최소 픽셀 (폭 1200px이면 300점 이상 되는 가장 거친 수준)
+PIXELS_PER_POINT = 4
+DEFAULT_WIDTH_PX = 1200
+
+def _daily_level(df):
+    level = {'index': df.index, 'label': df.index, 'starts': np.arange(len(df))}
+    level.update({agg: df for agg in AGGREGATES})
+    return level
+
+def _bucket_starts(index, freq):
+    """구간(주/월/분기)이 바뀌는 행 번호와 구간 라벨"""
+    periods = index.to_period(freq)
+    codes = periods.asi8
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.array([], dtype=np.int64)
+    # pandas resample 라벨과 같게: 주간은 구간 끝(금요일), 월/분기는 구간 시작일
+    first = periods[starts]
+    label = first.end_time.normalize() if freq.startswith('W') else first.start_time
+    return starts, pd.DatetimeIndex(label)
+
+def aggregate_level(df, level):
+    """일간 프레임 → 한 수준의 last / mean / min / max (NaN은 건너뜀)"""
+    starts, label = _bucket_starts(df.index, LEVEL_FREQS[level])
+    if not len(starts):
+        empty = df.iloc[:0]
+        return {'index': df.index[:0], 'label': label, 'starts': starts, **{agg: empty for agg in AGGREGATES}}
+    values = df.to_numpy(dtype=np.float64)
+    ends = np.r_[starts[1:], len(df)] - 1
+    valid = ~np.isnan(values)
+    counts = np.add.reduceat(valid, starts, axis=0)
+    sums = np.add.reduceat(np.where(valid, values, 0.0), starts, axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(counts > 0, sums / counts, np.nan)
+    index = df.index[ends]
+    frames = {
+        'last': values[ends],
+        'mean': mean,
+        'min': np.fmin.reduceat(values, starts, axis=0),
+        'max': np.fmax.reduceat(values, starts, axis=0),
+    }
+    level = {'index': index, 'label': label, 'starts': starts}
+    level.update({agg: pd.DataFrame(arr, index=index, columns=df.columns, copy=False) for agg, arr in frames.items()})
+    return level
+
+def build_pyramid(df):
+    """마스터 프레임 → 전체 수준 피라미드"""
+    pyramid = {'D': _daily_level(df)}
+    for level in LEVELS[1:]:
+        pyramid[level] = _freeze_level(aggregate_level(df, level))
+    return pyramid
+
+def _freeze_level(level):
+    for agg in AGGREGATES:
+        level[agg] = freeze_frame(level[agg])
+    return level
+
+def _first_changed_row(prev_df, df):
+    """두 마스터 프레임이 처음 달라지는 행 번호 (같으면 None)"""
+    m = min(len(prev_df), len(df))
+    diff_index = np.flatnonzero(prev_df.index[:m] != df.index[:m])
+    a, b = prev_df.to_numpy()[:m], df.to_numpy()[:m]
+    diff_values = np.flatnonzero(((a != b) & ~(np.isnan(a) & np.isnan(b))).any(axis=1))
+    first = [d[0] for d in (diff_index, diff_values) if len(d)]
+    if first:
+        return int(min(first))
+    return m if len(prev_df) != len(df) else None
+
+def update_pyramid(previous, df):
+    """새 마스터 프레임 반영 (바뀐 행이 속한 구간부터만 다시 집계, previous 없으면 전체 생성)"""
+    if previous is None or not previous['D']['last'].columns.equals(df.columns):
+        return build_pyramid(df)
+    prev_df = previous['D']['last']
+    if prev_df is df:
+        return previous
+    row = _first_changed_row(prev_df, df)
+    if row is None:
+        return {**previous, 'D': _daily_level(df)}
+
+    pyramid = {'D': _daily_level(df)}
+    for level in LEVELS[1:]:
+        prev = previous[level]
+        # 바뀐 행이 들어 있는 구간의 첫 행부터 다시 집계 (그 앞 구간은 그대로)
+        keep = max(int(np.searchsorted(prev['starts'], row, side='right')) - 1, 0)
+        row0 = int(prev['starts'][keep]) if len(prev['starts']) else 0
+        tail = aggregate_level(df.iloc[row0:], level)
+        merged = {
+            'index': prev['index'][:keep].append(tail['index']),
+            'label': prev['label'][:keep].append(tail['label']),
+            'starts': np.r_[prev['starts'][:keep], tail['starts'] + row0],
+        }
+        for agg in AGGREGATES:
+            merged[agg] = pd.concat([prev[agg].iloc[:keep], tail[agg]])
+        pyramid[level] = _freeze_level(merged)
+    return pyramid
+
+# ============================================================
+# 수준 선택 / 조회
+# ============================================================
+def _bounds(index, start=None, end=None):
+    lo = index.searchsorted(pd.Timestamp(start)) if start is not None else 0
+    hi = index.searchsorted(pd.Timestamp(end), side='right') if end is not None else len(index)
+    return lo, hi
+
+def select_level(pyramid, start=None, end=None, width_px=DEFAULT_WIDTH_PX, pixels_per_point=PIXELS_PER_POINT):
+    """기간 안 점 수가 픽셀 폭을 채우는 가장 거친 수준"""
+    target = max(int(width_px // pixels_per_point), 1)
+    for level in reversed(LEVELS[1:]):
+        lo, hi = _bounds(pyramid[level]['index'], start, end)
+        if hi - lo >= target:
+            return level
+    return 'D'
+
+def pyramid_view(pyramid, start=None, end=None, width_px=DEFAULT_WIDTH_PX, agg='last', level=None):
+    """기간에 맞는 수준의 집계 프레임 view → (프레임, 수준)"""
+    level = level or select_level(pyramid, start, end, width_px)
+    frame = pyramid[level][agg]
+    lo, hi = _bounds(frame.index, start, end)
+    return frame.iloc[lo:hi], level
+
+def hybrid_frame(pyramid, recent_start, coarse_level='W', agg='last'):
+    """recent_start 이후는 일간, 그 이전은 coarse_level 집계로 이어 붙인 전체 이력 프레임"""
+    daily = pyramid['D']['last']
+    coarse = pyramid[coarse_level][agg]
+    pos = daily.index.searchsorted(pd.Timestamp(recent_start))
+    cut = coarse.index.searchsorted(daily.index[pos]) if pos < len(daily) else len(coarse)
+    return pd.concat([coarse.iloc[:cut], daily.iloc[pos:]])
+
+def labelled(pyramid, level, agg='last'):
+    """구간 라벨(주간: 금요일, 월/분기: 시작일)을 인덱스로 한 집계 프레임 (resample 결과와 같은 모양)"""
+    frame = pyramid[level][agg]
+    return frame.set_axis(pyramid[level]['label'], axis=0) if level != 'D' else frame
@@ -0,0 +1,177 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from figure_codec import figure_page
+from pyramid import hybrid_frame
+
+# ============================================================
+# 브라우저 기간 이동 차트 (전체 이력 1회 전송 + 줌 시 일간 데이터 지연 로딩)
+# ============================================================
+# 전체 이력을 최근 RANGE_DAILY_YEARS년은 일간, 그 이전은 주간 집계로 한 번 보내고
+# 60일 / 1년 / 2년 / 5년 / 전체 이동은 Plotly 범위 버튼으로 브라우저에서 처리한다 (서버 재실행 없음).
+# 일간보다 거친 구간을 RANGE_LAZY_DAYS 이내로 확대하면 보이는 연도의 일간 데이터를
+# chunk_url('{year}'를 모두 치환)에서 받아 그 연도만 교체한다. 응답은 API /series JSON과 같은 split 형식.
+
+RANGE_DAILY_YEARS = 2
+RANGE_COARSE_LEVEL = 'W'
+RANGE_LAZY_DAYS = 3 * 365
+
+RANGE_BUTTONS = [
+    dict(count=60, label="60일", step="day", stepmode="backward"),
+    dict(count=1, label="1년", step="year", stepmode="backward"),
+    dict(count=2, label="2년", step="year", stepmode="backward"),
+    dict(count=5, label="5년", step="year", stepmode="backward"),
+    dict(label="전체", step="all"),
+]
+
+# 차트를 그린 뒤 실행되는 스크립트 ({plot_id}는 figure_page가, __X__는 range_chart_html이 치환)
+RANGE_SCRIPT = """
+(function () {
+  var gd = document.getElementById('{plot_id}');
+  var chunkUrl = __CHUNK_URL__, lazyDays = __LAZY_DAYS__, initialStart = __INITIAL_START__;
+  var DAY = 86400000;
+  function t(v) { return typeof v === 'number' ? v : Date.parse(String(v).slice(0, 10)); }
+  function year(v) { return new Date(t(v)).getUTCFullYear(); }
+  var base = gd.data.map(function (tr) {
+    return {x: Array.prototype.slice.call(tr.x || []), y: Array.prototype.slice.call(tr.y || [])};
+  });
+  var chunks = {}, pending = {};
+
+  function merged(i) {
+    var col = gd.data[i].meta, b = base[i], x = [], y = [], cur = null, j;
+    for (j = 0; j < b.x.length; j++) {
+      var yr = year(b.x[j]);
+      if (chunks[yr]) {
+        if (yr !== cur) {
+          var c = chunks[yr], k = c.columns.indexOf(col);
+          for (var r = 0; r < c.index.length; r++) { x.push(t(c.index[r])); y.push(c.data[r][k]); }
+          cur = yr;
+        }
+      } else { x.push(b.x[j]); y.push(b.y[j]); }
+    }
+    return {x: x, y: y};
+  }
+
+  function rescaleY() {
+    var xr = gd._fullLayout.xaxis.range.map(t), ranges = {};
+    gd.data.forEach(function (tr) {
+      if (tr.visible === 'legendonly' || !tr.y) return;
+      var ax = 'yaxis' + (tr.yaxis || 'y').slice(1), r = ranges[ax] || [Infinity, -Infinity];
+      for (var j = 0; j < tr.x.length; j++) {
+        var v = tr.y[j], d = t(tr.x[j]);
+        if (v === null || isNaN(v) || d < xr[0] || d > xr[1]) continue;
+        if (v < r[0]) r[0] = v;
+        if (v > r[1]) r[1] = v;
+      }
+      ranges[ax] = r;
+    });
+    var update = {};
+    Object.keys(ranges).forEach(function (ax) {
+      var r = ranges[ax];
+      if (!isFinite(r[0])) return;
+      var pad = (r[1] - r[0]) * 0.05 || Math.abs(r[0]) * 0.05 || 1;
+      update[ax + '.range'] = [r[0] - pad, r[1] + pad];
+    });
+    Plotly.relayout(gd, update);
+  }
+
+  function restyleLoaded() {
+    var idx = [], xs = [], ys = [];
+    gd.data.forEach(function (tr, i) {
+      if (!tr.meta) return;
+      var m = merged(i);
+      idx.push(i); xs.push(m.x); ys.push(m.y);
+    });
+    return Plotly.restyle(gd, {x: xs, y: ys}, idx);
+  }
+
+  function loadYears(y0, y1) {
+    var jobs = [];
+    for (var yr = y0; yr <= y1; yr++) {
+      if (chunks[yr] || pending[yr]) continue;
+      // '{year}'가 여러 번 나올 수 있어 전부 치환 (String.replace는 첫 번째만 바꿈)
+      pending[yr] = fetch(chunkUrl.split('{year}').join(yr))
+        .then(function (r) { if (!r.ok) throw new Error(r.status); return r.json(); })
+        .then((function (yr) { return function (body) { chunks[yr] = body.data; }; })(yr))
+        // 실패한 연도는 다음 범위 변경 때 다시 시도
+        .catch((function (yr) { return function () { delete pending[yr]; }; })(yr));
+      jobs.push(pending[yr]);
+    }
+    return Promise.all(jobs);
+  }
+
+  function onRange() {
+    var xr = gd._fullLayout.xaxis.range.map(t);
+    if (chunkUrl && xr[1] - xr[0] <= lazyDays * DAY) {
+      loadYears(new Date(xr[0]).getUTCFullYear(), new Date(xr[1]).getUTCFullYear())
+        .then(restyleLoaded).then(rescaleY);
+    } else {
+      rescaleY();
+    }
+  }
+
+  gd.on('plotly_relayout', function (ev) {
+    var keys = Object.keys(ev || {});
+    if (keys.some(function (k) { return k.indexOf('xaxis') === 0 && k.indexOf('autorange') > 0; })) {
+      var update = {};
+      Object.keys(gd._fullLayout).forEach(function (k) { if (/^yaxis\\d*$/.test(k)) update[k + '.autorange'] = true; });
+      Plotly.relayout(gd, update);
+    } else if (keys.some(function (k) { return k.indexOf('xaxis') === 0 && k.indexOf('range') > 0; })) {
+      onRange();
+    }
+  });
+
+  if (initialStart) {
+    var last = gd._fullLayout.xaxis.range[1];
+    Plotly.relayout(gd, {'xaxis.range': [initialStart, last]});
+  }
+})();
+"""
+
+def range_frame(pyramid, recent_years=RANGE_DAILY_YEARS, coarse_level=RANGE_COARSE_LEVEL):
+    """전체 이력 차트용 프레임 (최근 recent_years년은 일간, 이전은 coarse_level 마지막 값)"""
+    last = pyramid['D']['index'][-1]
+    return hybrid_frame(pyramid, last - pd.DateOffset(years=recent_years), coarse_level)
+
+def add_range_navigation(fig):
+    """모든 패널의 x축을 묶고 첫 x축에 기간 버튼 추가 (uirevision으로 재실행 후에도 줌 유지)"""
+    fig.update_xaxes(matches='x')
+    fig.layout.xaxis.matches = None
+    fig.update_layout(
+        xaxis=dict(rangeselector=dict(buttons=RANGE_BUTTONS, x=0, y=1.0, yanchor='bottom')),
+        uirevision='range',
+    )
+    return fig
+
+def range_chart_html(fig, plotly_src, chunk_url=None, initial_start=None, lazy_days=RANGE_LAZY_DAYS):
+    """기간 이동 스크립트를 붙인 독립 HTML (plotly_src: 공유 plotly.js 경로 또는 'cdn')"""
+    script = (RANGE_SCRIPT
+              .replace('__CHUNK_URL__', json.dumps(chunk_url))
+              .replace('__LAZY_DAYS__', str(int(lazy_days)))
+              .replace('__INITIAL_START__', json.dumps(initial_start)))
+    return figure_page(fig, plotly_src, script)
+
+def set_initial_start(html, initial_start):
+    """캐시된 차트 HTML의 처음 표시 시작일만 교체 (그림은 다시 만들지 않음)"""
+    return html.replace('initialStart = null', f'initialStart = {json.dumps(initial_start)}', 1)
+
+def daily_chunks(df, columns, version=''):
+    """연도별 일간 데이터 JSON (API /series JSON과 같은 형식) → {연도: 바이트}"""
+    frame = df[[c for c in columns if c in df.columns]]
+    chunks = {}
+    for yr, part in frame.groupby(frame.index.year, sort=True):
+        values = np.round(part.to_numpy(dtype=np.float64), 6).astype(object)
+        values[pd.isna(values)] = None
+        body = {
+            'columns': list(part.columns),
+            'index': list(part.index.strftime('%Y-%m-%d')),
+            'data': values.tolist(),
+        }
+        chunks[int(yr)] = json.dumps({'version': version, 'data': body}, allow_nan=False).encode('utf-8')
+    return chunks
+
+def traced_columns(fig):
+    """meta로 컬럼을 표시한 trace의 컬럼 목록 (일간 지연 로딩 대상)"""
+    return list(dict.fromkeys(tr.meta for tr in fig.data if isinstance(tr.meta, str)))
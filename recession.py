@@ -0,0 +1,162 @@
+import numpy as np
+import pandas as pd
+
+from macro_core import recession_indicator
+from pyramid import labelled
+
+# ============================================================
+# 경기침체 확률 나우캐스트 (probit/logit, IRLS)
+# ============================================================
+# 월평균 수익률 곡선 / 정책 스프레드 / 하이일드 스프레드로 '향후 12개월 안 경기침체' 여부를 적합한다.
+# - 전체 표본 적합: 계수/표준오차/in-sample 확률
+# - 확장 구간(expanding) 재적합: 각 월에 그 시점까지 레이블이 확정된 데이터만으로 적합한 확률 (실시간 재현)
+# 재적합은 직전 월 계수에서 시작(warm start)하므로 새 관측치가 들어오면 추가된 월만 몇 번의 IRLS 반복으로 갱신된다.
+
+RECESSION_FEATURES = ['YIELD_CURVE', 'POLICY_SPREAD', 'HY_SPREAD']
+HORIZON_MONTHS = 12
+MIN_TRAIN_MONTHS = 60
+MAX_ITER = 50
+TOL = 1e-8
+RIDGE = 1e-6
+
+_SQRT2 = np.sqrt(2.0)
+_SQRT2PI = np.sqrt(2.0 * np.pi)
+
+def _erf(x):
+    """벡터화 erf (Abramowitz-Stegun 7.1.26, 최대 오차 1.5e-7)"""
+    sign = np.sign(x)
+    x = np.abs(x)
+    t = 1.0 / (1.0 + 0.3275911 * x)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    return sign * (1.0 - poly * np.exp(-x * x))
+
+def _link(eta, link):
+    """선형 예측값 → (확률, dp/deta)"""
+    if link == 'logit':
+        p = 1.0 / (1.0 + np.exp(-np.clip(eta, -35, 35)))
+        return p, p * (1.0 - p)
+    p = 0.5 * (1.0 + _erf(eta / _SQRT2))
+    return p, np.exp(-0.5 * eta * eta) / _SQRT2PI
+
+def fit_binary(X, y, link='probit', beta0=None, max_iter=MAX_ITER, tol=TOL, ridge=RIDGE):
+    """IRLS로 이항 GLM 적합 → (계수, 공분산, 반복 횟수) (X는 절편 포함)"""
+    beta = np.zeros(X.shape[1]) if beta0 is None else np.asarray(beta0, dtype=np.float64).copy()
+    penalty = ridge * np.eye(X.shape[1])
+    penalty[0, 0] = 0.0
+    for it in range(1, max_iter + 1):
+        eta = X @ beta
+        p, dp = _link(eta, link)
+        p = np.clip(p, 1e-10, 1 - 1e-10)
+        dp = np.maximum(dp, 1e-10)
+        w = dp * dp / (p * (1.0 - p))
+        z = eta + (y - p) / dp
+        XtW = X.T * w
+        info = XtW @ X + penalty
+        new = np.linalg.solve(info, XtW @ z)
+        step = np.max(np.abs(new - beta))
+        beta = new
+        if step < tol:
+            break
+    return beta, np.linalg.pinv(info), it
+
+def predict_prob(X, beta, link='probit'):
+    """계수 → 확률"""
+    return _link(X @ beta, link)[0]
+
+def recession_target(index, recessions, horizon=HORIZON_MONTHS):
+    """월별 '향후 horizon개월 안에 경기침체 월이 있는지' (0/1) + 레이블 확정 여부"""
+    months = pd.DatetimeIndex(index)
+    in_rec = recession_indicator(months, recessions).astype(np.float64)
+    n = len(months)
+    # 누적합으로 (t, t+h] 구간의 침체 월 수를 한 번에 계산
+    csum = np.r_[0.0, np.cumsum(in_rec)]
+    ahead = np.minimum(np.arange(n) + horizon, n - 1)
+    target = (csum[ahead + 1] - csum[np.arange(n) + 1]) > 0
+    # 마지막 horizon개월은 미래가 아직 없으므로 레이블 미확정 (단, 이미 침체가 관측됐으면 1로 확정)
+    known = (np.arange(n) + horizon < n) | target
+    return target.astype(np.float64), known
+
+def monthly_design(df, columns=RECESSION_FEATURES, pyramid=None):
+    """일간 마스터 프레임 → 월평균 설계 행렬 (절편 포함, 결측 월 제외, pyramid가 있으면 월간 평균 수준을 읽음)"""
+    if pyramid is not None:
+        monthly = labelled(pyramid, 'M', 'mean')[columns].dropna()
+    else:
+        monthly = df[columns].resample('MS').mean().dropna()
+    X = np.column_stack([np.ones(len(monthly)), monthly.to_numpy(dtype=np.float64)])
+    return monthly, X
+
+def build_recession_model(df, recessions, link='probit', horizon=HORIZON_MONTHS,
+                          min_train=MIN_TRAIN_MONTHS, previous=None, pyramid=None):
+    """전체 표본 적합 + 확장 구간 재적합 확률 경로 (previous와 앞부분이 같으면 추가된 월만 재적합)"""
+    monthly, X = monthly_design(df, pyramid=pyramid)
+    y, known = recession_target(monthly.index, recessions, horizon)
+    n, k = X.shape
+
+    fit_rows = known
+    if y[fit_rows].min(initial=1) == y[fit_rows].max(initial=0):
+        raise ValueError("적합할 경기침체/비침체 표본이 모두 있어야 합니다.")
+    beta, cov, n_iter = fit_binary(X[fit_rows], y[fit_rows], link)
+    prob_full = predict_prob(X, beta, link)
+
+    # 직전 모델과 앞부분 월(마지막 월은 부분 월평균이라 제외)의 설계 행렬/레이블이 같으면 그 다음 월부터만 재적합
+    start = 0
+    coef_path = np.full((n, k), np.nan)
+    prob_exp = np.full(n, np.nan)
+    if previous is not None and previous['link'] == link and previous['horizon'] == horizon:
+        m = min(len(previous['X']), n) - 1
+        if (m > 0 and np.array_equal(previous['months'][:m], monthly.index[:m])
+                and np.array_equal(previous['X'][:m], X[:m]) and np.array_equal(previous['y'][:m], y[:m])):
+            start = m
+            coef_path[:start] = previous['coef_path'][:start]
+            prob_exp[:start] = previous['prob_expanding'].to_numpy()[:start]
+
+    # t 시점에는 레이블이 확정된 t - horizon 이전 월만 사용 (최소 min_train개월)
+    beta_t = coef_path[start - 1] if start > 0 and np.isfinite(coef_path[start - 1]).all() else None
+    for t in range(max(start, min_train + horizon - 1), n):
+        train = slice(0, t - horizon + 1)
+        y_tr = y[train]
+        if y_tr.min() == y_tr.max():
+            continue
+        beta_t, _, _ = fit_binary(X[train], y_tr, link, beta0=beta_t)
+        coef_path[t] = beta_t
+        prob_exp[t] = predict_prob(X[t:t + 1], beta_t, link)[0]
+
+    se = np.sqrt(np.clip(np.diag(cov), 0, None))
+    names = ['const'] + list(monthly.columns)
+    return {
+        'link': link,
+        'horizon': horizon,
+        'months': monthly.index,
+        'X': X,
+        'y': y,
+        'known': known,
+        'coef': pd.Series(beta, index=names),
+        'se': pd.Series(se, index=names),
+        'n_iter': n_iter,
+        'n_obs': int(fit_rows.sum()),
+        'n_positive': int(y[fit_rows].sum()),
+        'prob_full': pd.Series(prob_full, index=monthly.index, name='P_RECESSION'),
+        'prob_expanding': pd.Series(prob_exp, index=monthly.index, name='P_RECESSION_RT'),
+        'coef_path': coef_path,
+        'refit_from': start,
+    }
+
+def current_probability(model, latest):
+    """최신 일간 값(Series/dict)으로 계산한 확률 (전체 표본 계수)"""
+    x = np.r_[1.0, [latest[c] for c in model['coef'].index[1:]]]
+    if not np.isfinite(x).all():
+        return np.nan
+    return float(predict_prob(x[None, :], model['coef'].to_numpy(), model['link'])[0])
+
+def format_recession_for_prompt(model, latest):
+    """프롬프트용 경기침체 확률 요약"""
+    p_now = current_probability(model, latest)
+    rt = model['prob_expanding'].dropna()
+    lines = [f"- 향후 {model['horizon']}개월 내 경기침체 확률 ({model['link']}, 수익률 곡선·정책 스프레드·HY 스프레드): "
+             + ("-" if np.isnan(p_now) else f"{p_now:.1%}")]
+    if len(rt):
+        lines.append(f"- 실시간 재현(확장 구간 재적합) 최근 값: {rt.iloc[-1]:.1%} ({rt.index[-1]:%Y-%m}), "
+                     f"3개월 전 {rt.iloc[-4]:.1%}" if len(rt) > 3 else f"- 실시간 재현 최근 값: {rt.iloc[-1]:.1%}")
+    coef = ", ".join(f"{c} {b:+.2f}(±{s:.2f})" for c, b, s in zip(model['coef'].index, model['coef'], model['se']))
+    lines.append(f"- 계수: {coef} · 표본 {model['n_obs']}개월 중 침체 선행 {model['n_positive']}개월")
+    return "\n".join(lines)
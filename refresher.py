@@ -0,0 +1,147 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from detectors import run_detectors
+from fred_loader import refresh_dataset
+from pyramid import update_pyramid
+from series_registry import fetched_series, next_refresh_time
+
+# ============================================================
+# 백그라운드 데이터 갱신기 (stale-while-revalidate)
+# ============================================================
+# 요청은 항상 마지막으로 성공한 스냅샷을 바로 받고, 발표 시점이 지난 시리즈의 재수집은
+# 데몬 스레드가 FRED 발표 일정에 맞춰 수행한다 (Streamlit 호출 없음 - 대시보드와 API 서버가 같이 사용).
+# 스냅샷은 완성된 뒤 한 번에 교체되므로 읽는 쪽은 교체 전/후 중 하나만 본다.
+
+# 다음 발표 예정 시각이 멀어도 1시간마다는 확인
+REFRESH_MIN_SLEEP = 60        # 초
+REFRESH_MAX_SLEEP = 3600
+MAX_SNAPSHOTS = 4
+
+def new_refresher(fred, specs):
+    """갱신기 상태 (시작일별 마지막 성공 스냅샷 + 수집 상태)"""
+    return {
+        'fred': fred,
+        'specs': specs,
+        'datasets': {},
+        'fetch_state': {},
+        'lock': threading.Lock(),
+        'wake': threading.Event(),
+        'force': False,
+        'refreshing': False,
+        'last_attempt': None,
+        'last_success': None,
+        'last_error': None,
+        'thread': None,
+        # 새 데이터 버전이 만들어질 때 호출할 함수 (history_start, dataset) - 전용 스레드에서 순서대로 실행
+        'listeners': [],
+        'listener_pool': ThreadPoolExecutor(max_workers=1, thread_name_prefix='snapshot-listener'),
+        'listener_error': None,
+    }
+
+def start_refresher(fred, specs):
+    """갱신기 생성 + 백그라운드 스레드 시작"""
+    refresher = new_refresher(fred, specs)
+    thread = threading.Thread(target=refresh_loop, args=(refresher,), name='fred-refresher', daemon=True)
+    thread.start()
+    refresher['thread'] = thread
+    return refresher
+
+def build_snapshot(refresher, history_start, force=False):
+    """한 시작일의 스냅샷 갱신 (실패 시 직전 스냅샷 유지) → (데이터셋, 재수집 시리즈)"""
+    specs = refresher['specs']
+    previous = refresher['datasets'].get(history_start)
+    state = refresher['fetch_state'].setdefault(
+        history_start, {key: {'last_fetch': None, 'last_obs': None} for key in fetched_series(specs)})
+    dataset, refreshed = refresh_dataset(refresher['fred'], specs, history_start,
+                                         previous=previous, state=state, force=force)
+    if previous is not None and dataset is not previous and dataset['version'] == previous['version']:
+        # 새 관측치가 없으면 이전 스냅샷(수집 시각 포함)을 그대로 두고 수집 오류만 갱신
+        dataset = {**previous, 'errors': dataset['errors']}
+        refresher['datasets'][history_start] = dataset
+    elif dataset is not previous:
+        # 변화점 감지 상태는 저장소와 함께 보관하고 새로 들어온 관측치만 처리
+        dataset['detectors'] = run_detectors(dataset['store'], specs,
+                                             previous=previous['detectors'] if previous is not None else None,
+                                             previous_store=previous['store'] if previous is not None else None)
+        # 주/월/분기 집계도 바뀐 행이 속한 구간부터만 다시 계산
+        dataset['pyramid'] = update_pyramid(previous.get('pyramid') if previous is not None else None, dataset['df'])
+        refresher['datasets'][history_start] = dataset
+        notify_listeners(refresher, history_start, dataset)
+    return dataset, refreshed
+
+def add_listener(refresher, fn):
+    """새 스냅샷 알림 등록 (fn(history_start, dataset), 요청/갱신 스레드를 막지 않음)"""
+    refresher['listeners'].append(fn)
+
+def _run_listener(refresher, fn, history_start, dataset):
+    try:
+        fn(history_start, dataset)
+        refresher['listener_error'] = None
+    except Exception as e:
+        refresher['listener_error'] = f"{getattr(fn, '__name__', fn)}: {e}"
+
+def notify_listeners(refresher, history_start, dataset):
+    """등록된 리스너를 리스너 전용 스레드에 넘김"""
+    for fn in refresher['listeners']:
+        refresher['listener_pool'].submit(_run_listener, refresher, fn, history_start, dataset)
+
+def get_snapshot(refresher, history_start, keep=None):
+    """시작일의 현재 스냅샷 (처음 요청된 시작일만 동기 수집, keep 시작일은 개수 제한에서 제외)"""
+    dataset = refresher['datasets'].get(history_start)
+    if dataset is not None:
+        return dataset
+    with refresher['lock']:
+        dataset = refresher['datasets'].get(history_start)
+        if dataset is None:
+            extra = [k for k in refresher['datasets'] if k != keep]
+            for k in extra[:max(0, len(refresher['datasets']) - MAX_SNAPSHOTS + 1)]:
+                refresher['datasets'].pop(k)
+                refresher['fetch_state'].pop(k, None)
+            dataset, _ = build_snapshot(refresher, history_start)
+            refresher['last_success'] = pd.Timestamp.now()
+    return dataset
+
+def refresh_snapshots(refresher, force=False):
+    """보관 중인 모든 스냅샷에서 갱신 대상 시리즈만 재수집"""
+    refresher['refreshing'] = True
+    refresher['last_attempt'] = pd.Timestamp.now()
+    try:
+        for history_start in list(refresher['datasets']):
+            with refresher['lock']:
+                dataset, refreshed = build_snapshot(refresher, history_start, force)
+            if refreshed and len(dataset['errors']) < len(refreshed):
+                refresher['last_success'] = pd.Timestamp.now()
+        refresher['last_error'] = None
+    except Exception as e:
+        refresher['last_error'] = str(e)
+    finally:
+        refresher['refreshing'] = False
+
+def next_wake(refresher, now):
+    """가장 이른 재수집 예정 시각까지 대기할 초 (발표 예정일 + 재시도 간격 기준)"""
+    fetched = fetched_series(refresher['specs'])
+    times = []
+    for state in list(refresher['fetch_state'].values()):
+        for key, spec in fetched.items():
+            entry = state.get(key, {'last_fetch': None, 'last_obs': None})
+            times.append(next_refresh_time(spec, entry) or now)
+    if not times:
+        return REFRESH_MAX_SLEEP
+    return float(np.clip((min(times) - now).total_seconds(), REFRESH_MIN_SLEEP, REFRESH_MAX_SLEEP))
+
+def refresh_loop(refresher):
+    """백그라운드 갱신 루프 (다음 발표 예정 시각까지 대기, request_refresh면 즉시 깨어남)"""
+    while True:
+        refresher['wake'].wait(next_wake(refresher, pd.Timestamp.now()))
+        refresher['wake'].clear()
+        force, refresher['force'] = refresher['force'], False
+        refresh_snapshots(refresher, force)
+
+def request_refresh(refresher, force=True):
+    """즉시 갱신 요청 (호출 측은 기다리지 않음)"""
+    refresher['force'] = force
+    refresher['wake'].set()
@@ -0,0 +1,159 @@
+import numpy as np
+import pandas as pd
+
+from analogs import FORWARD_HORIZONS, HORIZON_LABELS
+from macro_core import scenario_codes
+
+# ============================================================
+# 시나리오 레짐 전이 / 지속 기간 통계
+# ============================================================
+# 날짜별 시나리오 번호(1-4)를 run-length encoding으로 구간(run)으로 묶어
+# 전이 행렬, 지속 기간 분포, 레짐별 이후 변화 분포를 한 번에 계산한다.
+# 모든 통계는 전체 이력 기준이며 데이터 버전별로 한 번만 만든다.
+
+SCENARIO_STATES = (1, 2, 3, 4)
+REGIME_OUTCOMES = ['HY_SPREAD', 'CC_DELINQ', 'CRE_DELINQ_ALL']
+END_WITHIN_DAYS = (21, 63, 126)
+
+def run_length_encode(codes):
+    """정수 배열 → (값, 시작 위치, 길이) 배열"""
+    codes = np.asarray(codes)
+    if len(codes) == 0:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, empty
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    lengths = np.diff(np.r_[starts, len(codes)])
+    return codes[starts], starts, lengths
+
+def _transition_counts(prev, nxt, states):
+    """(이전, 다음) 쌍 → 상태 수 × 상태 수 빈도 행렬"""
+    k = len(states)
+    pos = {s: i for i, s in enumerate(states)}
+    lut = np.full(max(states) + 1, -1)
+    for s, i in pos.items():
+        lut[s] = i
+    flat = lut[prev] * k + lut[nxt]
+    return np.bincount(flat, minlength=k * k).reshape(k, k)
+
+def _normalize_rows(counts):
+    totals = counts.sum(axis=1, keepdims=True)
+    return np.divide(counts, totals, out=np.full(counts.shape, np.nan), where=totals > 0)
+
+def build_regime_stats(df, states=SCENARIO_STATES, outcomes=REGIME_OUTCOMES, horizons=FORWARD_HORIZONS):
+    """전이 행렬 / 지속 기간 / 레짐별 이후 변화 통계 (데이터 버전별 1회 생성)"""
+    valid = df['YIELD_CURVE'].notna().to_numpy() & df['POLICY_SPREAD'].notna().to_numpy()
+    frame = df.loc[valid]
+    codes = scenario_codes(frame['YIELD_CURVE'].to_numpy(), frame['POLICY_SPREAD'].to_numpy())
+    values, starts, lengths = run_length_encode(codes)
+
+    # 일별 전이 (자기 전이 포함) / 레짐 전환 시 다음 레짐
+    daily = _transition_counts(codes[:-1], codes[1:], states)
+    switch = _transition_counts(values[:-1], values[1:], states)
+    np.fill_diagonal(switch, 0)
+
+    # 완료된 구간만 지속 기간 표본으로 사용 (마지막 구간은 진행 중이라 중도절단)
+    done_values, done_lengths = values[:-1], lengths[:-1]
+    durations = {s: np.sort(done_lengths[done_values == s]) for s in states}
+
+    # 레짐별 h행 이후 변화 분포
+    outcomes = [c for c in outcomes if c in frame.columns]
+    Y = frame[outcomes].to_numpy(dtype=np.float64)
+    n = len(Y)
+    rows = []
+    for name, h in horizons.items():
+        if h >= n:
+            continue
+        fwd = pd.DataFrame(Y[h:] - Y[:n - h], columns=outcomes)
+        fwd['regime'] = codes[:n - h]
+        long = fwd.melt(id_vars='regime', var_name='column', value_name='change').dropna()
+        long['up'] = long['change'] > 0
+        grouped = long.groupby(['regime', 'column'])
+        q = grouped['change'].quantile([0.1, 0.5, 0.9]).unstack()
+        q.columns = ['p10', 'median', 'p90']
+        q['mean'] = grouped['change'].mean()
+        q['up_ratio'] = grouped['up'].mean()
+        q['n'] = grouped.size()
+        q['horizon'] = name
+        rows.append(q.reset_index())
+    forward = pd.concat(rows, ignore_index=True) if rows else pd.DataFrame(
+        columns=['regime', 'column', 'p10', 'median', 'p90', 'mean', 'up_ratio', 'n', 'horizon'])
+
+    return {
+        'states': list(states),
+        'daily_counts': daily,
+        'daily': _normalize_rows(daily),
+        'switch_counts': switch,
+        'switch': _normalize_rows(switch),
+        'durations': durations,
+        'runs': pd.DataFrame({
+            'regime': values,
+            'start': frame.index[starts],
+            'end': frame.index[starts + lengths - 1],
+            'length': lengths,
+        }),
+        'forward': forward,
+        'current': int(values[-1]) if len(values) else None,
+        'streak': int(lengths[-1]) if len(lengths) else 0,
+    }
+
+def remaining_duration(durations, streak, within=END_WITHIN_DAYS):
+    """현재 streak일 지속 중일 때 남은 기간 통계 (같은 레짐의 과거 완료 구간 중 streak보다 길었던 것 기준)"""
+    longer = durations[durations > streak]
+    out = {'n': len(longer), 'n_total': len(durations), 'mean': np.nan, 'median': np.nan}
+    for h in within:
+        out[f'end_within_{h}'] = np.nan
+    if len(longer) == 0:
+        return out
+    rest = longer - streak
+    out['mean'] = rest.mean()
+    out['median'] = np.median(rest)
+    for h in within:
+        out[f'end_within_{h}'] = (rest <= h).mean()
+    return out
+
+def regime_outlook(stats, state=None, streak=None):
+    """현재 레짐의 다음 전환 확률 + 남은 기간 + 이후 변화 분포"""
+    state = stats['current'] if state is None else state
+    streak = stats['streak'] if streak is None else streak
+    if state is None:
+        return {}
+    i = stats['states'].index(state)
+    fwd = stats['forward']
+    return {
+        'state': state,
+        'streak': streak,
+        'stay_prob': stats['daily'][i, i],
+        'next_probs': {s: stats['switch'][i, j] for j, s in enumerate(stats['states']) if s != state},
+        'remaining': remaining_duration(stats['durations'][state], streak),
+        'forward': fwd[fwd['regime'] == state].reset_index(drop=True),
+    }
+
+def transition_table(stats, labels=None, kind='switch'):
+    """전이 행렬 DataFrame (행: 현재, 열: 다음)"""
+    names = [labels.get(s, s) if labels else s for s in stats['states']]
+    return pd.DataFrame(stats[kind], index=names, columns=names)
+
+def format_regime_for_prompt(outlook, labels=None):
+    """프롬프트용 레짐 전이/지속 기간 요약 텍스트"""
+    if not outlook:
+        return "데이터 없음"
+    labels = labels or {}
+
+    def name(s):
+        return labels.get(s, f"시나리오 {s}")
+
+    rem = outlook['remaining']
+    lines = [f"- 현재 {name(outlook['state'])} {outlook['streak']}일째 지속 (일별 유지 확률 {outlook['stay_prob']:.1%})"]
+    if rem['n'] > 0:
+        lines.append(f"- 과거 같은 레짐 중 {outlook['streak']}일 넘게 지속된 {rem['n']}/{rem['n_total']}개 구간 기준 "
+                     f"남은 기간 중앙값 {rem['median']:.0f}일, 평균 {rem['mean']:.0f}일; "
+                     + ", ".join(f"{h}일 내 종료 {rem[f'end_within_{h}']:.0%}" for h in END_WITHIN_DAYS))
+    else:
+        lines.append(f"- 과거에 {outlook['streak']}일 넘게 지속된 같은 레짐 구간 없음 (역사적 최장 기록 경신 중)")
+    nxt = [f"{name(s)} {p:.0%}" for s, p in sorted(outlook['next_probs'].items(), key=lambda x: -np.nan_to_num(x[1])) if p > 0]
+    if nxt:
+        lines.append("- 전환 시 다음 레짐: " + ", ".join(nxt))
+    for _, r in outlook['forward'].iterrows():
+        lines.append(f"- 이 레짐에서 {HORIZON_LABELS.get(r['horizon'], r['horizon'])} 후 {r['column']} 변화: "
+                     f"중앙값 {r['median']:+.2f}, 10-90% [{r['p10']:+.2f}, {r['p90']:+.2f}], 상승 비율 {r['up_ratio']:.0%} (n={int(r['n'])})")
+    return "\n".join(lines)
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+from series_store import build_master_df, to_days
+
+# ============================================================
+# 발표 시차 정렬 (관측일 → 발표일 기준 as-of 조인)
+# ============================================================
+# FRED 월간/분기 관측치는 기간 시작일로 찍혀서 관측일 기준 ffill은 분기 연체율을
+# 발표(분기 종료 약 2개월 후)보다 5개월가량 앞당겨 채운다. 발표일 기준 모드는 관측치마다
+# 발표일을 구해 build_master_df(store, release_days)로 넘기고, 각 날짜에는 그날까지 발표된
+# 마지막 관측치만 쓴다 (모든 시리즈를 한 번의 searchsorted로 정렬하는 merge_asof).
+#
+# 발표일 = 기간 종료일 + 발표 시차
+#   레지스트리 : lag_days (series_registry.toml)
+#   vintage    : 관측치별 실제 첫 발표일 (ALFRED), 보관 시작 때 일괄 등록된 관측치는 추정값
+# 추정 발표일은 그 관측치를 처음 수집한 날을 넘지 않는다 (이미 받은 값을 추정 때문에 숨기지 않음).
+# 일간 시리즈(금리/스프레드)는 장 마감 값이 당일 기준이라 시차를 두지 않는다.
+
+ALIGN_MODES = {'observation': '관측일 기준', 'release': '발표일 기준'}
+
+_PERIOD_MONTHS = {'M': 1, 'Q': 3}
+
+def period_end_days(days, freq):
+    """관측일(기간 시작일) → 기간 종료일 int32 (일간/주간은 관측일 그대로)"""
+    days = np.asarray(days, dtype=np.int32)
+    if freq not in _PERIOD_MONTHS:
+        return days
+    months = days.astype('datetime64[D]').astype('datetime64[M]')
+    end = (months + _PERIOD_MONTHS[freq]).astype('datetime64[D]') - np.timedelta64(1, 'D')
+    return end.astype(np.int64).astype(np.int32)
+
+def _monotone(days):
+    # 앞 관측치보다 먼저 발표된 것으로 보지 않음 (as-of 키는 시리즈 안에서 정렬돼 있어야 함)
+    return np.maximum.accumulate(days).astype(np.int32) if len(days) else days.astype(np.int32)
+
+def fetched_caps(store, fetch_state):
+    """수집 상태의 first_seen → 시리즈별 관측치 발표일 상한 {컬럼: int32} (그 관측치를 처음 받은 날)
+
+    first_seen은 (마지막 관측일, 수집 시각)이 늘어나는 순서로 쌓여 있어, 관측일 d의 상한은
+    마지막 관측일이 처음으로 d 이상이 된 수집일이다.
+    """
+    caps = {}
+    for key, entry in (fetch_state or {}).items():
+        seen = entry.get('first_seen')
+        if key not in store or not seen:
+            continue
+        obs = to_days([pd.Timestamp(o).to_datetime64() for o, _ in seen])
+        at = to_days([pd.Timestamp(t).to_datetime64() for _, t in seen])
+        pos = np.searchsorted(obs, store[key]['days'], side='left')
+        caps[key] = np.where(pos < len(obs), at[np.minimum(pos, len(obs) - 1)], np.iinfo(np.int32).max).astype(np.int32)
+    return caps
+
+def registry_release_days(store, specs, lags=None, caps=None):
+    """레지스트리 발표 시차로 추정한 시리즈별 관측치 발표일 {컬럼: int32} (일간 시리즈 제외)
+
+    lags({컬럼: 일수})가 있으면 레지스트리 lag_days 대신 쓰고, caps(fetched_caps)가 있으면
+    처음 수집한 날보다 늦게 발표된 것으로 보지 않는다.
+    """
+    lags, caps = lags or {}, caps or {}
+    release = {}
+    for key, rec in store.items():
+        spec = specs.get(key)
+        if spec is None or spec['freq'] == 'D':
+            continue
+        lag = lags.get(key, spec['lag_days'])
+        days = period_end_days(rec['days'], spec['freq']) + np.int32(lag)
+        if key in caps:
+            days = np.minimum(days, caps[key])
+        release[key] = _monotone(days)
+    return release
+
+def _first_releases(vrec):
+    """vintage 레코드 → (관측일, 첫 발표일, 보관 시작 일괄 등록 여부)"""
+    days = vrec['days']
+    if not len(days):
+        empty = np.array([], dtype=np.int32)
+        return empty, empty, np.array([], dtype=bool)
+    first = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+    rt = vrec['rt_start'][first]
+    return days[first], rt, rt == rt.min()
+
+def empirical_lags(vintage_records, specs):
+    """vintage 첫 발표일 - 기간 종료일의 중앙값 {컬럼: 일수} (보관 시작 일괄 등록분 제외, 표본 없으면 생략)"""
+    lags = {}
+    for key, vrec in vintage_records.items():
+        spec = specs.get(key)
+        if spec is None or spec['freq'] == 'D':
+            continue
+        obs, rt, backfill = _first_releases(vrec)
+        sample = rt[~backfill].astype(np.int64) - period_end_days(obs[~backfill], spec['freq'])
+        if len(sample):
+            lags[key] = int(np.median(sample))
+    return lags
+
+def vintage_release_days(store, vintage_records, specs, caps=None):
+    """관측치별 실제 첫 발표일 {컬럼: int32} (vintage 없는 관측치는 기간 종료일 + 시차 추정)
+
+    시차는 vintage에서 잰 값이 있으면 그 값, 없으면 레지스트리 lag_days (추정값은 caps 상한 적용).
+    보관 시작 때 일괄 등록된 관측치는 늦어도 그날엔 알려져 있었으므로 추정 발표일과 등록일 중 이른 날.
+    """
+    release = registry_release_days(store, specs, empirical_lags(vintage_records, specs), caps)
+    for key, vrec in vintage_records.items():
+        if key not in release or not len(vrec['days']):
+            continue
+        days = store[key]['days']
+        obs, rt, backfill = _first_releases(vrec)
+        pos = np.clip(np.searchsorted(obs, days), 0, max(len(obs) - 1, 0))
+        found = obs[pos] == days
+        actual = np.where(backfill[pos], np.minimum(rt[pos], release[key]), rt[pos])
+        release[key] = _monotone(np.where(found, actual, release[key]))
+    return release
+
+def release_master_df(store, specs, vintage_records=None, caps=None):
+    """발표일 기준 마스터 프레임 (vintage_records가 있으면 관측치별 실제 발표일, caps는 fetched_caps)"""
+    release = (vintage_release_days(store, vintage_records, specs, caps) if vintage_records
+               else registry_release_days(store, specs, caps=caps))
+    return build_master_df(store, release_days=release)
@@ -0,0 +1,137 @@
+import os
+from datetime import timedelta
+
+import pandas as pd
+
+try:
+    import tomllib
+except ModuleNotFoundError:  # Python < 3.11
+    import tomli as tomllib
+
+# ============================================================
+# 시리즈 레지스트리 로더 (series_registry.toml)
+# ============================================================
+REGISTRY_PATH = os.environ.get(
+    "MACRO_REGISTRY_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "series_registry.toml")
+)
+
+FREQ_LABELS = {'D': '일간', 'W': '주간', 'M': '월간', 'Q': '분기'}
+
+_FREQ_OFFSETS = {
+    'D': pd.offsets.BDay(1),
+    'W': pd.DateOffset(weeks=1),
+    'M': pd.DateOffset(months=1),
+    'Q': pd.DateOffset(months=3),
+}
+
+# 발표 예정일이 지났는데 새 관측치가 없을 때 재시도 간격
+_RETRY_INTERVALS = {
+    'D': timedelta(hours=4),
+    'W': timedelta(hours=12),
+    'M': timedelta(days=1),
+    'Q': timedelta(days=1),
+}
+
+_SERIES_DEFAULTS = {
+    'fred_id': None,
+    'units': '',
+    'freq': 'D',
+    'lag_days': 1,
+    'vintages': False,
+    'panel': None,
+    'width': 2,
+    'fill': None,
+    'markers': False,
+    'indicator': None,
+    'category': None,
+    'enabled': True,
+}
+
+_PANEL_DEFAULTS = {
+    'height': 0.2,
+    'zero_line': False,
+    'inversions': False,
+}
+
+def load_registry(path=REGISTRY_PATH):
+    """TOML 레지스트리를 읽어 (시리즈 dict, 패널 list) 반환"""
+    with open(path, 'rb') as f:
+        raw = tomllib.load(f)
+
+    specs = {}
+    for item in raw.get('series', []):
+        spec = {**_SERIES_DEFAULTS, **item}
+        spec.setdefault('name', spec['key'])
+        spec.setdefault('title', spec['name'])
+        spec.setdefault('legend', spec['name'])
+        if spec['freq'] not in _FREQ_OFFSETS:
+            raise ValueError(f"{spec['key']}: 알 수 없는 주기 '{spec['freq']}'")
+        if spec['key'] in specs:
+            raise ValueError(f"{spec['key']}: 레지스트리에 중복 정의됨")
+        if spec['enabled']:
+            specs[spec['key']] = spec
+
+    panels = [{**_PANEL_DEFAULTS, **p} for p in raw.get('panels', [])]
+    return specs, panels
+
+def fetched_series(specs):
+    """FRED에서 직접 수집하는 시리즈만 (파생 지표 제외)"""
+    return {k: s for k, s in specs.items() if s['fred_id']}
+
+def vintage_series(specs):
+    """ALFRED 발표 이력(vintage)을 따로 수집하는 시리즈 (사후 수정이 잦은 지표)"""
+    return {k: s for k, s in fetched_series(specs).items() if s['vintages']}
+
+def indicator_options(specs):
+    """AI 개별 지표 분석용 {카테고리: [지표명]} 및 {지표명: (컬럼, 단위, 제목)}"""
+    categories = {}
+    indicator_map = {}
+    for key, spec in specs.items():
+        if not spec['indicator']:
+            continue
+        categories.setdefault(spec['category'] or '기타', []).append(spec['indicator'])
+        indicator_map[spec['indicator']] = (key, spec['units'], spec['title'])
+    return categories, indicator_map
+
+def panel_traces(specs, panels):
+    """데이터가 있는 패널과 각 패널의 시리즈 목록 [(panel, [spec, ...])]"""
+    result = []
+    for panel in panels:
+        members = [s for s in specs.values() if s['panel'] == panel['key']]
+        if members:
+            result.append((panel, members))
+    return result
+
+# ============================================================
+# 발표 일정 계산
+# ============================================================
+def next_expected_release(last_obs, freq, lag_days):
+    """마지막 관측일 기준 다음 관측치의 예상 발표 시점"""
+    offset = _FREQ_OFFSETS[freq]
+    next_obs = pd.Timestamp(last_obs) + offset
+    if freq in ('M', 'Q'):
+        # 월간/분기 시리즈는 기간 시작일로 찍히므로 기간 종료일로 환산
+        next_obs = next_obs + offset - pd.Timedelta(days=1)
+    return next_obs + pd.Timedelta(days=lag_days)
+
+def is_series_due(spec, entry, now, force=False):
+    """시리즈 재수집 필요 여부 (force=True면 재시도 간격 무시)"""
+    if entry['last_fetch'] is None:
+        return True
+
+    retry_ok = force or (now - entry['last_fetch']) >= _RETRY_INTERVALS[spec['freq']]
+    if entry['last_obs'] is None:
+        return retry_ok
+
+    release = next_expected_release(entry['last_obs'], spec['freq'], spec['lag_days'])
+    return now >= release and retry_ok
+
+def next_refresh_time(spec, entry):
+    """is_series_due가 처음 참이 되는 시각 (수집 이력이 없으면 None = 즉시)"""
+    if entry['last_fetch'] is None:
+        return None
+    retry = entry['last_fetch'] + _RETRY_INTERVALS[spec['freq']]
+    if entry['last_obs'] is None:
+        return retry
+    return max(next_expected_release(entry['last_obs'], spec['freq'], spec['lag_days']), retry)
@@ -0,0 +1,282 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+# ============================================================
+# 압축 시리즈 저장소 (원래 주기 그대로 float32 보관)
+# ============================================================
+# store = {컬럼명: {'days': int32 (1970-01-01 기준 일수), 'values': float32, 'decimals': int}}
+# 일간 기준축으로 ffill 정렬한 마스터 프레임은 필요할 때만 aligned_frame()으로 만든다.
+
+BASE_SERIES = 'DGS10'
+_EPOCH = np.datetime64('1970-01-01', 'D')
+_MAX_DECIMALS = 6
+
+def _detect_decimals(values):
+    """값을 원래대로 복원하는 데 필요한 소수 자릿수 (없으면 None)"""
+    finite = values[np.isfinite(values)]
+    if len(finite) == 0:
+        return 0
+    for d in range(_MAX_DECIMALS + 1):
+        if np.allclose(np.round(finite, d), finite, rtol=0, atol=1e-9):
+            return d
+    return None
+
+def pack_values(values):
+    """float64 값 → (압축 값, 소수 자릿수) (float32로 손실 없이 담기지 않으면 float64 유지)"""
+    decimals = _detect_decimals(values)
+    packed = values.astype(np.float32)
+    if decimals is None or not np.array_equal(np.round(packed.astype(np.float64), decimals), values):
+        return values, None
+    return packed, decimals
+
+def to_days(dates):
+    """날짜 배열 → int32 일수 (1970-01-01 기준)"""
+    return (np.asarray(dates).astype('datetime64[D]') - _EPOCH).astype(np.int32)
+
+def compact_series(s):
+    """pandas Series → 압축 레코드 (float32로 손실 없이 담기지 않으면 float64 유지)"""
+    s = s.dropna() if len(s) > 0 else s
+    days = to_days(s.index.values)
+    packed, decimals = pack_values(s.to_numpy(dtype=np.float64))
+    return {'days': days, 'values': packed, 'decimals': decimals}
+
+def expand_values(rec):
+    """압축 레코드 값을 float64 원본 값으로 복원"""
+    values = rec['values'].astype(np.float64)
+    if rec['decimals'] is not None and rec['values'].dtype == np.float32:
+        values = np.round(values, rec['decimals'])
+    return values
+
+def record_index(rec):
+    """압축 레코드의 날짜 → DatetimeIndex"""
+    return days_to_index(rec['days'])
+
+def record_to_series(rec, name=None):
+    """압축 레코드 → pandas Series (float64)"""
+    return pd.Series(expand_values(rec), index=record_index(rec), name=name)
+
+def build_series_store(series_dict):
+    """{컬럼: Series} → 압축 저장소"""
+    return {key: compact_series(s) for key, s in series_dict.items()}
+
+def ffill_positions(src_days, target_days):
+    """target 날짜마다 src에서 그 날짜 이하의 마지막 관측 위치 (없으면 -1)"""
+    return np.searchsorted(src_days, target_days, side='right') - 1
+
+DERIVED_COLUMNS = ['YIELD_CURVE_DIRECT', 'YIELD_CURVE_CALC', 'YIELD_CURVE', 'RATE_GAP', 'POLICY_SPREAD']
+
+# (컬럼 번호, 날짜)를 하나의 int64 키로 합쳐 모든 시리즈를 한 번의 searchsorted로 정렬
+_COL_SHIFT = np.int64(1) << 32
+_DAY_OFFSET = np.int64(1) << 31
+
+def _stack_store(store, columns, release_days=None):
+    """시리즈들을 (정렬 키, 값, 컬럼 시작 위치) 한 줄로 쌓음 (release_days에 있는 컬럼은 발표일을 키로)"""
+    release_days = release_days or {}
+    lengths = np.array([len(store[k]['days']) for k in columns], dtype=np.int64)
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(np.int64)
+    col_ids = np.repeat(np.arange(len(columns), dtype=np.int64), lengths)
+    days = np.concatenate([release_days.get(k, store[k]['days']) for k in columns]).astype(np.int64)
+    values = np.concatenate([expand_values(store[k]) for k in columns])
+    return col_ids * _COL_SHIFT + days + _DAY_OFFSET, values, starts
+
+def aligned_block(store, target_days, columns=None, release_days=None):
+    """모든 시리즈를 target 날짜축에 한 번에 ffill 정렬한 (컬럼, 행) float64 블록
+
+    release_days({컬럼: 관측치별 발표일 int32, 단조 증가})가 있는 컬럼은 발표일 기준 as-of 조인
+    (각 날짜에 그날까지 발표된 마지막 관측치).
+    """
+    columns = list(store.keys()) if columns is None else list(columns)
+    keys, values, starts = _stack_store(store, columns, release_days)
+    target_days = np.asarray(target_days, dtype=np.int64)
+
+    k, n = len(columns), len(target_days)
+    targets = (np.arange(k, dtype=np.int64)[:, None] * _COL_SHIFT
+               + target_days[None, :] + _DAY_OFFSET)
+    pos = np.searchsorted(keys, targets.ravel(), side='right').reshape(k, n) - 1
+    valid = pos >= starts[:, None]
+
+    block = np.full((k, n), np.nan)
+    block[valid] = values[pos[valid]]
+    return block
+
+def aligned_frame(store, columns=None, base=BASE_SERIES):
+    """기준 시리즈 날짜축에 각 시리즈를 ffill 정렬한 float64 프레임 (필요할 때만 생성)"""
+    columns = list(store.keys()) if columns is None else list(columns)
+    base_days = store[base]['days']
+    block = aligned_block(store, base_days, columns)
+    return pd.DataFrame(block.T, index=days_to_index(base_days), columns=columns, copy=False)
+
+def days_to_index(days):
+    """int32 일수 배열 → DatetimeIndex"""
+    return pd.DatetimeIndex((np.asarray(days) + _EPOCH).astype('datetime64[ns]'))
+
+def derived_values(row):
+    """원 시리즈 배열 dict → 파생 지표 배열 dict (DERIVED_COLUMNS 순서, 배열 모양 무관)"""
+    direct = row['T10Y2Y']
+    calc = row['DGS10'] - row['DGS2']
+    return {
+        'YIELD_CURVE_DIRECT': direct,
+        'YIELD_CURVE_CALC': calc,
+        'YIELD_CURVE': np.where(np.isnan(direct), calc, direct),
+        'RATE_GAP': row['DGS10'] - row['FEDFUNDS'],
+        'POLICY_SPREAD': row['DGS2'] - row['EFFR'],
+    }
+
+def _master_block(store, target_days, release_days=None):
+    """원 시리즈 + 파생 지표를 담은 (컬럼, 행) 블록 하나를 한 번에 생성"""
+    columns = list(store.keys())
+    k, n = len(columns), len(target_days)
+    block = np.empty((k + len(DERIVED_COLUMNS), n))
+    block[:k] = aligned_block(store, target_days, columns, release_days)
+
+    derived = derived_values({c: block[i] for i, c in enumerate(columns)})
+    for i, c in enumerate(DERIVED_COLUMNS):
+        block[k + i] = derived[c]
+    return block, columns + DERIVED_COLUMNS
+
+def build_master_df(store, release_days=None):
+    """10년물 금리를 기준 인덱스로 통합 DataFrame 생성 (단일 블록 한 번에 정렬)
+
+    release_days가 있으면 발표일 기준 모드: 해당 컬럼은 관측일이 아니라 발표일부터 값이 채워진다
+    (release_lag.py에서 계산).
+    """
+    base_days = store[BASE_SERIES]['days']
+    block, columns = _master_block(store, base_days, release_days)
+    # 압축 레코드에는 NaN이 없으므로 기준 시리즈 날짜축의 모든 행이 유효
+    return pd.DataFrame(block.T, index=days_to_index(base_days), columns=columns, copy=False)
+
+def first_changed_day(old_rec, new_rec):
+    """두 레코드가 처음 달라지는 날짜 (같으면 None)"""
+    old_days, new_days = old_rec['days'], new_rec['days']
+    m = min(len(old_days), len(new_days))
+    diff = np.flatnonzero((old_days[:m] != new_days[:m]) | (old_rec['values'][:m] != new_rec['values'][:m]))
+    if len(diff) > 0:
+        return int(min(old_days[diff[0]], new_days[diff[0]]))
+    if len(new_days) > m:
+        return int(new_days[m])
+    if len(old_days) > m:
+        return int(old_days[m])
+    return None
+
+def first_changed_store_day(prev_store, store):
+    """두 저장소에서 처음 달라지는 날짜 (같으면 None, 시리즈 구성이 다르면 처음부터 = int32 최솟값)"""
+    if list(prev_store.keys()) != list(store.keys()):
+        return int(np.iinfo(np.int32).min)
+    changed = [first_changed_day(prev_store[k], store[k]) for k in store]
+    changed = [d for d in changed if d is not None]
+    return min(changed) if changed else None
+
+def same_record(a, b):
+    """두 압축 레코드의 날짜/값이 같은지"""
+    return a is b or first_changed_day(a, b) is None
+
+def extend_master_df(prev_df, prev_store, store):
+    """어제 만든 마스터 프레임에 바뀐 구간만 다시 계산해 이어 붙임 (증분 모드)
+
+    새 관측치나 수정된 값의 가장 이른 날짜 이후 행만 재정렬한다. 분기 시리즈는
+    관측일이 과거(분기 시작일)로 찍히므로 그 날짜부터 다시 계산된다.
+    """
+    if list(prev_store.keys()) != list(store.keys()):
+        return build_master_df(store)
+
+    changed = first_changed_store_day(prev_store, store)
+    if changed is None:
+        return prev_df
+
+    base_days = store[BASE_SERIES]['days']
+    start = np.searchsorted(base_days, changed, side='left')
+    block, columns = _master_block(store, base_days[start:])
+    tail = pd.DataFrame(block.T, index=days_to_index(base_days[start:]), columns=columns, copy=False)
+
+    head = prev_df.iloc[:prev_df.index.searchsorted(tail.index[0]) if len(tail) else len(prev_df)]
+    return pd.concat([head, tail])
+
+# ============================================================
+# 프로세스 공용 읽기 전용 데이터셋
+# ============================================================
+# 세션들은 같은 dataset 객체를 받아 날짜 구간만 view로 잘라 쓴다 (pickle/복사 없음).
+# 배열은 모두 writeable=False라서 세션 코드가 실수로 공유 데이터를 고칠 수 없다.
+
+def enable_copy_on_write():
+    """pandas 2.x에서 Copy-on-Write 활성화 (3.0부터는 항상 켜져 있음)"""
+    if int(pd.__version__.split('.')[0]) < 3:
+        pd.set_option('mode.copy_on_write', True)
+
+def store_version(store):
+    """저장소 내용 해시 (데이터 버전 키: 값이 같으면 버전도 같음)"""
+    h = hashlib.blake2b(digest_size=8)
+    for key in sorted(store):
+        rec = store[key]
+        h.update(key.encode())
+        h.update(rec['days'].tobytes())
+        h.update(rec['values'].tobytes())
+    return h.hexdigest()
+
+def freeze_store(store):
+    """저장소 배열을 읽기 전용으로 고정"""
+    for rec in store.values():
+        rec['days'].flags.writeable = False
+        rec['values'].flags.writeable = False
+    return store
+
+def freeze_frame(df):
+    """단일 float64 블록의 읽기 전용 DataFrame (행 슬라이스는 복사 없이 view)"""
+    # pandas 내부 배치와 같은 (컬럼, 행) 순서로 두면 이미 단일 블록인 프레임은 복사 없음
+    block = np.ascontiguousarray(df.to_numpy(dtype=np.float64).T)
+    block.flags.writeable = False
+    return pd.DataFrame(block.T, index=df.index, columns=df.columns, copy=False)
+
+def build_shared_dataset(store, errors=None, previous=None):
+    """압축 저장소 → 세션 간 공유용 읽기 전용 데이터셋 (previous가 있으면 증분 갱신)"""
+    freeze_store(store)
+    if previous is not None:
+        df = extend_master_df(previous['df'], previous['store'], store)
+    else:
+        df = build_master_df(store)
+    if previous is None or df is not previous['df']:
+        df = freeze_frame(df)
+    return {
+        'store': store,
+        'df': df,
+        'version': store_version(store),
+        'errors': dict(errors or {}),
+        'built_at': pd.Timestamp.now(),
+    }
+
+def slice_view(dataset, start_date=None):
+    """공유 마스터 프레임에서 start_date 이후 구간 (복사 없는 view)"""
+    df = dataset['df']
+    if start_date is None:
+        return df.iloc[0:]
+    pos = df.index.searchsorted(pd.Timestamp(start_date))
+    return df.iloc[pos:]
+
+# ============================================================
+# 메모리 사용량 리포트
+# ============================================================
+def store_nbytes(store):
+    """압축 저장소 바이트 수"""
+    return int(sum(rec['days'].nbytes + rec['values'].nbytes for rec in store.values()))
+
+def legacy_nbytes(store, df):
+    """기존 방식(float64 Series dict + 일간 정렬 float64 프레임)을 실제로 만들어 잰 바이트 수"""
+    series = {key: record_to_series(rec) for key, rec in store.items()}
+    series_bytes = sum(s.memory_usage(index=True, deep=True) for s in series.values())
+    # 기존 마스터 프레임은 세션마다 새로 만든 float64 복사본
+    frame_bytes = df.astype(np.float64, copy=True).memory_usage(index=True, deep=True).sum()
+    return int(series_bytes + frame_bytes)
+
+def memory_report(store, df):
+    """세션당 메모리: 기존 방식 vs 압축 저장소 vs 이번 실행의 정렬 뷰"""
+    before = legacy_nbytes(store, df)
+    after = store_nbytes(store)
+    return {
+        'before_bytes': before,
+        'after_bytes': after,
+        'view_bytes': int(df.memory_usage(index=True, deep=True).sum()),
+        'ratio': before / after if after else float('nan'),
+        'rows': df.shape[0],
+        'observations': int(sum(len(rec['days']) for rec in store.values())),
+    }
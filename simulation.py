@@ -0,0 +1,124 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from macro_core import DEFAULT_RISK_RULES, DEFAULT_RISK_LEVELS, HIGH_RISK_LEVEL, rule_points, scenario_codes
+from series_store import DERIVED_COLUMNS, derived_values
+
+# ============================================================
+# 위험 점수 / 시나리오 몬테카를로 전망 (블록 부트스트랩)
+# ============================================================
+# 수집 시리즈 전체의 과거 주간 결합 변화(같은 주의 모든 시리즈 변화를 한 벡터로)를 블록 단위로 다시 뽑아
+# 현재 수준에서 수천 개의 미래 경로를 만들고, 모든 경로/시점에 위험 규칙과 시나리오 판정을 벡터화해 적용한다.
+# 블록으로 뽑기 때문에 시리즈 간 상관과 단기 자기상관이 유지된다.
+
+SIM_STEP_ROWS = 5          # 마스터 프레임 5행(영업일) = 1주
+SIM_HORIZON_WEEKS = 26     # 6개월
+SIM_BLOCK_WEEKS = 4
+SIM_PATHS = 10_000
+SIM_CHUNK_PATHS = 2_500    # 결과가 워커 수와 무관하도록 고정 크기 청크마다 시드 분기
+SIM_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+SIM_CHECKPOINTS = {'1M': 4, '3M': 13, '6M': 26}
+
+def weekly_changes(df, columns):
+    """마스터 프레임 → (현재 수준, 주간 결합 변화 행렬) - 모든 시리즈가 관측된 주만 사용"""
+    levels = df[columns].ffill()
+    rows = np.arange(len(levels) - 1, -1, -SIM_STEP_ROWS)[::-1]
+    W = levels.to_numpy(dtype=np.float64)[rows]
+    D = np.diff(W, axis=0)
+    D = D[np.isfinite(D).all(axis=1)]
+    return levels.iloc[-1].to_numpy(dtype=np.float64), D
+
+def simulate_paths(start, D, n_paths, horizon, block, rng):
+    """블록 부트스트랩 경로 (경로, 주, 시리즈)"""
+    n_blocks = -(-horizon // block)
+    starts = rng.integers(0, len(D) - block + 1, size=(n_paths, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block)).reshape(n_paths, -1)[:, :horizon]
+    return start + np.cumsum(D[idx], axis=1)
+
+def evaluate_paths(paths, columns, rules, floors):
+    """경로 배열 → (위험 점수, 시나리오 번호) (경로, 주)"""
+    paths = np.where(floors, np.maximum(paths, 0.0), paths)
+    row = {c: paths[:, :, j] for j, c in enumerate(columns)}
+    row.update(derived_values(row))
+    score = np.zeros(paths.shape[:2], dtype=np.float32)
+    for rule in rules:
+        if rule['column'] in row:
+            score += rule_points(row[rule['column']], rule)
+    codes = scenario_codes(row['YIELD_CURVE'], row['POLICY_SPREAD']).astype(np.int8)
+    return score, codes
+
+def _simulate_chunk(args):
+    start, D, columns, rules, floors, n_paths, horizon, block, seed = args
+    rng = np.random.default_rng(seed)
+    return evaluate_paths(simulate_paths(start, D, n_paths, horizon, block, rng), columns, rules, floors)
+
+def run_simulation(df, columns, rules=None, levels=None, n_paths=SIM_PATHS, horizon=SIM_HORIZON_WEEKS,
+                   block=SIM_BLOCK_WEEKS, seed=None, workers=None):
+    """몬테카를로 전망 → 주별 확률/분위 DataFrame + 시점별 시나리오 분포
+
+    같은 seed면 workers 수와 관계없이 같은 결과 (청크별 SeedSequence 분기).
+    """
+    rules = DEFAULT_RISK_RULES if rules is None else rules
+    levels = DEFAULT_RISK_LEVELS if levels is None else levels
+    columns = [c for c in columns if c in df.columns and c not in DERIVED_COLUMNS]
+    start, D = weekly_changes(df, columns)
+    if len(D) < block * 4:
+        raise ValueError("부트스트랩할 주간 변화 표본이 부족합니다.")
+    # 과거에 음수가 없었던 시리즈(스프레드, 연체율, 잔액)는 0 아래로 내려가지 않게
+    floors = (df[columns].min().to_numpy() >= 0)
+
+    seeds = np.random.SeedSequence(seed).spawn(-(-n_paths // SIM_CHUNK_PATHS))
+    sizes = [min(SIM_CHUNK_PATHS, n_paths - i * SIM_CHUNK_PATHS) for i in range(len(seeds))]
+    jobs = [(start, D, columns, rules, floors, size, horizon, block, s) for size, s in zip(sizes, seeds)]
+    if workers and workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_simulate_chunk, jobs))
+    else:
+        parts = [_simulate_chunk(job) for job in jobs]
+    score = np.concatenate([p[0] for p in parts])
+    codes = np.concatenate([p[1] for p in parts])
+
+    high_cutoff = next(c for c, lv, _ in levels if lv == HIGH_RISK_LEVEL)
+    high = score >= high_cutoff
+    s2 = codes == 2
+    weeks = np.arange(1, horizon + 1)
+    bands = pd.DataFrame(np.quantile(score, SIM_QUANTILES, axis=0).T, index=weeks,
+                         columns=[f'q{int(q * 100)}' for q in SIM_QUANTILES])
+    bands['mean'] = score.mean(axis=0)
+    bands['p_high'] = high.mean(axis=0)
+    bands['p_high_ever'] = np.logical_or.accumulate(high, axis=1).mean(axis=0)
+    bands['p_s2'] = s2.mean(axis=0)
+    bands['p_s2_ever'] = np.logical_or.accumulate(s2, axis=1).mean(axis=0)
+    bands.index.name = 'week'
+
+    scenario_dist = pd.DataFrame(
+        {name: np.bincount(codes[:, w - 1].astype(np.int64), minlength=5)[1:] / len(codes)
+         for name, w in SIM_CHECKPOINTS.items() if w <= horizon},
+        index=[1, 2, 3, 4]
+    )
+    return {
+        'bands': bands,
+        'scenarios': scenario_dist,
+        'high_cutoff': high_cutoff,
+        'n_paths': len(score),
+        'horizon': horizon,
+        'block': block,
+        'n_samples': len(D),
+        'columns': columns,
+        'seed': seed,
+    }
+
+def format_simulation_for_prompt(sim):
+    """프롬프트용 몬테카를로 전망 요약"""
+    b = sim['bands']
+    lines = [f"- 과거 주간 결합 변화 {sim['n_samples']}개를 {sim['block']}주 블록으로 부트스트랩한 {sim['n_paths']:,}개 경로 기준"]
+    for name, w in SIM_CHECKPOINTS.items():
+        if w not in b.index:
+            continue
+        r = b.loc[w]
+        lines.append(f"- {name}: 위험 점수 중앙값 {r['q50']:.0f} (90% 구간 {r['q5']:.0f}-{r['q95']:.0f}), "
+                     f"HIGH RISK 이상 {r['p_high']:.0%} (기간 중 한 번이라도 {r['p_high_ever']:.0%}), "
+                     f"시나리오 2(침체 경고) {r['p_s2']:.0%} (기간 중 {r['p_s2_ever']:.0%})")
+    return "\n".join(lines)
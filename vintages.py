@@ -0,0 +1,175 @@
+import numpy as np
+import pandas as pd
+
+from series_store import (
+    BASE_SERIES, DERIVED_COLUMNS, build_master_df, days_to_index, derived_values, expand_values, pack_values, to_days,
+)
+
+# ============================================================
+# 발표 이력(vintage) 저장소 + as-of 조회 (ALFRED)
+# ============================================================
+# FRED는 사후 수정된 최신 값만 주므로 과거 위험도가 당시보다 좋아 보일 수 있다.
+# vintage 레코드 = {'days': 관측일 int32, 'rt_start': 발표일 int32, 'rt_end': 다음 수정 발표일 int32 (현재 유효 = RT_OPEN),
+#                   'values': float32/float64, 'decimals'}
+# 한 관측치의 발표/수정마다 한 행이고 (관측일, 발표일) 순으로 정렬된다. [rt_start, rt_end) 동안 그 값이 "알려진 값".
+#
+# vintage index = 모든 시리즈 레코드를 한 줄로 쌓은 배열
+#   as_of_store    : 날짜 D에 알려진 전 시리즈 값 (마스크 한 번) → build_master_df에 그대로 넣을 수 있는 저장소
+#   realtime_frame : 날짜마다 그날 알려진 최신 값 (searchsorted 두 번) → 당시 발표 기준 위험 점수 / 시나리오 이력
+
+RT_OPEN = np.iinfo(np.int32).max
+
+# (컬럼, 관측일, 발표일) → int64 정렬 키 (일수마다 20비트, 음수 일수는 오프셋으로 보정)
+_DAY_BITS = 20
+_DAY_OFFSET = np.int64(1) << (_DAY_BITS - 1)
+_ROW_COL_SHIFT = np.int64(1) << (2 * _DAY_BITS)
+# (컬럼, 날짜) → int64 키
+_COL_SHIFT = np.int64(1) << 32
+
+def compact_vintages(frame):
+    """ALFRED 발표 이력 (realtime_start / date / value 열) → vintage 레코드"""
+    days = to_days(pd.to_datetime(frame['date']).to_numpy())
+    rt = to_days(pd.to_datetime(frame['realtime_start']).to_numpy())
+    values = pd.to_numeric(frame['value'], errors='coerce').to_numpy(dtype=np.float64)
+    order = np.lexsort((rt, days))
+    days, rt, values = days[order], rt[order], values[order]
+
+    # 같은 관측일의 다음 발표일이 이 값의 유효 종료일
+    same = np.r_[days[1:] == days[:-1], False]
+    rt_end = np.where(same, np.r_[rt[1:], RT_OPEN], RT_OPEN).astype(np.int32)
+    # 빈 값('.') 발표는 그 기간 동안 값이 없었다는 뜻이라 종료일 계산 후에 뺀다
+    keep = ~np.isnan(values)
+    packed, decimals = pack_values(values[keep])
+    return {'days': days[keep], 'rt_start': rt[keep], 'rt_end': rt_end[keep], 'values': packed, 'decimals': decimals}
+
+def release_record(rec, release_days=None):
+    """수정 이력이 없는 압축 레코드 → vintage 레코드 (발표일 = release_days, 없으면 관측일)"""
+    rt = rec['days'] if release_days is None else release_days
+    return {
+        'days': rec['days'],
+        'rt_start': np.asarray(rt, dtype=np.int32),
+        'rt_end': np.full(len(rec['days']), RT_OPEN, dtype=np.int32),
+        'values': rec['values'],
+        'decimals': rec['decimals'],
+    }
+
+def latest_record(vrec):
+    """vintage 레코드의 현재 유효 값만 → 압축 레코드 (FRED 최신 값과 같은 모양)"""
+    cur = vrec['rt_end'] == RT_OPEN
+    return {'days': vrec['days'][cur], 'values': vrec['values'][cur], 'decimals': vrec['decimals']}
+
+def _day(date):
+    return int(to_days([pd.Timestamp(date).to_datetime64()])[0])
+
+# ============================================================
+# 전 시리즈 as-of 인덱스
+# ============================================================
+def build_vintage_index(store, vintage_records=None, release_days=None):
+    """저장소 + 시리즈별 vintage 레코드 → 전 시리즈 as-of 조회 인덱스
+
+    vintage가 없는(수정되지 않는) 시리즈는 release_days({컬럼: 관측치별 발표일}, release_lag.py)에
+    발표된 것으로 보고, 거기에도 없으면 관측일에 발표된 것으로 본다.
+    """
+    vintage_records = vintage_records or {}
+    release_days = release_days or {}
+    columns = list(store.keys())
+    recs = []
+    for key in columns:
+        vrec = vintage_records.get(key)
+        recs.append(vrec if vrec is not None and len(vrec['days']) else release_record(store[key], release_days.get(key)))
+
+    lengths = np.array([len(r['days']) for r in recs], dtype=np.int64)
+    col_ids = np.repeat(np.arange(len(columns), dtype=np.int64), lengths)
+    days = np.concatenate([r['days'] for r in recs]).astype(np.int64)
+    rt_start = np.concatenate([r['rt_start'] for r in recs]).astype(np.int64)
+    rt_end = np.concatenate([r['rt_end'] for r in recs]).astype(np.int64)
+    values = np.concatenate([expand_values(r) for r in recs])
+
+    row_keys = col_ids * _ROW_COL_SHIFT + ((days + _DAY_OFFSET) << _DAY_BITS) + rt_start + _DAY_OFFSET
+    order = np.argsort(row_keys, kind='stable')
+    row_keys, col_ids, days, rt_start, rt_end, values = (
+        a[order] for a in (row_keys, col_ids, days, rt_start, rt_end, values))
+
+    # 관측치별 첫 발표일을 발표 순으로 정렬하고, 그 순서대로 "지금까지 발표된 가장 늦은 관측일"을 누적
+    # (컬럼 번호가 키의 상위 자리라 누적 최댓값이 컬럼 경계를 넘어 섞이지 않음)
+    first = np.flatnonzero(np.r_[True, (col_ids[1:] != col_ids[:-1]) | (days[1:] != days[:-1])]) \
+        if len(days) else np.array([], dtype=np.int64)
+    obs_col, obs_day, obs_release = col_ids[first], days[first], rt_start[first]
+    release_keys = obs_col * _COL_SHIFT + obs_release + _DAY_OFFSET
+    by_release = np.argsort(release_keys, kind='stable')
+    latest_obs = np.maximum.accumulate(obs_col[by_release] * _COL_SHIFT + obs_day[by_release] + _DAY_OFFSET) \
+        if len(first) else np.array([], dtype=np.int64)
+    release_keys = release_keys[by_release]
+
+    return {
+        'columns': columns,
+        'col_ids': col_ids,
+        'days': days,
+        'rt_start': rt_start,
+        'rt_end': rt_end,
+        'values': values,
+        'row_keys': row_keys,
+        'release_keys': release_keys,
+        'release_starts': np.searchsorted(release_keys, np.arange(len(columns), dtype=np.int64) * _COL_SHIFT),
+        'latest_obs': latest_obs,
+        'revised': [k for k in columns if vintage_records.get(k) is not None and len(vintage_records[k]['days'])],
+    }
+
+def as_of_store(vindex, date):
+    """날짜 date에 알려진 전 시리즈 값 → 압축 저장소 (모든 시리즈를 마스크 한 번으로)"""
+    d = _day(date)
+    known = np.flatnonzero((vindex['rt_start'] <= d) & (vindex['rt_end'] > d))
+    columns = vindex['columns']
+    bounds = np.searchsorted(vindex['col_ids'][known], np.arange(len(columns) + 1))
+    store = {}
+    for i, key in enumerate(columns):
+        rows = known[bounds[i]:bounds[i + 1]]
+        store[key] = {'days': vindex['days'][rows].astype(np.int32), 'values': vindex['values'][rows], 'decimals': None}
+    return store
+
+def as_of_master_df(vindex, date):
+    """날짜 date에 알려진 값으로 만든 마스터 프레임 (그날까지)"""
+    return build_master_df(as_of_store(vindex, date))
+
+def realtime_block(vindex, target_days):
+    """날짜마다 그날까지 발표된 가장 늦은 관측치의 그날 기준 값 (컬럼, 행) 블록 (ffill과 같은 의미)"""
+    k, target_days = len(vindex['columns']), np.asarray(target_days, dtype=np.int64)
+    n = len(target_days)
+    block = np.full((k, n), np.nan)
+    if not len(vindex['release_keys']):
+        return block
+
+    # 1) 날짜 t에 발표된 관측치 중 가장 늦은 관측일
+    targets = np.arange(k, dtype=np.int64)[:, None] * _COL_SHIFT + target_days[None, :] + _DAY_OFFSET
+    pos = np.searchsorted(vindex['release_keys'], targets.ravel(), side='right').reshape(k, n) - 1
+    valid = pos >= vindex['release_starts'][:, None]
+    obs_key = vindex['latest_obs'][pos[valid]]
+    col = obs_key // _COL_SHIFT
+    obs_day = obs_key % _COL_SHIFT - _DAY_OFFSET
+
+    # 2) 그 관측치의 t 시점 유효 발표 (발표일 ≤ t 중 마지막 수정)
+    t = np.broadcast_to(target_days[None, :], (k, n))[valid]
+    keys = col * _ROW_COL_SHIFT + ((obs_day + _DAY_OFFSET) << _DAY_BITS) + t + _DAY_OFFSET
+    rows = np.searchsorted(vindex['row_keys'], keys, side='right') - 1
+    # 그 시점에 삭제된 관측치는 빈 값
+    block[valid] = np.where(vindex['rt_end'][rows] > t, vindex['values'][rows], np.nan)
+    return block
+
+def realtime_frame(vindex, index=None):
+    """날짜별 당시 발표 기준 마스터 프레임 (원 시리즈 + 파생 지표, 기본 날짜축은 기준 시리즈 최신 관측일)"""
+    if index is None:
+        base = vindex['columns'].index(BASE_SERIES)
+        rows = (vindex['col_ids'] == base) & (vindex['rt_end'] == RT_OPEN)
+        index = days_to_index(vindex['days'][rows])
+    columns = vindex['columns']
+    block = np.empty((len(columns) + len(DERIVED_COLUMNS), len(index)))
+    block[:len(columns)] = realtime_block(vindex, to_days(pd.DatetimeIndex(index).to_numpy()))
+    derived = derived_values({c: block[i] for i, c in enumerate(columns)})
+    for i, c in enumerate(DERIVED_COLUMNS):
+        block[len(columns) + i] = derived[c]
+    return pd.DataFrame(block.T, index=pd.DatetimeIndex(index), columns=columns + DERIVED_COLUMNS, copy=False)
+
+def vintage_nbytes(vindex):
+    """as-of 인덱스 바이트 수"""
+    return int(sum(vindex[k].nbytes for k in ('col_ids', 'days', 'rt_start', 'rt_end', 'values', 'row_keys',
+                                               'release_keys', 'latest_obs')))